@@ -1,6 +1,6 @@
 "use client";
 
-import { useMemo, useState } from "react";
+import { useEffect, useMemo, useState } from "react";
 import type { CSSProperties } from "react";
 
 type Session = {
@@ -47,9 +47,39 @@ export function AvailabilityClient({ course, sessions, suggestedPriceCents, apiB
   const [lastStudentId, setLastStudentId] = useState<number | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [busySession, setBusySession] = useState<number | null>(null);
+  const [liveSeats, setLiveSeats] = useState<Record<number, number>>({});
 
   const hasSessions = sessions.length > 0;
 
+  useEffect(() => {
+    const params = new URLSearchParams({ course });
+    const source = new EventSource(`${apiBaseUrl}/api/availability/stream?${params.toString()}`);
+    let connected = false;
+    // The server drops streams that fall too far behind; after any reconnect,
+    // refetch counts so updates missed while disconnected are not lost.
+    source.addEventListener("open", () => {
+      if (!connected) {
+        connected = true;
+        return;
+      }
+      fetch(`${apiBaseUrl}/api/availability?${params.toString()}`)
+        .then((response) => (response.ok ? response.json() : []))
+        .then((fresh: Session[]) => {
+          setLiveSeats((current) => {
+            const next = { ...current };
+            for (const session of fresh) next[session.id] = session.seats_available;
+            return next;
+          });
+        })
+        .catch(() => undefined);
+    });
+    source.addEventListener("seats", (event) => {
+      const update: { session_id: number; seats_available: number } = JSON.parse((event as MessageEvent).data);
+      setLiveSeats((current) => ({ ...current, [update.session_id]: update.seats_available }));
+    });
+    return () => source.close();
+  }, [apiBaseUrl, course]);
+
   const heading = useMemo(() => {
     if (course === "private:all") return "Private coaching availability";
     return `Availability for ${course}`;
@@ -116,9 +146,15 @@ export function AvailabilityClient({ course, sessions, suggestedPriceCents, apiB
         typing_username: typingUsername.trim() || undefined,
       };
 
+      // Reuse the key for the same booking so a refresh or retry replays the
+      // first checkout instead of opening a second Stripe session.
+      const idempotencyStorageKey = `checkout:${JSON.stringify(checkoutPayload)}`;
+      const idempotencyKey = window.sessionStorage.getItem(idempotencyStorageKey) ?? crypto.randomUUID();
+      window.sessionStorage.setItem(idempotencyStorageKey, idempotencyKey);
+
       const checkoutResponse = await fetch(`${apiBaseUrl}/api/booking/checkout`, {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: { "Content-Type": "application/json", "Idempotency-Key": idempotencyKey },
         body: JSON.stringify(checkoutPayload),
       });
 
@@ -164,12 +200,13 @@ export function AvailabilityClient({ course, sessions, suggestedPriceCents, apiB
       ) : (
         <ul className="clean">
           {sessions.map((session) => {
-            const disabled = session.seats_available <= 0 || session.status !== "scheduled";
+            const seatsAvailable = liveSeats[session.id] ?? session.seats_available;
+            const disabled = seatsAvailable <= 0 || session.status !== "scheduled";
             return (
               <li key={session.id} className="card" style={{ marginBottom: 12 }}>
                 <div className="stack" style={{ gap: "0.35rem" }}>
                   <strong>{formatRange(session.start_ts, session.end_ts)}</strong>
-                  <span>Seats left: {session.seats_available}</span>
+                  <span>Seats left: {seatsAvailable}</span>
                   <button
                     type="button"
                     onClick={() => handleCheckout(session)}
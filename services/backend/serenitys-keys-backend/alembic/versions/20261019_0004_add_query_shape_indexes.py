@@ -0,0 +1,25 @@
+"""add composite and lower() expression indexes for hot queries"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_0004"
+down_revision = "20261019_0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_sessions_status_course_start_ts", "sessions", ["status", "course", "start_ts"])
+    op.create_index("ix_parents_email_lower", "parents", [sa.text("lower(email)")])
+    op.create_index("ix_students_typing_username_lower", "students", [sa.text("lower(typing_username)")])
+    op.create_index("ix_students_name_lower", "students", [sa.text("lower(name)")])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_students_name_lower", table_name="students")
+    op.drop_index("ix_students_typing_username_lower", table_name="students")
+    op.drop_index("ix_parents_email_lower", table_name="parents")
+    op.drop_index("ix_sessions_status_course_start_ts", table_name="sessions")
@@ -0,0 +1,40 @@
+"""add waitlist and enrollment seat holds"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_0008"
+down_revision = "20261019_0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("enrollments", sa.Column("hold_expires_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        "ix_enrollments_status_hold_expires_at",
+        "enrollments",
+        ["status", "hold_expires_at"],
+    )
+    op.create_table(
+        "waitlist",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("session_id", sa.Integer(), sa.ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("students.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="waiting"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("promoted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint("session_id", "student_id", name="uq_waitlist_session_student"),
+    )
+    op.create_index("ix_waitlist_session_id_status_id", "waitlist", ["session_id", "status", "id"])
+    op.create_index("ix_waitlist_student_id", "waitlist", ["student_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_waitlist_student_id", table_name="waitlist")
+    op.drop_index("ix_waitlist_session_id_status_id", table_name="waitlist")
+    op.drop_table("waitlist")
+    op.drop_index("ix_enrollments_status_hold_expires_at", table_name="enrollments")
+    op.drop_column("enrollments", "hold_expires_at")
@@ -0,0 +1,56 @@
+"""unique (course, start_ts) on sessions"""
+from __future__ import annotations
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision = "20261019_0009"
+down_revision = "20261019_0008"
+branch_labels = None
+depends_on = None
+
+# Rows listed in the error before the rest are summarised as a count.
+MAX_LISTED = 50
+
+DUPLICATE_SLOTS = sa.text(
+    "SELECT s.course, s.start_ts, s.id, s.status, "
+    "(SELECT COUNT(*) FROM enrollments e WHERE e.session_id = s.id) AS enrollments "
+    "FROM sessions s "
+    "JOIN (SELECT course, start_ts FROM sessions GROUP BY course, start_ts HAVING COUNT(*) > 1) d "
+    "ON d.course = s.course AND d.start_ts = s.start_ts "
+    "ORDER BY s.course, s.start_ts, s.id"
+)
+
+
+def _check_no_duplicate_slots() -> None:
+    """Fail with the offending rows instead of an opaque CREATE UNIQUE INDEX error.
+
+    Duplicates are not removed automatically: either copy may carry
+    enrollments and payments, so which one to keep is an operator decision.
+    """
+
+    rows = op.get_bind().execute(DUPLICATE_SLOTS).all()
+    if not rows:
+        return
+    listed = [
+        f"  course={row.course!r} start_ts={row.start_ts} id={row.id} status={row.status} enrollments={row.enrollments}"
+        for row in rows[:MAX_LISTED]
+    ]
+    if len(rows) > MAX_LISTED:
+        listed.append(f"  ... and {len(rows) - MAX_LISTED} more")
+    raise RuntimeError(
+        "sessions has more than one row for the same (course, start_ts); merge or delete the extra rows "
+        "(move their enrollments and waitlist entries to the session you keep), then rerun "
+        "`alembic upgrade head`:\n" + "\n".join(listed)
+    )
+
+
+def upgrade() -> None:
+    if not context.is_offline_mode():
+        _check_no_duplicate_slots()
+    op.create_index("uq_sessions_course_start_ts", "sessions", ["course", "start_ts"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("uq_sessions_course_start_ts", table_name="sessions")
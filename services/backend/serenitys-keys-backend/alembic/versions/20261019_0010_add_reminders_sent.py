@@ -0,0 +1,31 @@
+"""add reminders_sent ledger for session reminders"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_0010"
+down_revision = "20261019_0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "reminders_sent",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "enrollment_id",
+            sa.Integer(),
+            sa.ForeignKey("enrollments.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("queued_at", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint("enrollment_id", "kind", name="uq_reminders_sent_enrollment_kind"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("reminders_sent")
@@ -0,0 +1,39 @@
+"""add job_runs history and job_locks leases"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_0011"
+down_revision = "20261019_0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_runs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("job_name", sa.String(length=100), nullable=False),
+        sa.Column("worker", sa.String(length=255), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="running"),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("duration_ms", sa.Integer(), nullable=True),
+        sa.Column("items_processed", sa.Integer(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_job_runs_job_name_started_at", "job_runs", ["job_name", "started_at"])
+    op.create_table(
+        "job_locks",
+        sa.Column("name", sa.String(length=100), primary_key=True),
+        sa.Column("holder", sa.String(length=255), nullable=False),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("job_locks")
+    op.drop_index("ix_job_runs_job_name_started_at", table_name="job_runs")
+    op.drop_table("job_runs")
@@ -0,0 +1,39 @@
+"""add job_shards for sharded job runs"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_0012"
+down_revision = "20261019_0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_shards",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("job_name", sa.String(length=100), nullable=False),
+        sa.Column("run_key", sa.String(length=50), nullable=False),
+        sa.Column("shard_no", sa.Integer(), nullable=False),
+        sa.Column("first_id", sa.Integer(), nullable=False),
+        sa.Column("last_id", sa.Integer(), nullable=False),
+        sa.Column("checkpoint", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="pending"),
+        sa.Column("holder", sa.String(length=255), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("items_processed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint("job_name", "run_key", "shard_no", name="uq_job_shards_job_run_shard"),
+    )
+    op.create_index("ix_job_shards_job_run_status", "job_shards", ["job_name", "run_key", "status"])
+    op.create_index("ix_metrics_student_id_date", "metrics", ["student_id", "date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_metrics_student_id_date", table_name="metrics")
+    op.drop_index("ix_job_shards_job_run_status", table_name="job_shards")
+    op.drop_table("job_shards")
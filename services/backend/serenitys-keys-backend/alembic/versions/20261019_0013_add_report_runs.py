@@ -0,0 +1,33 @@
+"""store weekly report html and track report runs by metric watermark"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_0013"
+down_revision = "20261019_0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("reports", sa.Column("html", sa.Text(), nullable=True))
+    op.add_column("reports", sa.Column("generated_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("uq_reports_student_id_period_end", "reports", ["student_id", "period_end"], unique=True)
+    op.create_table(
+        "report_runs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("period_end", sa.Date(), nullable=False, unique=True),
+        sa.Column("metrics_since", sa.Integer(), nullable=False),
+        sa.Column("metrics_until", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("report_runs")
+    op.drop_index("uq_reports_student_id_period_end", table_name="reports")
+    op.drop_column("reports", "generated_at")
+    op.drop_column("reports", "html")
@@ -0,0 +1,23 @@
+"""add parents.calendar_token and index students.parent_id for calendar feeds"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_0014"
+down_revision = "20261019_0013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("parents", sa.Column("calendar_token", sa.String(length=64), nullable=True))
+    op.create_index("ix_parents_calendar_token", "parents", ["calendar_token"], unique=True)
+    op.create_index("ix_students_parent_id", "students", ["parent_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_students_parent_id", table_name="students")
+    op.drop_index("ix_parents_calendar_token", table_name="parents")
+    op.drop_column("parents", "calendar_token")
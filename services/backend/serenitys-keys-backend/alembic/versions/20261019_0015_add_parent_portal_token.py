@@ -0,0 +1,21 @@
+"""add parents.portal_token for the token-gated parent portal endpoints"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_0015"
+down_revision = "20261019_0014"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("parents", sa.Column("portal_token", sa.String(length=64), nullable=True))
+    op.create_index("ix_parents_portal_token", "parents", ["portal_token"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_parents_portal_token", table_name="parents")
+    op.drop_column("parents", "portal_token")
@@ -0,0 +1,115 @@
+"""Per-parent subscribable calendar feeds.
+
+Calendar apps poll a feed URL every few minutes to hours. Each poll runs one
+narrow query for the parent's upcoming confirmed enrollments. The ETag is a
+fingerprint of exactly the rows that go into the feed (enrollment ids and
+statuses, session ids and versions). A matching ``If-None-Match`` is answered
+with 304 before anything is rendered. Rendered feeds are cached per parent and
+rebuilt only when that fingerprint changes, i.e. when one of their enrollments
+or sessions does.
+"""
+from __future__ import annotations
+
+import secrets
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import get_settings
+from .models import Enrollment, Parent, Session, Student
+from .utils.etags import make_etag
+from .utils.ics import make_ics_feed
+
+PLACEHOLDER_MEET_LINK = "https://meet.google.com/dev-placeholder"
+
+
+def new_calendar_token() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def feed_rows_stmt(parent_id: int, now: datetime) -> Select:
+    """The parent's upcoming confirmed enrollments, with everything the feed and its ETag use."""
+
+    return (
+        select(
+            Enrollment.id,
+            Enrollment.status,
+            Session.id.label("session_id"),
+            Session.version,
+            Session.course,
+            Session.start_ts,
+            Session.end_ts,
+            Session.meet_link,
+            Student.id.label("student_id"),
+            Student.name,
+        )
+        .join(Student, Student.id == Enrollment.student_id)
+        .join(Session, Session.id == Enrollment.session_id)
+        .where(
+            Student.parent_id == parent_id,
+            Enrollment.status == "confirmed",
+            Session.status != "cancelled",
+            Session.end_ts >= now,
+        )
+        .order_by(Session.start_ts, Enrollment.id)
+    )
+
+
+@dataclass(frozen=True)
+class CalendarFeed:
+    etag: str
+    last_modified: datetime
+    body: str
+
+
+class CalendarFeedCache:
+    def __init__(self, *, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self._feeds: OrderedDict[int, CalendarFeed] = OrderedDict()
+
+    async def parent_for_token(self, db: AsyncSession, token: str) -> Optional[int]:
+        return (await db.execute(select(Parent.id).where(Parent.calendar_token == token))).scalar_one_or_none()
+
+    async def load(self, db: AsyncSession, parent_id: int) -> tuple[str, Sequence[Row[Any]]]:
+        """Return the feed's ETag and the rows it is built from."""
+
+        rows = (
+            await db.execute(feed_rows_stmt(parent_id, datetime.now(get_settings().timezone_info)))
+        ).all()
+        return make_etag("calendar", parent_id, *(tuple(row) for row in rows)), rows
+
+    def render(self, parent_id: int, etag: str, rows: Sequence[Row[Any]]) -> CalendarFeed:
+        """Return the cached feed for ``etag``, rendering it from ``rows`` on a miss."""
+
+        cached = self._feeds.get(parent_id)
+        if cached is not None and cached.etag == etag:
+            self._feeds.move_to_end(parent_id)
+            return cached
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        body = make_ics_feed(
+            (
+                {
+                    "uid": f"sk-{row.session_id}-{row.student_id}",
+                    "sequence": row.version,
+                    "title": f"Serenity's Keys - {row.course} ({row.name})",
+                    "start": row.start_ts,
+                    "end": row.end_ts,
+                    "meet_url": row.meet_link or PLACEHOLDER_MEET_LINK,
+                }
+                for row in rows
+            ),
+            stamp=now,
+        )
+        feed = CalendarFeed(etag=etag, last_modified=now, body=body)
+        self._feeds[parent_id] = feed
+        while len(self._feeds) > self.max_entries:
+            self._feeds.popitem(last=False)
+        return feed
+
+
+calendar_feeds = CalendarFeedCache()
@@ -2,11 +2,14 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import List
+from typing import List, Literal
 from zoneinfo import ZoneInfo
 
-from pydantic import Field
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy.engine import make_url
+
+SUPPORTED_DATABASES = ("postgresql", "sqlite")
 
 
 class Settings(BaseSettings):
@@ -19,6 +22,20 @@ class Settings(BaseSettings):
     app_port: int = Field(default=8080, alias="APP_PORT")
 
     database_url: str = Field(default="sqlite+aiosqlite:///./serenitys_keys.db", alias="DATABASE_URL")
+    database_read_url: str = Field(default="", alias="DATABASE_READ_URL")
+    read_your_writes_seconds: int = Field(default=30, ge=0, alias="READ_YOUR_WRITES_SECONDS")
+    db_pool_size: int = Field(default=5, ge=1, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, ge=0, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(default=30.0, gt=0, alias="DB_POOL_TIMEOUT_SECONDS")
+    db_pool_recycle_seconds: int = Field(default=1800, alias="DB_POOL_RECYCLE_SECONDS")
+    db_pool_pre_ping: bool = Field(default=True, alias="DB_POOL_PRE_PING")
+    db_statement_timeout_ms: int = Field(default=0, ge=0, alias="DB_STATEMENT_TIMEOUT_MS")
+    sqlite_profile: Literal["default", "tuned"] = Field(default="tuned", alias="SQLITE_PROFILE")
+    sqlite_busy_timeout_ms: int = Field(default=5000, ge=0, alias="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_mmap_size_mb: int = Field(default=256, ge=0, alias="SQLITE_MMAP_SIZE_MB")
+    sqlite_cache_size_mb: int = Field(default=64, ge=1, alias="SQLITE_CACHE_SIZE_MB")
+    slow_query_ms: float = Field(default=200, ge=0, alias="SLOW_QUERY_MS")
+    schema_check: Literal["verify", "create", "off"] = Field(default="verify", alias="SCHEMA_CHECK")
 
     stripe_public_key: str = Field(default="", alias="STRIPE_PUBLIC_KEY")
     stripe_secret_key: str = Field(default="", alias="STRIPE_SECRET_KEY")
@@ -48,6 +65,22 @@ class Settings(BaseSettings):
     admin_api_token: str = Field(default="dev", alias="ADMIN_API_TOKEN")
     admin_jwt_secret: str = Field(default="change-me", alias="ADMIN_JWT_SECRET")
     sentry_dsn: str = Field(default="", alias="SENTRY_DSN")
+    integration_pool_size: int = Field(default=8, ge=1, alias="INTEGRATION_POOL_SIZE")
+    circuit_failure_thresholds: dict[str, int] = Field(
+        default={"stripe": 5, "google_calendar": 3, "mailer": 5},
+        alias="CIRCUIT_FAILURE_THRESHOLDS",
+    )
+    circuit_recovery_seconds: float = Field(default=30.0, alias="CIRCUIT_RECOVERY_SECONDS")
+    email_timeout_seconds: float = Field(default=5.0, alias="EMAIL_TIMEOUT_SECONDS")
+    integration_timeout_seconds: float = Field(default=10.0, gt=0, alias="INTEGRATION_TIMEOUT_SECONDS")
+    idempotency_ttl_seconds: int = Field(default=86400, ge=60, alias="IDEMPOTENCY_TTL_SECONDS")
+    checkout_hold_minutes: int = Field(default=60, ge=1, alias="CHECKOUT_HOLD_MINUTES")
+    waitlist_hold_minutes: int = Field(default=120, ge=1, alias="WAITLIST_HOLD_MINUTES")
+    booking_portal_url: str = Field(default="http://localhost:3000", alias="BOOKING_PORTAL_URL")
+    schedule_conflict_check: bool = Field(default=True, alias="SCHEDULE_CONFLICT_CHECK")
+    job_lease_seconds: int = Field(default=300, ge=30, alias="JOB_LEASE_SECONDS")
+    report_shard_size: int = Field(default=500, ge=1, alias="REPORT_SHARD_SIZE")
+    report_shard_concurrency: int = Field(default=4, ge=1, alias="REPORT_SHARD_CONCURRENCY")
     typing_class_links: dict[str, str] = Field(
         default={
             "group:3-5": "https://www.typing.com/join#68D40AEA3DA1F",
@@ -59,6 +92,15 @@ class Settings(BaseSettings):
         alias="TYPING_CLASS_LINKS"
     )
 
+    @field_validator("database_url", "database_read_url")
+    @classmethod
+    def _supported_database(cls, value: str) -> str:
+        # Upserts and conflict-skipping inserts (db.insert_ignore) are written for these two dialects.
+        if value and make_url(value).get_backend_name() not in SUPPORTED_DATABASES:
+            scheme = value.split(":", 1)[0]
+            raise ValueError(f"unsupported database {scheme!r}; use one of: {', '.join(SUPPORTED_DATABASES)}")
+        return value
+
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.cors_allow_origins.split(",") if origin.strip()]
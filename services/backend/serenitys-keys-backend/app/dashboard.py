@@ -0,0 +1,174 @@
+"""Parent dashboard payload, loaded in a fixed number of queries.
+
+The parent, their students, the students' upcoming enrollments and those
+enrollments' sessions are eager-loaded with ``selectinload`` (one ``IN`` query
+per level), and metrics come from two grouped queries over all of the
+family's students. A family with one student and one with ten both cost six
+queries; nothing touches a lazy relationship.
+
+The payload carries contact details and Meet links, so it is only served to
+callers holding the parent's portal token (``/api/portal/{token}/...``), the
+same secret-URL scheme as the calendar feed; parents are never looked up by id.
+"""
+from __future__ import annotations
+
+import secrets
+from datetime import date, datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from .config import get_settings
+from .models import Enrollment, Metric, Parent, Session, Student
+from .seats import SEAT_HOLDING_STATUSES
+
+ROLLING_WINDOWS = (7, 30)
+
+
+def new_portal_token() -> str:
+    return secrets.token_urlsafe(32)
+
+
+async def parent_for_portal_token(db: AsyncSession, token: str) -> Optional[int]:
+    return (await db.execute(select(Parent.id).where(Parent.portal_token == token))).scalar_one_or_none()
+
+
+async def _latest_metrics(db: AsyncSession, student_ids: list[int]) -> dict[int, dict[str, Any]]:
+    ranked = (
+        select(
+            Metric.student_id,
+            Metric.date,
+            Metric.wpm,
+            Metric.accuracy,
+            Metric.time_spent,
+            func.row_number()
+            .over(partition_by=Metric.student_id, order_by=(Metric.date.desc(), Metric.id.desc()))
+            .label("rank"),
+        )
+        .where(Metric.student_id.in_(student_ids))
+        .subquery()
+    )
+    rows = (await db.execute(select(ranked).where(ranked.c.rank == 1))).all()
+    return {
+        row.student_id: {"date": row.date, "wpm": row.wpm, "accuracy": row.accuracy, "time_spent": row.time_spent}
+        for row in rows
+    }
+
+
+async def _rolling_metrics(
+    db: AsyncSession, student_ids: list[int], today: date
+) -> dict[int, dict[str, dict[str, Any]]]:
+    columns = []
+    for days in ROLLING_WINDOWS:
+        in_window = Metric.date > today - timedelta(days=days)
+        columns += [
+            func.count(case((in_window, Metric.id))).label(f"practice_count_{days}"),
+            func.sum(case((in_window, Metric.time_spent))).label(f"practice_minutes_{days}"),
+            func.avg(case((in_window, Metric.wpm))).label(f"average_wpm_{days}"),
+            func.max(case((in_window, Metric.wpm))).label(f"best_wpm_{days}"),
+            func.avg(case((in_window, Metric.accuracy))).label(f"average_accuracy_{days}"),
+        ]
+    rows = (
+        await db.execute(
+            select(Metric.student_id, *columns)
+            .where(Metric.student_id.in_(student_ids), Metric.date > today - timedelta(days=max(ROLLING_WINDOWS)))
+            .group_by(Metric.student_id)
+        )
+    ).all()
+    rolling: dict[int, dict[str, dict[str, Any]]] = {}
+    for row in rows:
+        values = row._mapping
+        rolling[row.student_id] = {
+            f"{days}d": {
+                "days": days,
+                "practice_count": values[f"practice_count_{days}"],
+                "practice_minutes": values[f"practice_minutes_{days}"],
+                "average_wpm": _rounded(values[f"average_wpm_{days}"]),
+                "best_wpm": values[f"best_wpm_{days}"],
+                "average_accuracy": _rounded(values[f"average_accuracy_{days}"]),
+            }
+            for days in ROLLING_WINDOWS
+        }
+    return rolling
+
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+def _empty_rolling() -> dict[str, dict[str, Any]]:
+    return {
+        f"{days}d": {
+            "days": days,
+            "practice_count": 0,
+            "practice_minutes": None,
+            "average_wpm": None,
+            "best_wpm": None,
+            "average_accuracy": None,
+        }
+        for days in ROLLING_WINDOWS
+    }
+
+
+async def load_parent_dashboard(db: AsyncSession, portal_token: str) -> Optional[dict[str, Any]]:
+    """Return the dashboard payload for the parent holding ``portal_token``, or None if no parent does."""
+
+    now = datetime.now(get_settings().timezone_info)
+    upcoming = Enrollment.status.in_(SEAT_HOLDING_STATUSES) & Enrollment.session.has(
+        (Session.end_ts >= now) & (Session.status != "cancelled")
+    )
+    parent = (
+        await db.execute(
+            select(Parent)
+            .where(Parent.portal_token == portal_token)
+            .options(
+                selectinload(Parent.students)
+                .selectinload(Student.enrollments.and_(upcoming))
+                .selectinload(Enrollment.session)
+            )
+        )
+    ).scalar_one_or_none()
+    if parent is None:
+        return None
+
+    students = sorted(parent.students, key=lambda student: student.id)
+    student_ids = [student.id for student in students]
+    latest = await _latest_metrics(db, student_ids) if student_ids else {}
+    rolling = await _rolling_metrics(db, student_ids, now.date()) if student_ids else {}
+
+    return {
+        "parent": {"id": parent.id, "name": parent.name, "email": parent.email, "phone": parent.phone},
+        "students": [
+            {
+                "id": student.id,
+                "name": student.name,
+                "level": student.level,
+                "typing_username": student.typing_username,
+                "latest_metric": latest.get(student.id),
+                "rolling": rolling.get(student.id) or _empty_rolling(),
+                "upcoming": [
+                    {
+                        "enrollment_id": enrollment.id,
+                        "status": enrollment.status,
+                        "payment_status": enrollment.payment_status,
+                        "session": {
+                            "id": enrollment.session.id,
+                            "course": enrollment.session.course,
+                            "start_ts": enrollment.session.start_ts,
+                            "end_ts": enrollment.session.end_ts,
+                            "mode": enrollment.session.mode,
+                            "location": enrollment.session.location,
+                            "meet_link": enrollment.session.meet_link,
+                            "status": enrollment.session.status,
+                        },
+                    }
+                    for enrollment in sorted(
+                        student.enrollments, key=lambda enrollment: (enrollment.session.start_ts, enrollment.id)
+                    )
+                ],
+            }
+            for student in students
+        ],
+    }
@@ -1,17 +1,28 @@
 """Database utilities."""
 from __future__ import annotations
 
-from collections.abc import AsyncIterator
+import logging
+import time
+from http.cookies import SimpleCookie
+from collections.abc import AsyncIterator, Sequence
+from typing import Any, Optional
 
+from fastapi import Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from .config import get_settings
+from .config import Settings, get_settings
+from .instrumentation import instrument_engine
+from .sqlite_profile import apply_pragmas, is_sqlite_file, writer_routing_session
 
 
 class Base(DeclarativeBase):
@@ -20,21 +31,161 @@ class Base(DeclarativeBase):
 
 settings = get_settings()
 
+
+def engine_options(url: str, settings: Settings) -> dict[str, Any]:
+    """Pool and timeout arguments for ``create_async_engine`` from settings."""
+
+    parsed = make_url(url)
+    options: dict[str, Any] = {}
+    # aiosqlite opens a fresh connection per checkout (NullPool/StaticPool); there is no pool to size.
+    if parsed.get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            pool_recycle=settings.db_pool_recycle_seconds,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+    if settings.db_statement_timeout_ms and parsed.get_backend_name() == "postgresql":
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.db_statement_timeout_ms)}}
+    return options
+
+
+tuned_sqlite = settings.sqlite_profile == "tuned" and is_sqlite_file(settings.database_url)
+if tuned_sqlite:
+    # One writer connection; sessions queue for it (see app.sqlite_profile).
+    writer_options: dict[str, Any] = {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": 1,
+        "max_overflow": 0,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+    }
+else:
+    writer_options = engine_options(settings.database_url, settings)
 engine: AsyncEngine = create_async_engine(
     settings.database_url,
     echo=settings.app_env.lower() == "dev",
     future=True,
+    **writer_options,
 )
+instrument_engine(engine)
+sqlite_reader_engine: Optional[AsyncEngine] = None
+if tuned_sqlite:
+    # Pool reader connections too, so the pragmas run once per connection rather than per session.
+    sqlite_reader_engine = create_async_engine(
+        settings.database_url,
+        echo=settings.app_env.lower() == "dev",
+        future=True,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+    )
+    instrument_engine(sqlite_reader_engine)
+    apply_pragmas(engine, settings)
+    apply_pragmas(sqlite_reader_engine, settings)
+
+logger = logging.getLogger(__name__)
+
+# Cookie set on responses whose request committed to the primary; while it is
+# fresh, get_read_session sends that client's reads to the primary too.
+RECENT_WRITE_COOKIE = "sk_recent_write"
+# A replica that fails to connect is skipped for this long before it is retried.
+REPLICA_RETRY_SECONDS = 30.0
+
+
+class TrackedSession(AsyncSession):
+    """Session that remembers whether it committed, for read-your-writes pinning."""
+
+    async def commit(self) -> None:
+        await super().commit()
+        self.info["committed"] = True
+
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     expire_on_commit=False,
-    class_=AsyncSession,
+    class_=TrackedSession,
+    **({"sync_session_class": writer_routing_session(engine, sqlite_reader_engine)} if sqlite_reader_engine else {}),
 )
 
+# Optional read replica. Without DATABASE_READ_URL reads share the primary engine.
+read_engine: Optional[AsyncEngine] = (
+    create_async_engine(
+        settings.database_read_url, future=True, **engine_options(settings.database_read_url, settings)
+    )
+    if settings.database_read_url
+    else None
+)
+if read_engine is not None:
+    instrument_engine(read_engine)
+ReadSessionLocal = (
+    async_sessionmaker(bind=read_engine, expire_on_commit=False, class_=AsyncSession) if read_engine else None
+)
+_replica_down_until = 0.0
 
-async def get_session() -> AsyncIterator[AsyncSession]:
+
+async def get_session(request: Request) -> AsyncIterator[AsyncSession]:
     """FastAPI dependency to provide an async database session."""
 
     async with AsyncSessionLocal() as session:
+        request.state.db_session = session
         yield session
+
+
+def recent_write_cookie() -> str:
+    """``Set-Cookie`` header value marking the client as having just written."""
+
+    cookie: SimpleCookie = SimpleCookie()
+    cookie[RECENT_WRITE_COOKIE] = str(int(time.time()))
+    morsel = cookie[RECENT_WRITE_COOKIE]
+    morsel["max-age"] = settings.read_your_writes_seconds
+    morsel["path"] = "/"
+    morsel["httponly"] = True
+    morsel["samesite"] = "lax"
+    return morsel.OutputString()
+
+
+def wrote_recently(request: Request) -> bool:
+    value = request.cookies.get(RECENT_WRITE_COOKIE, "")
+    try:
+        return time.time() - float(value) < settings.read_your_writes_seconds
+    except ValueError:
+        return False
+
+
+def replica_status() -> str:
+    if ReadSessionLocal is None:
+        return "not_configured"
+    return "down" if time.monotonic() < _replica_down_until else "ok"
+
+
+async def get_read_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """Session for read-only endpoints: the replica when configured and usable, else the primary.
+
+    Clients that committed something in the last READ_YOUR_WRITES_SECONDS read
+    from the primary so they never see the replica lag behind their own writes.
+    """
+
+    global _replica_down_until
+    if ReadSessionLocal is not None and replica_status() == "ok" and not wrote_recently(request):
+        async with ReadSessionLocal() as session:
+            try:
+                await session.connection()
+            except (OSError, SQLAlchemyError) as exc:
+                _replica_down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+                logger.warning("Read replica unavailable, using the primary: %s", exc)
+            else:
+                yield session
+                return
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def insert_ignore(db: AsyncSession, model: Any, index_elements: Sequence[str]) -> Any:
+    """Return an INSERT for ``model`` that skips rows conflicting on ``index_elements``."""
+
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing(index_elements=list(index_elements))
+    # Settings reject any DATABASE_URL other than Postgres or SQLite at startup.
+    return sqlite.insert(model).on_conflict_do_nothing(index_elements=list(index_elements))
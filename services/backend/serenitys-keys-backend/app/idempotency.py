@@ -0,0 +1,126 @@
+"""Idempotency-Key support for endpoints with external side effects.
+
+The first successful response for a key is stored in ``idempotency_keys``
+(inside the caller's transaction) and mirrored in a small in-process TTL
+cache. Repeats with the same key and body get the stored response back
+without re-running the handler; the same key with a different body is a
+conflict. Concurrent repeats on one worker wait on a per-key lock instead of
+racing the first request to Stripe.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import get_settings
+from .db import insert_ignore
+from .exceptions import ResourceConflict
+from .models import IdempotencyRecord
+
+
+def request_fingerprint(body: str) -> str:
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, ttl_seconds: int, *, cache_size: int = 2048) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.cache_size = cache_size
+        # (scope, key) -> (expires_at monotonic, request_hash, response)
+        self._cache: OrderedDict[tuple[str, str], tuple[float, str, dict[str, Any]]] = OrderedDict()
+        self._locks: weakref.WeakValueDictionary[tuple[str, str], asyncio.Lock] = weakref.WeakValueDictionary()
+
+    def lock(self, scope: str, key: str) -> asyncio.Lock:
+        """Per-key lock; hold it across lookup, handler and save."""
+
+        lock = self._locks.get((scope, key))
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[(scope, key)] = lock
+        return lock
+
+    def _check(self, key: str, stored_hash: str, request_hash: str) -> None:
+        if stored_hash != request_hash:
+            raise ResourceConflict(
+                "Idempotency-Key was already used with a different request body",
+                extra={"idempotency_key": key},
+            )
+
+    def remember(
+        self, scope: str, key: str, request_hash: str, response: dict[str, Any], expires_in: Optional[float] = None
+    ) -> None:
+        """Cache a committed response in-process."""
+
+        if expires_in is None:
+            expires_in = self.ttl_seconds
+        self._cache[(scope, key)] = (time.monotonic() + expires_in, request_hash, response)
+        self._cache.move_to_end((scope, key))
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def lookup(
+        self, db: AsyncSession, scope: str, key: str, request_hash: str
+    ) -> Optional[dict[str, Any]]:
+        """Return the stored response for ``key``, or None if it has not been used."""
+
+        cached = self._cache.get((scope, key))
+        if cached is not None:
+            expires, stored_hash, response = cached
+            if expires > time.monotonic():
+                self._check(key, stored_hash, request_hash)
+                return response
+            del self._cache[(scope, key)]
+
+        row = (
+            await db.execute(
+                select(IdempotencyRecord.request_hash, IdempotencyRecord.response, IdempotencyRecord.expires_at)
+                .where(IdempotencyRecord.scope == scope, IdempotencyRecord.key == key)
+            )
+        ).one_or_none()
+        if row is None:
+            return None
+        now = datetime.now(timezone.utc)
+        expires_at = row.expires_at if row.expires_at.tzinfo else row.expires_at.replace(tzinfo=timezone.utc)
+        if expires_at <= now:
+            # Expired keys may be reused; clear the row so ``save`` can insert again.
+            await db.execute(
+                delete(IdempotencyRecord).where(IdempotencyRecord.scope == scope, IdempotencyRecord.key == key)
+            )
+            return None
+        self._check(key, row.request_hash, request_hash)
+        self.remember(scope, key, row.request_hash, row.response, (expires_at - now).total_seconds())
+        return row.response
+
+    async def save(
+        self, db: AsyncSession, scope: str, key: str, request_hash: str, response: dict[str, Any]
+    ) -> None:
+        """Stage the response in ``db``; call ``remember`` once the caller has committed."""
+
+        now = datetime.now(timezone.utc)
+        await db.execute(
+            insert_ignore(db, IdempotencyRecord, ["scope", "key"]).values(
+                scope=scope,
+                key=key,
+                request_hash=request_hash,
+                response=response,
+                created_at=now,
+                expires_at=now + timedelta(seconds=self.ttl_seconds),
+            )
+        )
+
+    async def purge_expired(self, db: AsyncSession) -> int:
+        result = await db.execute(
+            delete(IdempotencyRecord).where(IdempotencyRecord.expires_at <= datetime.now(timezone.utc))
+        )
+        return result.rowcount or 0
+
+
+idempotency_store = IdempotencyStore(get_settings().idempotency_ttl_seconds)
@@ -0,0 +1,97 @@
+"""Per-request database query counting, timing and slow-query logging.
+
+``instrument_engine`` hooks an engine's cursor events. While a request is
+inside ``track_queries()``, every statement it runs adds to that request's
+``QueryStats``; the HTTP middleware then reports the totals in its log line
+and in a ``Server-Timing`` header. A statement slower than ``SLOW_QUERY_MS``
+is logged on its own with the SQL text but without the bound parameters, which
+may hold emails, names or tokens.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_MAX_LOGGED_SQL = 2000
+
+
+@dataclass
+class QueryStats:
+    queries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def milliseconds(self) -> float:
+        return round(self.seconds * 1000, 2)
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect the queries run in this context (and tasks it spawns) into a fresh ``QueryStats``."""
+
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _redacted(parameters: Any, executemany: bool) -> str:
+    if executemany:
+        return f"[{len(parameters)} parameter sets redacted]"
+    count = len(parameters) if parameters else 0
+    return f"[{count} parameters redacted]" if count else "[]"
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Count and time every statement run on ``engine``."""
+
+    slow_seconds = get_settings().slow_query_ms / 1000
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+        if slow_seconds and elapsed >= slow_seconds:
+            logger.warning(
+                "Slow query (%.1f ms): %s %s",
+                elapsed * 1000,
+                " ".join(statement.split())[:_MAX_LOGGED_SQL],
+                _redacted(parameters, executemany),
+            )
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _error(context):  # noqa: ANN001
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+def server_timing(stats: QueryStats, total_seconds: float) -> str:
+    return (
+        f'db;dur={stats.milliseconds};desc="{stats.queries} queries", '
+        f"app;dur={round(total_seconds * 1000, 2)}"
+    )
@@ -0,0 +1,131 @@
+"""Circuit breakers for external integrations.
+
+Each dependency gets one breaker. After ``failure_threshold`` consecutive
+failures it opens and callers fail fast into their fallback instead of
+waiting out a timeout. Once ``recovery_seconds`` have passed, a limited number
+of half-open probe calls are let through; a success closes the breaker again
+and a failure re-opens it. A probe that never reports back (cancelled, or its
+caller returned early) gives its slot back after another ``recovery_seconds``.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Optional
+
+from ..config import get_settings
+from ..exceptions import DependencyError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(DependencyError):
+    """Raised when a call is refused because the dependency's breaker is open."""
+
+    def __init__(self, service: str) -> None:
+        super().__init__(service, "temporarily unavailable (circuit open)")
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 5,
+        recovery_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        # monotonic start times of the half-open probes still outstanding
+        self._probes: list[float] = []
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        now = time.monotonic()
+        if self._state == OPEN and self._opened_at is not None:
+            if now - self._opened_at >= self.recovery_seconds:
+                self._state = HALF_OPEN
+                self._probes = []
+        if self._state == HALF_OPEN:
+            self._probes = [started for started in self._probes if now - started < self.recovery_seconds]
+        return self._state
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed; reserves a probe slot when half-open."""
+
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and len(self._probes) < self.half_open_max_calls:
+                self._probes.append(time.monotonic())
+                return True
+            self._rejected += 1
+            return False
+
+    def check(self) -> None:
+        """Like ``allow`` but raises ``CircuitOpenError`` when the call is refused."""
+
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._probes = []
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probes = []
+
+    def reset(self) -> None:
+        self.record_success()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            retry_in = None
+            if state == OPEN and self._opened_at is not None:
+                retry_in = round(max(self.recovery_seconds - (time.monotonic() - self._opened_at), 0.0), 1)
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "rejected_calls": self._rejected,
+                "retry_in_seconds": retry_in,
+            }
+
+
+def _build_breakers() -> dict[str, CircuitBreaker]:
+    settings = get_settings()
+    return {
+        name: CircuitBreaker(
+            name,
+            failure_threshold=settings.circuit_failure_thresholds.get(name, 5),
+            recovery_seconds=settings.circuit_recovery_seconds,
+        )
+        for name in ("stripe", "google_calendar", "mailer")
+    }
+
+
+breakers = _build_breakers()
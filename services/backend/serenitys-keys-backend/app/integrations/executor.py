@@ -0,0 +1,120 @@
+"""Bounded thread pool for blocking third-party SDK calls.
+
+The Stripe and Google client libraries are synchronous; calling them from a
+route handler blocks the event loop for the whole HTTP round trip. Every such
+call goes through ``integration_executor.run`` instead, which also records
+queue depth, time spent waiting for a worker and call duration per call name.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, TypeVar
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SLOW_WAIT_SECONDS = 1.0
+
+
+@dataclass
+class _CallStats:
+    calls: int = 0
+    errors: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    duration_total: float = 0.0
+    duration_max: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        calls = self.calls or 1
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "wait_ms_avg": round(self.wait_total / calls * 1000, 2),
+            "wait_ms_max": round(self.wait_max * 1000, 2),
+            "duration_ms_avg": round(self.duration_total / calls * 1000, 2),
+            "duration_ms_max": round(self.duration_max * 1000, 2),
+        }
+
+
+class IntegrationExecutor:
+    def __init__(self, max_workers: int, name: str = "integrations") -> None:
+        self.max_workers = max_workers
+        self.name = name
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._stats: dict[str, _CallStats] = {}
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._pool
+
+    async def run(self, call_name: str, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Run ``fn(*args, **kwargs)`` on the pool and await its result."""
+
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+
+        def invoke() -> T:
+            started = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            failed = False
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                self._record(call_name, started - submitted, time.perf_counter() - started, failed)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), functools.partial(invoke))
+
+    def _record(self, call_name: str, wait: float, duration: float, failed: bool) -> None:
+        with self._lock:
+            self._running -= 1
+            stats = self._stats.setdefault(call_name, _CallStats())
+            stats.calls += 1
+            stats.errors += int(failed)
+            stats.wait_total += wait
+            stats.wait_max = max(stats.wait_max, wait)
+            stats.duration_total += duration
+            stats.duration_max = max(stats.duration_max, duration)
+        if wait >= SLOW_WAIT_SECONDS:
+            logger.warning(
+                "Integration call %s waited %.0f ms for a worker; consider raising INTEGRATION_POOL_SIZE",
+                call_name,
+                wait * 1000,
+            )
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "in_flight": self._running,
+                "calls": {name: stats.as_dict() for name, stats in self._stats.items()},
+            }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+integration_executor = IntegrationExecutor(get_settings().integration_pool_size)
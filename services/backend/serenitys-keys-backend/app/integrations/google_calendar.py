@@ -3,25 +3,28 @@ from __future__ import annotations
 
 import base64
 import json
+import logging
 from datetime import datetime
 from typing import Iterable, Optional, Sequence, Tuple
 
 from ..config import get_settings
-
-try:  # Optional dependency - handled gracefully if missing
-    from google.oauth2 import service_account  # type: ignore
-    from googleapiclient.discovery import build  # type: ignore
-except ImportError:  # pragma: no cover - optional dependency
-    service_account = None  # type: ignore
-    build = None  # type: ignore
-
+from .circuit_breaker import breakers
 
 DEFAULT_PLACEHOLDER_LINK = "https://meet.google.com/dev-placeholder"
 
+logger = logging.getLogger(__name__)
+
 
 def _get_calendar_service():
     settings = get_settings()
-    if not settings.google_calendar_configured or not service_account or not build:
+    if not settings.google_calendar_configured:
+        return None
+    try:  # Optional dependency, imported on first use - handled gracefully if missing
+        import google_auth_httplib2  # type: ignore
+        import httplib2  # type: ignore
+        from google.oauth2 import service_account  # type: ignore
+        from googleapiclient.discovery import build  # type: ignore
+    except ImportError:  # pragma: no cover - optional dependency
         return None
     try:
         decoded = base64.b64decode(settings.google_service_account_json_base64)
@@ -30,7 +33,11 @@ def _get_calendar_service():
             service_account_info,
             scopes=["https://www.googleapis.com/auth/calendar"],
         )
-        return build("calendar", "v3", credentials=credentials)
+        # httplib2 has no timeout by default, so a hung request would hold an integration-pool thread forever.
+        http = google_auth_httplib2.AuthorizedHttp(
+            credentials, http=httplib2.Http(timeout=settings.integration_timeout_seconds)
+        )
+        return build("calendar", "v3", http=http, cache_discovery=False)
     except Exception:  # pragma: no cover - external API failure fallback
         return None
 
@@ -43,9 +50,16 @@ def create_meet_event(
 ) -> Tuple[str, Optional[str]]:
     """Create a Google Meet event and return the meeting link and event id."""
 
-    service = _get_calendar_service()
     settings = get_settings()
+    breaker = breakers["google_calendar"]
+    if settings.google_calendar_configured and not breaker.allow():
+        logger.warning("Google Calendar circuit open; using placeholder Meet link")
+        return DEFAULT_PLACEHOLDER_LINK, None
+
+    service = _get_calendar_service()
     if not service:
+        if settings.google_calendar_configured:
+            breaker.record_failure()
         return DEFAULT_PLACEHOLDER_LINK, None
 
     event_body = {
@@ -74,7 +88,9 @@ def create_meet_event(
             .execute()
         )
     except Exception:  # pragma: no cover - external API failure fallback
+        breaker.record_failure()
         return DEFAULT_PLACEHOLDER_LINK, None
+    breaker.record_success()
 
     meeting_link = created.get("hangoutLink")
     if not meeting_link:
@@ -100,11 +116,17 @@ def add_attendees(event_id: str | None, emails: Iterable[str]) -> None:
     if not service:
         return
 
+    breaker = breakers["google_calendar"]
+    if not breaker.allow():
+        logger.warning("Google Calendar circuit open; skipping attendee update for %s", event_id)
+        return
+
     settings = get_settings()
 
     try:
         event = service.events().get(calendarId=settings.google_calendar_id, eventId=event_id).execute()
     except Exception:  # pragma: no cover - propagation not desired
+        breaker.record_failure()
         return
 
     existing = event.get("attendees", []) or []
@@ -126,4 +148,6 @@ def add_attendees(event_id: str | None, emails: Iterable[str]) -> None:
             conferenceDataVersion=1,
         ).execute()
     except Exception:  # pragma: no cover - ignore failures
+        breaker.record_failure()
         return
+    breaker.record_success()
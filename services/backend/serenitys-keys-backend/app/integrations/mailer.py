@@ -5,9 +5,8 @@ import asyncio
 import logging
 from typing import Any
 
-import httpx
-
 from ..config import get_settings
+from .circuit_breaker import breakers
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +14,11 @@ settings = get_settings()
 
 
 async def send_email(to: str, subject: str, html: str) -> bool:
-    """Send an email via Resend, falling back to console logging in dev."""
+    """Send an email via Resend, falling back to console logging in dev.
+
+    Raises ``CircuitOpenError`` without touching the network while the mailer
+    breaker is open; callers that must not lose mail go through the outbox.
+    """
 
     api_key = settings.resend_api_key
     if not api_key:
@@ -23,6 +26,11 @@ async def send_email(to: str, subject: str, html: str) -> bool:
         logger.debug("Email body preview: %s", html[:500])
         return True
 
+    breaker = breakers["mailer"]
+    breaker.check()
+
+    import httpx  # Deferred: only workers that actually send mail pay for the HTTP client import.
+
     payload: dict[str, Any] = {
     "from": settings.from_email or "no-reply@serenitykeys.com",
         "to": [to],
@@ -30,15 +38,27 @@ async def send_email(to: str, subject: str, html: str) -> bool:
         "html": html,
     }
 
-    async with httpx.AsyncClient(timeout=15) as client:
-        response = await client.post(
-            "https://api.resend.com/emails",
-            headers={"Authorization": f"Bearer {api_key}"},
-            json=payload,
-        )
-        response.raise_for_status()
-        logger.info("Email dispatched via Resend: %s", response.json().get("id", "unknown"))
-        return True
+    try:
+        async with httpx.AsyncClient(timeout=settings.email_timeout_seconds) as client:
+            response = await client.post(
+                "https://api.resend.com/emails",
+                headers={"Authorization": f"Bearer {api_key}"},
+                json=payload,
+            )
+            response.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        # A rejected message (bad address, validation) says nothing about Resend's health.
+        if exc.response.status_code >= 500 or exc.response.status_code == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        raise
+    except httpx.HTTPError:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    logger.info("Email dispatched via Resend: %s", response.json().get("id", "unknown"))
+    return True
 
 
 def send_email_sync(to: str, subject: str, html: str) -> bool:
@@ -1,18 +1,33 @@
 """Stripe checkout helper functions."""
 from __future__ import annotations
 
+import functools
+import logging
+from types import ModuleType
 from typing import Final, Optional
 from urllib.parse import quote_plus
 
 from ..config import get_settings
+from .circuit_breaker import breakers
 
-try:  # Optional dependency
-    import stripe  # type: ignore
-except ImportError:  # pragma: no cover - optional dependency missing
-    stripe = None  # type: ignore
+PLACEHOLDER_URL: Final[str] = "https://example.com/checkout/dev-placeholder"
 
+logger = logging.getLogger(__name__)
 
-PLACEHOLDER_URL: Final[str] = "https://example.com/checkout/dev-placeholder"
+
+@functools.lru_cache(maxsize=1)
+def load_stripe() -> Optional[ModuleType]:
+    """Import the Stripe SDK on first use; ``None`` when it is not installed."""
+
+    try:  # Optional dependency; importing it costs ~50 ms, so unconfigured workers never do.
+        import stripe  # type: ignore
+    except ImportError:  # pragma: no cover - optional dependency missing
+        return None
+    # The SDK's default is an 80 s read timeout; a hung call would pin an integration-pool thread.
+    stripe.default_http_client = stripe.http_client.new_default_http_client(
+        timeout=get_settings().integration_timeout_seconds
+    )
+    return stripe
 
 
 def create_checkout_session(
@@ -40,7 +55,13 @@ def create_checkout_session(
     if extra_metadata:
         base_metadata.update({k: v for k, v in extra_metadata.items() if v is not None})
 
-    if not settings.stripe_configured or not stripe:
+    stripe = load_stripe() if settings.stripe_configured else None
+    if stripe is None:
+        return _placeholder_url(session_id, student_id, enrollment_id, base_metadata)
+
+    breaker = breakers["stripe"]
+    if not breaker.allow():
+        logger.warning("Stripe circuit open; returning placeholder checkout URL")
         return _placeholder_url(session_id, student_id, enrollment_id, base_metadata)
 
     stripe.api_key = settings.stripe_secret_key
@@ -64,11 +85,19 @@ def create_checkout_session(
             ],
         )
     except Exception:  # pragma: no cover - external API failure fallback
+        breaker.record_failure()
         return _placeholder_url(session_id, student_id, enrollment_id, base_metadata)
 
+    breaker.record_success()
     return checkout.get("url", PLACEHOLDER_URL)
 
 
+def is_placeholder_url(url: str) -> bool:
+    """True when ``create_checkout_session`` fell back instead of reaching Stripe."""
+
+    return url.startswith(PLACEHOLDER_URL)
+
+
 def _placeholder_url(
     session_id: int,
     student_id: int,
@@ -0,0 +1,213 @@
+"""Exactly-once execution and run history for scheduled jobs.
+
+Every worker runs the scheduler; before a job body runs, the worker has to win
+a database lock named after the job, so one worker does the work and the rest
+skip that tick. On Postgres the lock is a session-level advisory lock held on a
+dedicated autocommit connection opened outside the request pool, so a long job
+neither pins a pool slot nor sits idle in transaction, and it is released
+explicitly when the job ends. Elsewhere (SQLite) it is a lease row in
+``job_locks`` that the holder renews while the job runs and that lapses if the
+worker dies. Each run that wins the lock is recorded in ``job_runs``.
+
+The lock alone only stops overlapping runs: a worker whose tick fires a few
+seconds late could still repeat work another worker just finished. Jobs pass a
+``dedupe_window`` (well under their period) and a run is skipped when one
+already started inside that window.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import socket
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager, suppress
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from .config import get_settings
+from .db import AsyncSessionLocal, engine, insert_ignore
+from .models import JobLock, JobRun
+
+logger = logging.getLogger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+JobFunc = Callable[[], Awaitable[Optional[int]]]
+
+
+def advisory_key(name: str) -> int:
+    """Stable signed 64-bit key for ``pg_try_advisory_lock``."""
+
+    return int.from_bytes(hashlib.sha1(name.encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+@lru_cache(maxsize=1)
+def _lock_engine() -> AsyncEngine:
+    # NullPool: each held lock gets its own connection, closed on release, and
+    # never competes with requests for a slot in the main pool.
+    return create_async_engine(get_settings().database_url, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+
+
+@asynccontextmanager
+async def _advisory_lock(name: str) -> AsyncIterator[bool]:
+    key = advisory_key(name)
+    async with _lock_engine().connect() as conn:
+        acquired = bool((await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})).scalar())
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+
+
+async def _take_lease(name: str, lease: timedelta) -> bool:
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        inserted = (
+            await db.execute(
+                insert_ignore(db, JobLock, ["name"])
+                .values(name=name, holder=WORKER_ID, lease_expires_at=now + lease)
+                .returning(JobLock.name)
+            )
+        ).first()
+        acquired = inserted is not None
+        if not acquired:
+            # Only a lapsed lease can be taken over; the conditional UPDATE is the claim.
+            result = await db.execute(
+                update(JobLock)
+                .where(JobLock.name == name, JobLock.lease_expires_at <= now)
+                .values(holder=WORKER_ID, lease_expires_at=now + lease)
+            )
+            acquired = result.rowcount == 1
+        await db.commit()
+    return acquired
+
+
+async def _renew_lease(name: str, lease: timedelta) -> None:
+    while True:
+        await asyncio.sleep(lease.total_seconds() / 3)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(JobLock)
+                .where(JobLock.name == name, JobLock.holder == WORKER_ID)
+                .values(lease_expires_at=datetime.now(timezone.utc) + lease)
+            )
+            await db.commit()
+
+
+@asynccontextmanager
+async def _lease_lock(name: str, lease: timedelta) -> AsyncIterator[bool]:
+    if not await _take_lease(name, lease):
+        yield False
+        return
+    renewer = asyncio.create_task(_renew_lease(name, lease))
+    try:
+        yield True
+    finally:
+        renewer.cancel()
+        with suppress(asyncio.CancelledError):
+            await renewer
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(JobLock).where(JobLock.name == name, JobLock.holder == WORKER_ID))
+            await db.commit()
+
+
+def job_lock(name: str, *, lease_seconds: Optional[int] = None) -> AbstractAsyncContextManager[bool]:
+    """Async context manager yielding whether this worker holds the lock for ``name``."""
+
+    if engine.dialect.name == "postgresql":
+        return _advisory_lock(name)
+    lease = timedelta(seconds=lease_seconds or get_settings().job_lease_seconds)
+    return _lease_lock(name, lease)
+
+
+async def _ran_recently(name: str, window: timedelta) -> bool:
+    async with AsyncSessionLocal() as db:
+        recent = (
+            await db.execute(
+                select(JobRun.id)
+                .where(
+                    JobRun.job_name == name,
+                    JobRun.status != "failed",
+                    JobRun.started_at > datetime.now(timezone.utc) - window,
+                )
+                .limit(1)
+            )
+        ).first()
+    return recent is not None
+
+
+async def _start_run(name: str) -> int:
+    async with AsyncSessionLocal() as db:
+        run = JobRun(job_name=name, worker=WORKER_ID, status="running", started_at=datetime.now(timezone.utc))
+        db.add(run)
+        await db.commit()
+        return run.id
+
+
+async def _finish_run(run_id: int, started: float, items: Optional[int], error: Optional[str]) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(JobRun)
+            .where(JobRun.id == run_id)
+            .values(
+                status="failed" if error else "succeeded",
+                finished_at=datetime.now(timezone.utc),
+                duration_ms=int((time.perf_counter() - started) * 1000),
+                items_processed=items,
+                error=error,
+            )
+        )
+        await db.commit()
+
+
+async def run_job(
+    name: str,
+    func: JobFunc,
+    *,
+    dedupe_window: timedelta = timedelta(0),
+    lease_seconds: Optional[int] = None,
+    exclusive: bool = True,
+) -> Optional[int]:
+    """Run ``func`` unless another worker is running (or just ran) ``name``.
+
+    Returns the ``job_runs`` id, or None when the run was skipped. Jobs that
+    split their own work across workers (see ``app.shards``) pass
+    ``exclusive=False``: every worker runs them and records its own run.
+
+    ``func`` returns the number of items it processed (or None). Failures are
+    logged and recorded on the run rather than raised to the scheduler.
+    """
+
+    if not exclusive:
+        return await _record_run(name, func)
+    async with job_lock(name, lease_seconds=lease_seconds) as acquired:
+        if not acquired:
+            logger.info("Skipping job %s: lock held by another worker", name)
+            return None
+        if dedupe_window and await _ran_recently(name, dedupe_window):
+            logger.info("Skipping job %s: already ran within %s", name, dedupe_window)
+            return None
+        return await _record_run(name, func)
+
+
+async def _record_run(name: str, func: JobFunc) -> int:
+    run_id = await _start_run(name)
+    started = time.perf_counter()
+    items: Optional[int] = None
+    error: Optional[str] = None
+    try:
+        items = await func()
+    except Exception as exc:
+        logger.exception("Job %s failed", name)
+        error = f"{type(exc).__name__}: {exc}"[:2000]
+    await _finish_run(run_id, started, items, error)
+    return run_id
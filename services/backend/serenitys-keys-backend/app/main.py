@@ -1,25 +1,27 @@
 """FastAPI application bootstrap for Serenity's Keys backend."""
-from __future__ import annotations
 
+import asyncio
 import csv
+import hashlib
 import io
 import json
 import logging
 import os
 import sys
 import uuid
-from datetime import date, datetime, time, timedelta
+from datetime import date, datetime, time, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from importlib.metadata import PackageNotFoundError, version as package_version
 from typing import Any, Dict, List, Optional
 
 from dateutil import parser as date_parser
-import sentry_sdk
-from sentry_sdk.integrations.fastapi import FastApiIntegration
 from fastapi import (
     Depends,
     FastAPI,
     File,
     Header,
     HTTPException,
+    Query,
     Request,
     Response,
     UploadFile,
@@ -29,25 +31,52 @@ from fastapi import (
 from .constants import PROGRAMS
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
-from .exceptions import BaseAPIException, ResourceNotFound, ValidationError, DependencyError, ResourceConflict
+from .exceptions import ResourceNotFound, ValidationError, DependencyError, ResourceConflict
 from .security import AuthError, JWT_ALGORITHM, jwt
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi.util import get_remote_address
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import PlainTextResponse
-from sqlalchemy import func, select
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy import Select, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .config import get_settings
-from .db import Base, engine, get_session
+from .db import (
+    AsyncSessionLocal,
+    engine,
+    get_read_session,
+    get_session,
+    insert_ignore,
+    read_engine,
+    replica_status,
+)
+from .middleware import RequestContextMiddleware
+from .migrations import ensure_schema
+from .idempotency import idempotency_store, request_fingerprint
+from .integrations.circuit_breaker import breakers
+from .integrations.executor import integration_executor
 from .integrations.google_calendar import add_attendees, create_meet_event
-from .integrations.mailer import send_email
-from .integrations.stripe_flow import create_checkout_session
+from .integrations.stripe_flow import create_checkout_session, is_placeholder_url, load_stripe
 from .scheduler import start_scheduler
+from .scheduling import bulk_create_sessions, expand_series, load_interval_index, partition_conflicts
 from .security import make_admin_token, require_admin
-from .models import Enrollment, Metric, Parent, Session, Student
+from .models import Enrollment, JobRun, Metric, Parent, Report, Session, Student, WaitlistEntry, WebhookEvent
+from .calendar_feed import calendar_feeds, new_calendar_token
+from .dashboard import load_parent_dashboard, new_portal_token, parent_for_portal_token
+from .profiles import bulk_upsert_profiles
+from .outbox import email_outbox
+from .pubsub import seat_broker
+from .seats import (
+    SEAT_HOLDING_JOIN,
+    SEAT_HOLDING_STATUSES,
+    checkout_hold_expiry,
+    count_active_enrollments,
+    promote_waitlist,
+    publish_seat_counts,
+    waitlist_position,
+)
 from .schemas import (
     AdminLoginIn,
     AvailabilityQuery,
@@ -55,19 +84,25 @@ from .schemas import (
     CheckoutOut,
     ContactIn,
     MetricOut,
+    ParentDashboardOut,
+    ReportOut,
     ParentUpsertIn,
+    ProfileBulkIn,
+    ProfileBulkOut,
     ResendIn,
+    SessionBatchIn,
     SessionCreate,
     SessionOut,
+    SessionSeriesIn,
+    SessionSeriesOut,
+    SlotConflict,
+    WaitlistJoinIn,
+    WaitlistOut,
 )
-from .utils.email_templates import confirmation_email_html
-from .utils.ics import ics_data_url, make_ics
-
-try:  # Optional dependency handling mirrors stripe helper
-    import stripe  # type: ignore
-except ImportError:  # pragma: no cover - optional dependency
-    stripe = None  # type: ignore
-
+from .utils.email_templates import session_confirmation_email_html
+from .utils.etags import etag_matches, make_etag
+from .utils.serialization import FastJSONResponse
+from .webhooks import WebhookInbox
 
 logging.basicConfig(stream=sys.stdout, level=logging.INFO, format="%(message)s")
 
@@ -82,10 +117,15 @@ settings = get_settings()
 
 sentry_dsn = settings.sentry_dsn or os.getenv("SENTRY_DSN", "")
 if sentry_dsn:
+    import sentry_sdk
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+
     sentry_sdk.init(dsn=sentry_dsn, integrations=[FastApiIntegration()])
 
 app = FastAPI(title="Serenity's Keys Backend", version="0.2.0")
 
+webhook_inbox = WebhookInbox(AsyncSessionLocal)
+
 # Configure rate limiting with different rules for various endpoints
 def get_client_key(request: Request) -> str:
     forwarded = request.headers.get("X-Forwarded-For")
@@ -121,7 +161,8 @@ allow_headers = [
     "Content-Type",
     "X-Request-ID",
     "X-CSRF-Token",
-    "Stripe-Signature"
+    "Stripe-Signature",
+    "Idempotency-Key",
 ]
 
 if settings.app_env.lower() in {"dev", "development"}:
@@ -135,89 +176,37 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=allow_methods,
     allow_headers=allow_headers,
-    expose_headers=["X-Request-ID"],
+    expose_headers=["X-Request-ID", "Idempotent-Replayed"],
     max_age=3600  # Cache preflight requests for 1 hour
 )
 
-@app.middleware("http")
-async def add_request_id(request: Request, call_next):
-    request_id = request.headers.get("x-request-id") or str(uuid.uuid4())
-    response: Response = await call_next(request)
-    response.headers["x-request-id"] = request_id
-    return response
-
-@app.middleware("http")
-async def error_handling_middleware(request: Request, call_next):
-    try:
-        return await call_next(request)
-    except BaseAPIException as exc:
-        logger.error(
-            "API Error: %s",
-            exc.detail,
-            extra={
-                "error_code": exc.error_code,
-                "path": request.url.path,
-                "extra": exc.extra
-            }
-        )
-        return JSONResponse(
-            status_code=exc.status_code,
-            content={
-                "error": True,
-                "code": exc.error_code,
-                "message": exc.detail,
-                "details": exc.extra
-            }
-        )
-    except HTTPException as exc:
-        logger.error(
-            "HTTP Error: %s",
-            exc.detail,
-            extra={"path": request.url.path}
-        )
-        return JSONResponse(
-            status_code=exc.status_code,
-            content={
-                "error": True,
-                "code": "HTTP_ERROR",
-                "message": exc.detail
-            }
-        )
-    except Exception as exc:
-        logger.exception(
-            "Unhandled error: %s",
-            str(exc),
-            extra={"path": request.url.path}
-        )
-        if settings.app_env.lower() in {"dev", "development"}:
-            return JSONResponse(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                content={
-                    "error": True,
-                    "code": "INTERNAL_SERVER_ERROR",
-                    "message": str(exc),
-                    "type": type(exc).__name__
-                }
-            )
-        return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={
-                "error": True,
-                "code": "INTERNAL_SERVER_ERROR",
-                "message": "An unexpected error occurred"
-            }
-        )
+app.add_middleware(
+    RequestContextMiddleware,
+    log_event=log,
+    expose_errors=settings.app_env.lower() in {"dev", "development"},
+)
 
 
 @app.on_event("startup")
 async def on_startup() -> None:
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    logger.info("Database tables ensured via create_all().")
+    await ensure_schema(engine, settings.schema_check)
+    seat_broker.start()
+    webhook_inbox.start()
+    email_outbox.start()
     if settings.app_env.lower() in {"prod", "production", "prod_primary"}:
         start_scheduler(app)
 
 
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await webhook_inbox.stop()
+    await email_outbox.stop()
+    await seat_broker.stop()
+    integration_executor.shutdown()
+    if read_engine is not None:
+        await read_engine.dispose()
+
+
 async def check_db_connection(db: AsyncSession) -> bool:
     try:
         # Test query to verify database connection
@@ -228,10 +217,15 @@ async def check_db_connection(db: AsyncSession) -> bool:
         return False
 
 async def check_dependencies() -> dict[str, dict[str, Any]]:
+    try:
+        # Package metadata rather than ``import stripe``: the SDK stays unloaded until checkout needs it.
+        stripe_version: Optional[str] = package_version("stripe")
+    except PackageNotFoundError:
+        stripe_version = None
     dependencies = {
         "stripe": {
-            "status": "ok" if stripe else "not_configured",
-            "version": stripe.__version__ if stripe else None
+            "status": "ok" if stripe_version else "not_configured",
+            "version": stripe_version
         },
         "sentry": {
             "status": "ok" if sentry_dsn else "not_configured"
@@ -243,6 +237,12 @@ async def check_dependencies() -> dict[str, dict[str, Any]]:
             "status": "ok" if settings.google_calendar_id else "not_configured"
         }
     }
+    circuit_for = {"stripe": "stripe", "email": "mailer", "google_calendar": "google_calendar"}
+    for dep, breaker_name in circuit_for.items():
+        circuit = breakers[breaker_name].state
+        dependencies[dep]["circuit"] = circuit
+        if dependencies[dep]["status"] == "ok" and circuit != "closed":
+            dependencies[dep]["status"] = "degraded"
     return dependencies
 
 @app.get("/health")
@@ -259,84 +259,115 @@ async def healthcheck(db: AsyncSession = Depends(get_session)) -> dict[str, Any]
         "environment": settings.app_env,
         "database": {
             "status": "ok" if db_healthy else "error",
-            "type": "postgresql"
+            "type": "postgresql",
+            "read_replica": replica_status(),
         },
-        "dependencies": deps
+        "dependencies": deps,
+        "integration_executor": integration_executor.snapshot(),
+        "circuit_breakers": {name: breaker.snapshot() for name, breaker in breakers.items()},
     }
 
 
 @app.post("/api/availability", response_model=list[SessionOut])
 async def availability(
     query: AvailabilityQuery,
-    db: AsyncSession = Depends(get_session),
-) -> list[SessionOut]:
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_read_session),
+) -> list[SessionOut] | Response:
     if query.start_date and query.end_date and query.start_date > query.end_date:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start_date must be on or before end_date")
 
-    tz = settings.timezone_info
-    start_date = query.start_date or datetime.now(tz).date()
-    end_date = query.end_date or (start_date + timedelta(days=30))
-    start_dt = datetime.combine(start_date, time.min, tzinfo=tz)
-    end_dt = datetime.combine(end_date, time.max, tzinfo=tz)
+    start_dt, end_dt = _availability_window(query.start_date, query.end_date)
 
-    stmt = (
-        select(Session, func.count(Enrollment.id))
-        .outerjoin(Enrollment)
-        .where(Session.start_ts >= start_dt, Session.start_ts <= end_dt)
-        .where(Session.status == "scheduled")
-        .group_by(Session.id)
-        .order_by(Session.start_ts.asc())
-    )
-    if query.course:
-        stmt = stmt.where(Session.course == query.course)
+    # Every seat change bumps Session.version, so the (id, version) pairs of
+    # the window identify the response without joining enrollments.
+    versions = (await db.execute(availability_versions_stmt(start_dt, end_dt, query.course))).all()
+    etag = make_etag("availability", start_dt.isoformat(), end_dt.isoformat(), query.course, *versions)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
-    result = await db.execute(stmt)
-    sessions: list[SessionOut] = []
-    for session_obj, enrollment_count in result.all():
-        seats_available = max(session_obj.capacity - (enrollment_count or 0), 0)
-        sessions.append(
-            SessionOut.model_validate(
-                {
-                    "id": session_obj.id,
-                    "course": session_obj.course,
-                    "start_ts": session_obj.start_ts,
-                    "end_ts": session_obj.end_ts,
-                    "mode": session_obj.mode,
-                    "capacity": session_obj.capacity,
-                    "location": session_obj.location,
-                    "meet_link": session_obj.meet_link,
-                    "status": session_obj.status,
-                    "seats_available": seats_available,
-                }
-            )
-        )
-    return sessions
+    result = await db.execute(availability_stmt(start_dt, end_dt, query.course))
+    return FastJSONResponse(_session_payload(result.all()), headers={"ETag": etag})
+
+
+@app.get("/api/availability/stream")
+async def availability_stream(
+    course: Optional[str] = Query(default=None),
+    start_date: Optional[date] = Query(default=None),
+    end_date: Optional[date] = Query(default=None),
+) -> StreamingResponse:
+    """Server-sent events carrying seat counts as enrollments change."""
+
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start_date must be on or before end_date")
+    start_dt, end_dt = _availability_window(start_date, end_date)
+    subscription = seat_broker.subscribe(course, start_dt, end_dt)
+
+    async def events():
+        # Heartbeats follow the clock, not the queue: a stream that is busy with
+        # updates still sends one every heartbeat_seconds.
+        loop = asyncio.get_running_loop()
+        heartbeat_at = loop.time() + seat_broker.heartbeat_seconds
+        try:
+            yield "retry: 5000\n\n"
+            while not subscription.closed or subscription.pending:
+                update = await subscription.get(timeout=max(heartbeat_at - loop.time(), 0))
+                if loop.time() >= heartbeat_at:
+                    heartbeat_at = loop.time() + seat_broker.heartbeat_seconds
+                    yield ": keep-alive\n\n"
+                if update is not None:
+                    data = json.dumps({"session_id": update.session_id, "seats_available": update.seats_available})
+                    yield f"event: seats\ndata: {data}\n\n"
+        finally:
+            seat_broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/api/sessions/{session_id}", response_model=SessionOut)
-async def get_session_detail(session_id: int, db: AsyncSession = Depends(get_session)) -> SessionOut:
+async def get_session_detail(
+    session_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_read_session),
+) -> SessionOut | Response:
+    version = (await db.execute(select(Session.version).where(Session.id == session_id))).scalar_one_or_none()
+    if version is None:
+        raise ResourceNotFound("Session", session_id)
+    etag = make_etag("session", session_id, version)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     session_obj = await db.get(Session, session_id)
     if not session_obj:
         raise ResourceNotFound("Session", session_id)
 
-    enrollment_count = await _count_enrollments(db, session_obj.id)
-    seats_available = max(session_obj.capacity - enrollment_count, 0)
-    return SessionOut.model_validate(
-        {
-            "id": session_obj.id,
-            "course": session_obj.course,
-            "start_ts": session_obj.start_ts,
-            "end_ts": session_obj.end_ts,
-            "mode": session_obj.mode,
-            "capacity": session_obj.capacity,
-            "location": session_obj.location,
-            "meet_link": session_obj.meet_link,
-            "status": session_obj.status,
-            "seats_available": seats_available,
-        }
-    )
+    enrollment_count = await count_active_enrollments(db, session_obj.id)
+    return _session_out(session_obj, enrollment_count)
 
 
+@app.post("/api/sessions/batch", response_model=list[SessionOut])
+async def get_sessions_batch(
+    body: SessionBatchIn,
+    db: AsyncSession = Depends(get_read_session),
+) -> list[SessionOut] | Response:
+    """Return many sessions with seat counts in one query; unknown ids are omitted."""
+
+    stmt = (
+        select(*SESSION_OUT_COLUMNS, func.count(Enrollment.id))
+        .outerjoin(Enrollment, SEAT_HOLDING_JOIN)
+        .where(Session.id.in_(set(body.ids)))
+        .group_by(Session.id)
+    )
+    found = {item["id"]: item for item in _session_payload((await db.execute(stmt)).all())}
+    ordered_ids = dict.fromkeys(body.ids)
+    return FastJSONResponse([found[session_id] for session_id in ordered_ids if session_id in found])
+
 
 @app.post("/api/profile/upsert")
 async def upsert_profile(
@@ -344,8 +375,7 @@ async def upsert_profile(
     db: AsyncSession = Depends(get_session),
 ) -> dict[str, int]:
     normalized_email = body.parent_email.strip().lower()
-    parent_stmt = select(Parent).where(func.lower(Parent.email) == normalized_email)
-    parent = (await db.execute(parent_stmt)).scalars().first()
+    parent = (await db.execute(parent_by_email_stmt(normalized_email))).scalars().first()
 
     if parent:
         parent.name = body.parent_name.strip()
@@ -384,13 +414,43 @@ async def upsert_profile(
     return {"parent_id": parent.id, "student_id": student.id}
 
 
+CHECKOUT_IDEMPOTENCY_SCOPE = "booking_checkout"
+
+
 @app.post("/api/booking/checkout", response_model=CheckoutOut)
 @limiter.limit("30/hour")
 async def booking_checkout(
+    request: Request,
     payload: CheckoutIn,
+    response: Response,
+    idempotency_key: Optional[str] = Header(default=None, min_length=1, max_length=255),
     db: AsyncSession = Depends(get_session),
 ) -> CheckoutOut:
-    session_obj = await db.get(Session, payload.session_id)
+    if not idempotency_key:
+        return await _start_checkout(payload, db)
+
+    # Double clicks and refreshes resend the same key: replay the first
+    # response instead of creating another Stripe Checkout session.
+    request_hash = request_fingerprint(payload.model_dump_json())
+    async with idempotency_store.lock(CHECKOUT_IDEMPOTENCY_SCOPE, idempotency_key):
+        stored = await idempotency_store.lookup(db, CHECKOUT_IDEMPOTENCY_SCOPE, idempotency_key, request_hash)
+        if stored is not None:
+            response.headers["Idempotent-Replayed"] = "true"
+            return CheckoutOut(**stored)
+        return await _start_checkout(payload, db, idempotency=(idempotency_key, request_hash))
+
+
+async def _start_checkout(
+    payload: CheckoutIn,
+    db: AsyncSession,
+    idempotency: Optional[tuple[str, str]] = None,
+) -> CheckoutOut:
+    # Same row lock as seats.promote_waitlist, so concurrent checkouts and
+    # waitlist promotions count free seats one at a time. SQLite has no row
+    # locks; the tuned profile sends FOR UPDATE reads to its single writer instead.
+    session_obj = (
+        await db.execute(select(Session).where(Session.id == payload.session_id).with_for_update())
+    ).scalar_one_or_none()
     if not session_obj:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
 
@@ -407,46 +467,56 @@ async def booking_checkout(
             student.typing_username = normalized_username
             db.add(student)
 
-    enrolled_count = await _count_enrollments(db, session_obj.id)
-    if enrolled_count >= session_obj.capacity:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Session is full")
-
     enrollment_stmt = select(Enrollment).where(
         Enrollment.session_id == session_obj.id,
         Enrollment.student_id == student.id,
     )
     existing_enrollment = (await db.execute(enrollment_stmt)).scalar_one_or_none()
 
-    if existing_enrollment:
+    if existing_enrollment and existing_enrollment.status in SEAT_HOLDING_STATUSES:
+        # Already holding a seat (e.g. promoted from the waitlist); keep its hold.
         enrollment = existing_enrollment
     else:
-        enrollment = Enrollment(
-            student_id=student.id,
-            session_id=session_obj.id,
-            status="pending",
-            payment_status="pending",
-        )
-        db.add(enrollment)
+        enrolled_count = await count_active_enrollments(db, session_obj.id)
+        if enrolled_count >= session_obj.capacity:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Session is full; join the waitlist to be offered the next free seat",
+            )
+        if existing_enrollment:
+            enrollment = existing_enrollment
+        else:
+            enrollment = Enrollment(student_id=student.id, session_id=session_obj.id)
+            db.add(enrollment)
+        enrollment.status = "pending"
+        enrollment.payment_status = "pending"
+        enrollment.hold_expires_at = checkout_hold_expiry()
+        await _bump_session_version(db, session_obj.id)
+
+    # Commit the hold before calling Google and Stripe: this releases the row
+    # lock and, on tuned SQLite, the single writer connection, so other writes
+    # don't queue behind external latency. An abandoned hold simply expires.
+    await db.commit()
 
+    meet_link: Optional[str] = None
+    event_id: Optional[str] = None
     if not session_obj.meet_link or not session_obj.calendar_event_id:
-        meet_link, event_id = create_meet_event(
+        meet_link, event_id = await integration_executor.run(
+            "google_calendar.create_meet_event",
+            create_meet_event,
             summary=f"Serenity's Keys - {session_obj.course}",
             start_ts=session_obj.start_ts,
             end_ts=session_obj.end_ts,
             attendees=[],
         )
-        if meet_link:
-            session_obj.meet_link = meet_link
-        if event_id:
-            session_obj.calendar_event_id = event_id
-        db.add(session_obj)
 
-    await db.flush()
     extra_meta: dict[str, str] = {}
     if payload.typing_username:
         extra_meta["typing_username"] = payload.typing_username.strip()
 
-    checkout_url = create_checkout_session(
+    checkout_url = await integration_executor.run(
+        "stripe.create_checkout_session",
+        create_checkout_session,
         amount_cents=payload.amount_cents,
         success_url=payload.success_url,
         cancel_url=payload.cancel_url,
@@ -456,13 +526,92 @@ async def booking_checkout(
         extra_metadata=extra_meta,
     )
 
+    if meet_link or event_id:
+        if meet_link:
+            session_obj.meet_link = meet_link
+        if event_id:
+            session_obj.calendar_event_id = event_id
+        db.add(session_obj)
+        await _bump_session_version(db, session_obj.id)
+
+    result = {"checkout_url": checkout_url, "enrollment_id": enrollment.id}
+    # A placeholder means Stripe was skipped (unconfigured, breaker open or failing). Don't
+    # replay it: a retry with the same key should get a real session once Stripe recovers.
+    replayable = idempotency is not None and not is_placeholder_url(checkout_url)
+    if replayable:
+        await idempotency_store.save(db, CHECKOUT_IDEMPOTENCY_SCOPE, *idempotency, result)
+    await db.commit()
+    if replayable:
+        idempotency_store.remember(CHECKOUT_IDEMPOTENCY_SCOPE, *idempotency, result)
+    await _publish_seat_change(db, session_obj)
+    return CheckoutOut(**result)
+
+
+@app.post("/api/sessions/{session_id}/waitlist", response_model=WaitlistOut, status_code=status.HTTP_201_CREATED)
+@limiter.limit("30/hour")
+async def join_waitlist(
+    request: Request,
+    session_id: int,
+    body: WaitlistJoinIn,
+    db: AsyncSession = Depends(get_session),
+) -> WaitlistOut:
+    """Queue a student for a full session; joining twice returns the existing entry."""
+
+    session_obj = await db.get(Session, session_id)
+    if not session_obj:
+        raise ResourceNotFound("Session", session_id)
+    if session_obj.status != "scheduled":
+        raise ResourceConflict("Session not open for booking")
+    if not await db.get(Student, body.student_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Student not found")
+
+    enrollment_status = (
+        await db.execute(
+            select(Enrollment.status).where(Enrollment.session_id == session_id, Enrollment.student_id == body.student_id)
+        )
+    ).scalar_one_or_none()
+    if enrollment_status in SEAT_HOLDING_STATUSES:
+        raise ResourceConflict("Student already holds a seat in this session")
+    if await count_active_enrollments(db, session_id) < session_obj.capacity:
+        raise ResourceConflict("Session has open seats; book it directly")
+
+    await db.execute(
+        insert_ignore(db, WaitlistEntry, ["session_id", "student_id"]).values(
+            session_id=session_id,
+            student_id=body.student_id,
+            status="waiting",
+            created_at=datetime.now(timezone.utc),
+        )
+    )
+    # A previously promoted or withdrawn entry goes to the back of the line.
+    entry = (
+        await db.execute(
+            select(WaitlistEntry).where(WaitlistEntry.session_id == session_id, WaitlistEntry.student_id == body.student_id)
+        )
+    ).scalar_one()
+    if entry.status != "waiting":
+        await db.delete(entry)
+        await db.flush()
+        entry = WaitlistEntry(session_id=session_id, student_id=body.student_id, status="waiting")
+        db.add(entry)
+        await db.flush()
     await db.commit()
-    return CheckoutOut(checkout_url=checkout_url, enrollment_id=enrollment.id)
+
+    log("waitlist_joined", session_id=session_id, student_id=body.student_id, entry_id=entry.id)
+    return WaitlistOut(
+        id=entry.id,
+        session_id=session_id,
+        student_id=body.student_id,
+        status=entry.status,
+        position=await waitlist_position(db, entry.id, session_id),
+    )
 
 
 @app.post("/webhooks/stripe")
 @limiter.limit("60/minute")
 async def stripe_webhook(request: Request, db: AsyncSession = Depends(get_session)) -> dict[str, str]:
+    """Verify and enqueue a Stripe event; WebhookInbox does the actual work."""
+
     payload = await request.body()
     sig_header = request.headers.get("Stripe-Signature", "")
 
@@ -470,16 +619,17 @@ async def stripe_webhook(request: Request, db: AsyncSession = Depends(get_sessio
 
     use_dev_mode = settings.app_env.lower() == "dev"
     if not use_dev_mode:
-        if not (settings.stripe_webhook_secret and stripe):
+        stripe = load_stripe() if settings.stripe_webhook_secret else None
+        if stripe is None:
             logger.error("Stripe webhook secret or library missing in non-dev environment")
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Stripe webhook verification disabled")
         try:
-            event = stripe.Webhook.construct_event(
+            stripe.Webhook.construct_event(
                 payload=payload,
                 sig_header=sig_header,
                 secret=settings.stripe_webhook_secret,
             )
-            event_data = event  # type: ignore[assignment]
+            event_data = json.loads(payload)
         except Exception as exc:  # pragma: no cover - passthrough
             logger.warning("Stripe webhook signature verification failed: %s", exc)
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid signature")
@@ -490,18 +640,33 @@ async def stripe_webhook(request: Request, db: AsyncSession = Depends(get_sessio
             logger.error("Unable to decode webhook payload: %s", exc)
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid payload")
 
-    event_type = event_data.get("type") if isinstance(event_data, dict) else None
-    if event_type == "checkout.session.completed":
-        await _handle_checkout_completed(event_data, db)
+    if not isinstance(event_data, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid payload")
+
+    # Dev payloads are hand-written and may lack an id; hash the body so
+    # replays still deduplicate.
+    event_id = event_data.get("id") or f"dev_{hashlib.sha256(payload).hexdigest()}"
+    stmt = insert_ignore(db, WebhookEvent, ["event_id"]).values(
+        event_id=event_id,
+        type=str(event_data.get("type") or "unknown"),
+        payload=event_data,
+        status="pending",
+        attempts=0,
+        received_at=datetime.now(timezone.utc),
+    )
+    result = await db.execute(stmt)
+    await db.commit()
+    if result.rowcount:
+        webhook_inbox.notify()
     else:
-        logger.info("Unhandled Stripe webhook type: %s", event_type)
+        logger.info("Duplicate Stripe webhook ignored: %s", event_id)
 
     return {"status": "ok"}
 
 
 @app.post("/api/contact")
 @limiter.limit("5/minute")
-async def submit_contact_form(payload: ContactIn) -> dict[str, str]:
+async def submit_contact_form(request: Request, payload: ContactIn) -> dict[str, str]:
     recipient = settings.contact_inbox_email or settings.from_email
     if not recipient:
         logger.error("CONTACT_INBOX_EMAIL not configured; unable to route contact form")
@@ -517,9 +682,9 @@ async def submit_contact_form(payload: ContactIn) -> dict[str, str]:
     )
 
     try:
-        await send_email(recipient, subject, html)
-        log("contact_message_received", name=payload.name, email=payload.email)
-    except Exception as exc:  # pragma: no cover - external service failures
+        sent = await email_outbox.deliver(recipient, subject, html)
+        log("contact_message_received", name=payload.name, email=payload.email, queued=not sent)
+    except Exception as exc:  # pragma: no cover - outbox write failed
         logger.error("Unable to deliver contact inquiry email: %s", exc)
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Unable to deliver message")
 
@@ -559,8 +724,7 @@ async def import_typing_metrics(
 
         student = None
         if username_value:
-            stmt = select(Student).where(func.lower(Student.typing_username) == username_value.lower())
-            student = (await db.execute(stmt)).scalar_one_or_none()
+            student = (await db.execute(student_by_username_stmt(username_value))).scalar_one_or_none()
         if not student and name_value:
             student = await _get_or_create_student(db, name_value)
         if not student:
@@ -591,25 +755,178 @@ async def import_typing_metrics(
 @app.get("/api/students/{student_id}/metrics", response_model=list[MetricOut])
 async def list_student_metrics(
     student_id: int,
-    db: AsyncSession = Depends(get_session),
-) -> list[MetricOut]:
-    stmt = (
-        select(Metric)
-        .where(Metric.student_id == student_id)
-        .order_by(Metric.date.desc(), Metric.id.desc())
-    )
-    result = await db.execute(stmt)
-    metrics = result.scalars().all()
-    if not metrics:
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_read_session),
+) -> list[MetricOut] | Response:
+    # Metrics are append-only, so the row count and newest id version the list.
+    metric_count, latest_id = (
+        await db.execute(
+            select(func.count(Metric.id), func.max(Metric.id)).where(Metric.student_id == student_id)
+        )
+    ).one()
+    if not metric_count:
         student = await db.get(Student, student_id)
         if not student:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
-    return [MetricOut.model_validate(metric) for metric in metrics]
+        return FastJSONResponse([])
+
+    etag = make_etag("metrics", student_id, metric_count, latest_id)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    rows = (await db.execute(student_metrics_stmt(student_id))).all()
+    return FastJSONResponse([dict(zip(METRIC_OUT_FIELDS, row)) for row in rows], headers={"ETag": etag})
+
+
+REPORT_OUT_COLUMNS = (
+    Report.id,
+    Report.student_id,
+    Report.period_start,
+    Report.period_end,
+    Report.summary_text,
+    Report.pdf_url,
+    Report.generated_at,
+)
+REPORT_OUT_FIELDS = [column.key for column in REPORT_OUT_COLUMNS]
+
+
+# Report HTML is served from the API origin; forbid scripts and anything else active
+# in it, including reports stored before template values were escaped.
+REPORT_HTML_HEADERS = {
+    "Content-Security-Policy": "default-src 'none'; style-src 'unsafe-inline'",
+    "X-Content-Type-Options": "nosniff",
+}
+
+
+async def _student_reports_response(
+    db: AsyncSession, student_id: int, if_none_match: Optional[str]
+) -> list[ReportOut] | Response:
+    # Reports are written once per period and never updated.
+    report_count, latest_id = (
+        await db.execute(select(func.count(Report.id), func.max(Report.id)).where(Report.student_id == student_id))
+    ).one()
+    if not report_count:
+        if not await db.get(Student, student_id):
+            raise ResourceNotFound("Student", student_id)
+        return FastJSONResponse([])
+
+    etag = make_etag("reports", student_id, report_count, latest_id)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    rows = (await db.execute(student_reports_stmt(student_id))).all()
+    return FastJSONResponse([dict(zip(REPORT_OUT_FIELDS, row)) for row in rows], headers={"ETag": etag})
+
+
+async def _report_html_response(
+    db: AsyncSession, report_id: int, if_none_match: Optional[str], *, parent_id: Optional[int] = None
+) -> Response:
+    stmt = select(Report.html, Report.generated_at).where(Report.id == report_id)
+    if parent_id is not None:
+        stmt = stmt.join(Student, Student.id == Report.student_id).where(Student.parent_id == parent_id)
+    row = (await db.execute(stmt)).one_or_none()
+    if row is None or row.html is None:
+        raise ResourceNotFound("Report", report_id)
+    etag = make_etag("report", report_id, row.generated_at)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return HTMLResponse(row.html, headers={"ETag": etag, **REPORT_HTML_HEADERS})
+
+
+@app.get("/api/students/{student_id}/reports", response_model=list[ReportOut])
+async def list_student_reports(
+    student_id: int,
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_read_session),
+    _: dict[str, Any] = Depends(require_admin),
+) -> list[ReportOut] | Response:
+    return await _student_reports_response(db, student_id, if_none_match)
+
+
+@app.get("/api/reports/{report_id}", response_class=HTMLResponse)
+async def get_report_html(
+    report_id: int,
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_read_session),
+    _: dict[str, Any] = Depends(require_admin),
+) -> Response:
+    return await _report_html_response(db, report_id, if_none_match)
+
+
+@app.get("/api/portal/{token}/students/{student_id}/reports", response_model=list[ReportOut])
+async def list_portal_student_reports(
+    token: str,
+    student_id: int,
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_read_session),
+) -> list[ReportOut] | Response:
+    """A student's reports, for the parent holding the portal token."""
+
+    parent_id = await parent_for_portal_token(db, token)
+    if parent_id is None:
+        raise ResourceNotFound("Portal", token)
+    student = await db.get(Student, student_id)
+    if student is None or student.parent_id != parent_id:
+        raise ResourceNotFound("Student", student_id)
+    return await _student_reports_response(db, student_id, if_none_match)
+
+
+@app.get("/api/portal/{token}/reports/{report_id}", response_class=HTMLResponse)
+async def get_portal_report_html(
+    token: str,
+    report_id: int,
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """One report's HTML, if it belongs to a child of the parent holding the portal token."""
+
+    parent_id = await parent_for_portal_token(db, token)
+    if parent_id is None:
+        raise ResourceNotFound("Portal", token)
+    return await _report_html_response(db, report_id, if_none_match, parent_id=parent_id)
+
+
+@app.get("/api/portal/{token}/dashboard", response_model=ParentDashboardOut)
+async def get_parent_dashboard(token: str, db: AsyncSession = Depends(get_read_session)) -> dict[str, Any]:
+    """Students, upcoming enrollments and metric summaries for one family, in a fixed number of queries."""
+
+    dashboard = await load_parent_dashboard(db, token)
+    if dashboard is None:
+        raise ResourceNotFound("Portal", token)
+    return dashboard
+
+
+@app.get("/api/calendar/{token}.ics")
+async def parent_calendar_feed(
+    token: str,
+    if_none_match: Optional[str] = Header(default=None),
+    if_modified_since: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_read_session),
+) -> Response:
+    parent_id = await calendar_feeds.parent_for_token(db, token)
+    if parent_id is None:
+        raise ResourceNotFound("Calendar", token)
+
+    etag, rows = await calendar_feeds.load(db, parent_id)
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=300"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    feed = calendar_feeds.render(parent_id, etag, rows)
+    headers["Last-Modified"] = format_datetime(feed.last_modified, usegmt=True)
+    # If-None-Match takes precedence; only fall back to the date for clients without ETags.
+    if if_none_match is None and if_modified_since:
+        try:
+            if parsedate_to_datetime(if_modified_since) >= feed.last_modified:
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        except (TypeError, ValueError):
+            pass
+    return Response(feed.body, media_type="text/calendar", headers=headers)
 
 
 @app.post("/api/admin/login")
 @limiter.limit("5/minute")
-async def admin_login(body: AdminLoginIn) -> dict[str, Any]:
+async def admin_login(request: Request, body: AdminLoginIn) -> dict[str, Any]:
     if body.password != settings.admin_api_token:
         raise AuthError("Invalid credentials")
     
@@ -657,29 +974,103 @@ async def admin_update_typing_links(
 
 @app.get("/api/admin/sessions")
 async def admin_list_sessions(
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
     claims: dict[str, Any] = Depends(require_admin),
-) -> list[dict[str, Any]]:
-    now = datetime.utcnow()
-    stmt = (
-        select(Session)
-        .where(Session.start_ts >= now)
-        .order_by(Session.start_ts.asc())
+) -> Response:
+    rows = (await db.execute(upcoming_sessions_stmt(datetime.utcnow()))).all()
+    return FastJSONResponse([dict(zip(ADMIN_SESSION_FIELDS, row)) for row in rows])
+
+
+@app.get("/api/admin/job-runs")
+async def admin_list_job_runs(
+    job_name: Optional[str] = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_session),
+    claims: dict[str, Any] = Depends(require_admin),
+) -> Response:
+    columns = (
+        JobRun.id,
+        JobRun.job_name,
+        JobRun.worker,
+        JobRun.status,
+        JobRun.started_at,
+        JobRun.finished_at,
+        JobRun.duration_ms,
+        JobRun.items_processed,
+        JobRun.error,
     )
-    sessions = (await db.execute(stmt)).scalars().all()
-    return [
-        {
-            "id": sess.id,
-            "course": sess.course,
-            "start_ts": sess.start_ts.isoformat(),
-            "end_ts": sess.end_ts.isoformat(),
-            "capacity": sess.capacity,
-            "status": sess.status,
-            "calendar_event_id": sess.calendar_event_id,
-            "meet_link": sess.meet_link,
-        }
-        for sess in sessions
-    ]
+    stmt = select(*columns).order_by(JobRun.started_at.desc(), JobRun.id.desc()).limit(limit)
+    if job_name:
+        stmt = stmt.where(JobRun.job_name == job_name)
+    fields = [column.key for column in columns]
+    rows = (await db.execute(stmt)).all()
+    return FastJSONResponse([dict(zip(fields, row)) for row in rows])
+
+
+@app.post("/api/admin/profiles/bulk", response_model=ProfileBulkOut)
+async def admin_bulk_upsert_profiles(
+    body: ProfileBulkIn,
+    db: AsyncSession = Depends(get_session),
+    _: dict[str, Any] = Depends(require_admin),
+) -> ProfileBulkOut:
+    """Upsert many parent/student pairs in one transaction; rows that fail are reported, not applied."""
+
+    results = await bulk_upsert_profiles(db, body.profiles)
+    await db.commit()
+
+    # Rows repeating an email or student id touch the same record; count records, not rows.
+    parents = {result["parent_id"]: result["parent_status"] for result in results if "parent_id" in result}
+    students = {result["student_id"]: result["student_status"] for result in results if "student_id" in result}
+    outcome = ProfileBulkOut(
+        created_parents=sum(1 for value in parents.values() if value == "created"),
+        updated_parents=sum(1 for value in parents.values() if value == "updated"),
+        created_students=sum(1 for value in students.values() if value == "created"),
+        updated_students=sum(1 for value in students.values() if value == "updated"),
+        failed=sum(1 for result in results if "error" in result),
+        results=results,
+    )
+    log(
+        "admin_bulk_upsert_profiles",
+        rows=len(results),
+        created_parents=outcome.created_parents,
+        created_students=outcome.created_students,
+        failed=outcome.failed,
+    )
+    return outcome
+
+
+@app.post("/api/admin/parents/{parent_id}/calendar-token")
+async def admin_issue_calendar_token(
+    parent_id: int,
+    request: Request,
+    rotate: bool = Query(default=False),
+    db: AsyncSession = Depends(get_session),
+    _: dict[str, Any] = Depends(require_admin),
+) -> dict[str, str]:
+    parent = await db.get(Parent, parent_id)
+    if not parent:
+        raise ResourceNotFound("Parent", parent_id)
+    if parent.calendar_token is None or rotate:
+        parent.calendar_token = new_calendar_token()
+        await db.commit()
+    return {"calendar_url": str(request.url_for("parent_calendar_feed", token=parent.calendar_token))}
+
+
+@app.post("/api/admin/parents/{parent_id}/portal-token")
+async def admin_issue_portal_token(
+    parent_id: int,
+    request: Request,
+    rotate: bool = Query(default=False),
+    db: AsyncSession = Depends(get_session),
+    _: dict[str, Any] = Depends(require_admin),
+) -> dict[str, str]:
+    parent = await db.get(Parent, parent_id)
+    if not parent:
+        raise ResourceNotFound("Parent", parent_id)
+    if parent.portal_token is None or rotate:
+        parent.portal_token = new_portal_token()
+        await db.commit()
+    return {"dashboard_url": str(request.url_for("get_parent_dashboard", token=parent.portal_token))}
 
 
 @app.post("/api/admin/resend-confirmation")
@@ -697,31 +1088,57 @@ async def admin_resend_confirmation(
     meet_link = session_obj.meet_link or "https://meet.google.com/dev-placeholder"
     launchpad_url = f"{settings.launchpad_base_url}?session_id={session_obj.id}&student_id={student.id}"
 
-    ics_content = make_ics(
-        uid=f"sk-{session_obj.id}-{student.id}",
-        title=f"Serenity's Keys - {session_obj.course}",
+    html = session_confirmation_email_html(
+        session_id=session_obj.id,
+        version=session_obj.version,
+        course=session_obj.course,
         start=session_obj.start_ts,
         end=session_obj.end_ts,
-        meet_url=meet_link,
-    )
-    ics_link = ics_data_url(ics_content)
-
-    html = confirmation_email_html(
+        meet_link=meet_link,
+        typing_class_link=None,
+        student_id=student.id,
         parent_name=parent.name if parent else None,
         child_name=student.name if student else None,
-        when=session_obj.start_ts,
-        meet_link=meet_link,
         launchpad_url=launchpad_url,
-        ics_link=ics_link,
     )
 
-    await send_email(
+    sent = await email_outbox.deliver(
         to=parent.email,
         subject="Serenity's Keys: Your session is confirmed",
         html=html,
     )
-    log("admin_resend_confirmation", session_id=session_obj.id, student_id=student.id)
-    return {"ok": True}
+    log("admin_resend_confirmation", session_id=session_obj.id, student_id=student.id, queued=not sent)
+    return {"ok": True, "queued": not sent}
+
+
+@app.post("/api/admin/enrollments/{enrollment_id}/cancel")
+async def admin_cancel_enrollment(
+    enrollment_id: int,
+    db: AsyncSession = Depends(get_session),
+    _: dict[str, Any] = Depends(require_admin),
+) -> dict[str, Any]:
+    """Cancel an enrollment and offer the freed seat to the waitlist in the same transaction."""
+
+    enrollment = await db.get(Enrollment, enrollment_id)
+    if not enrollment:
+        raise ResourceNotFound("Enrollment", enrollment_id)
+    if enrollment.status not in SEAT_HOLDING_STATUSES:
+        raise ResourceConflict(f"Enrollment is already {enrollment.status}")
+
+    session_id = enrollment.session_id
+    enrollment.status = "cancelled"
+    enrollment.hold_expires_at = None
+    await db.flush()
+    promotions = await promote_waitlist(db, session_id)
+    if not promotions:
+        await _bump_session_version(db, session_id)
+    await db.commit()
+
+    if promotions:
+        email_outbox.notify()
+    await publish_seat_counts(db, [session_id])
+    log("admin_cancel_enrollment", enrollment_id=enrollment_id, session_id=session_id, promoted=len(promotions))
+    return {"ok": True, "promoted_student_ids": [promotion.student_id for promotion in promotions]}
 
 
 @app.post("/api/admin/session", response_model=SessionOut, status_code=status.HTTP_201_CREATED)
@@ -733,6 +1150,21 @@ async def admin_create_session(
     start_ts = _ensure_timezone(body.start_ts)
     end_ts = _ensure_timezone(body.end_ts)
 
+    if end_ts <= start_ts:
+        raise ValidationError("end_ts must be after start_ts")
+
+    duplicate = await db.execute(select(Session.id).where(Session.course == body.course, Session.start_ts == start_ts))
+    if duplicate.scalar_one_or_none() is not None:
+        raise ResourceConflict("A session for this course already starts at that time")
+    if settings.schedule_conflict_check:
+        index = await load_interval_index(db, start_ts, end_ts, settings.timezone_info)
+        clash = index.find_overlap(start_ts.timestamp(), end_ts.timestamp())
+        if clash is not None:
+            raise ResourceConflict(
+                f"Overlaps session {clash.id} ({clash.course})",
+                extra={"conflicting_session_id": clash.id},
+            )
+
     session_obj = Session(
         course=body.course,
         start_ts=start_ts,
@@ -745,8 +1177,212 @@ async def admin_create_session(
     )
     db.add(session_obj)
     await db.flush()
-    seats_available = session_obj.capacity
     await db.commit()
+    return _session_out(session_obj, 0)
+
+
+@app.post("/api/admin/sessions/series", response_model=SessionSeriesOut, status_code=status.HTTP_201_CREATED)
+async def admin_create_session_series(
+    body: SessionSeriesIn,
+    db: AsyncSession = Depends(get_session),
+    _: dict[str, Any] = Depends(require_admin),
+) -> SessionSeriesOut:
+    """Materialise a weekly series in one bulk insert.
+
+    Slots that already exist are skipped; with SCHEDULE_CONFLICT_CHECK on, so are
+    slots overlapping another session, which are listed in ``conflicts``.
+    """
+
+    starts_on = body.starts_on or datetime.now(settings.timezone_info).date()
+    if body.until < starts_on:
+        raise ValidationError("until must be on or after starts_on")
+    if (body.until - starts_on).days > 731:
+        raise ValidationError("series may span at most two years")
+    slots = expand_series(
+        by_weekday=body.by_weekday,
+        start_time=body.start_time,
+        duration_minutes=body.duration_minutes,
+        starts_on=starts_on,
+        until=body.until,
+        tz=settings.timezone_info,
+        exclude_dates=body.exclude_dates,
+    )
+    requested = len(slots)
+    conflicts: list[SlotConflict] = []
+    if settings.schedule_conflict_check and slots:
+        tz = settings.timezone_info
+        index = await load_interval_index(db, slots[0][0], slots[-1][1], tz)
+        free, clashes = partition_conflicts(index, slots, tz)
+        for position, clash in clashes:
+            start_ts = slots[position][0]
+            # Re-running a series hits its own slots; those count as existing, not conflicts.
+            if clash is not None and clash.course == body.course and _ensure_timezone(clash.start_ts) == start_ts:
+                continue
+            conflicts.append(
+                SlotConflict(start_ts=start_ts, conflicting_session_id=clash.id if clash is not None else None)
+            )
+        slots = [slots[position] for position in sorted(free)]
+
+    rows = [
+        {
+            "course": body.course,
+            "start_ts": start_ts,
+            "end_ts": end_ts,
+            "capacity": body.capacity,
+            "mode": body.mode,
+            "location": body.location,
+            "status": "scheduled",
+            "version": 1,
+        }
+        for start_ts, end_ts in slots
+    ]
+    created = await bulk_create_sessions(db, rows)
+    await db.commit()
+    log(
+        "admin_create_session_series",
+        course=body.course,
+        requested=requested,
+        created=created,
+        conflicts=len(conflicts),
+    )
+    return SessionSeriesOut(
+        course=body.course,
+        requested=requested,
+        created=created,
+        skipped_existing=requested - created - len(conflicts),
+        skipped_conflicts=len(conflicts),
+        conflicts=conflicts,
+    )
+
+
+# Column order feeding _session_payload; seat counts are appended by the query.
+SESSION_OUT_COLUMNS = (
+    Session.id,
+    Session.course,
+    Session.start_ts,
+    Session.end_ts,
+    Session.mode,
+    Session.capacity,
+    Session.location,
+    Session.meet_link,
+    Session.status,
+)
+METRIC_OUT_COLUMNS = (
+    Metric.id,
+    Metric.student_id,
+    Metric.date,
+    Metric.wpm,
+    Metric.accuracy,
+    Metric.time_spent,
+    Metric.source,
+    Metric.raw_blob,
+)
+METRIC_OUT_FIELDS = tuple(column.key for column in METRIC_OUT_COLUMNS)
+ADMIN_SESSION_COLUMNS = (
+    Session.id,
+    Session.course,
+    Session.start_ts,
+    Session.end_ts,
+    Session.capacity,
+    Session.status,
+    Session.calendar_event_id,
+    Session.meet_link,
+)
+ADMIN_SESSION_FIELDS = tuple(column.key for column in ADMIN_SESSION_COLUMNS)
+
+
+# Statement builders for the hot queries above; scripts/check_query_plans.py
+# runs EXPLAIN on these same statements, so keep endpoint queries in here.
+def _availability_filters(start_dt: datetime, end_dt: datetime, course: Optional[str]) -> list[Any]:
+    filters = [
+        Session.start_ts >= start_dt,
+        Session.start_ts <= end_dt,
+        Session.status == "scheduled",
+    ]
+    if course:
+        filters.append(Session.course == course)
+    return filters
+
+
+def availability_versions_stmt(start_dt: datetime, end_dt: datetime, course: Optional[str]) -> Select:
+    return (
+        select(Session.id, Session.version)
+        .where(*_availability_filters(start_dt, end_dt, course))
+        .order_by(Session.id)
+    )
+
+
+def availability_stmt(start_dt: datetime, end_dt: datetime, course: Optional[str]) -> Select:
+    return (
+        select(*SESSION_OUT_COLUMNS, func.count(Enrollment.id))
+        .outerjoin(Enrollment, SEAT_HOLDING_JOIN)
+        .where(*_availability_filters(start_dt, end_dt, course))
+        .group_by(Session.id)
+        .order_by(Session.start_ts.asc())
+    )
+
+
+def upcoming_sessions_stmt(now: datetime) -> Select:
+    return select(*ADMIN_SESSION_COLUMNS).where(Session.start_ts >= now).order_by(Session.start_ts.asc())
+
+
+def parent_by_email_stmt(email: str) -> Select:
+    return select(Parent).where(func.lower(Parent.email) == email.lower())
+
+
+def student_by_username_stmt(username: str) -> Select:
+    return select(Student).where(func.lower(Student.typing_username) == username.lower())
+
+
+def student_by_name_stmt(name: str) -> Select:
+    return select(Student).where(func.lower(Student.name) == name.lower()).limit(1)
+
+
+def student_metrics_stmt(student_id: int) -> Select:
+    return (
+        select(*METRIC_OUT_COLUMNS)
+        .where(Metric.student_id == student_id)
+        .order_by(Metric.date.desc(), Metric.id.desc())
+    )
+
+
+def student_reports_stmt(student_id: int) -> Select:
+    return select(*REPORT_OUT_COLUMNS).where(Report.student_id == student_id).order_by(Report.period_end.desc())
+
+
+def _session_payload(rows: Any) -> list[dict[str, Any]]:
+    """Shape ``SESSION_OUT_COLUMNS + (enrollment_count,)`` rows like SessionOut."""
+
+    return [
+        {
+            "id": session_id,
+            "course": course,
+            "start_ts": start_ts,
+            "end_ts": end_ts,
+            "mode": mode,
+            "capacity": capacity,
+            "location": location,
+            "meet_link": meet_link,
+            "status": session_status,
+            "seats_available": max(capacity - (enrollment_count or 0), 0),
+        }
+        for (
+            session_id,
+            course,
+            start_ts,
+            end_ts,
+            mode,
+            capacity,
+            location,
+            meet_link,
+            session_status,
+            enrollment_count,
+        ) in rows
+    ]
+
+
+def _session_out(session_obj: Session, enrollment_count: Optional[int]) -> SessionOut:
+    seats_available = max(session_obj.capacity - (enrollment_count or 0), 0)
     return SessionOut.model_validate(
         {
             "id": session_obj.id,
@@ -763,16 +1399,34 @@ async def admin_create_session(
     )
 
 
+def _availability_window(start_date: Optional[date], end_date: Optional[date]) -> tuple[datetime, datetime]:
+    tz = settings.timezone_info
+    start_date = start_date or datetime.now(tz).date()
+    end_date = end_date or (start_date + timedelta(days=30))
+    return datetime.combine(start_date, time.min, tzinfo=tz), datetime.combine(end_date, time.max, tzinfo=tz)
+
+
 def _ensure_timezone(dt: datetime) -> datetime:
     if dt.tzinfo:
         return dt.astimezone(settings.timezone_info)
     return dt.replace(tzinfo=settings.timezone_info)
 
 
-async def _count_enrollments(db: AsyncSession, session_id: int) -> int:
-    stmt = select(func.count(Enrollment.id)).where(Enrollment.session_id == session_id)
-    result = await db.execute(stmt)
-    return int(result.scalar_one() or 0)
+async def _bump_session_version(db: AsyncSession, session_id: int) -> None:
+    """Invalidate cached representations of a session after a seat or detail change."""
+
+    await db.execute(
+        update(Session)
+        .where(Session.id == session_id)
+        .values(version=Session.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _publish_seat_change(db: AsyncSession, session_obj: Session) -> None:
+    """Push the session's current seat count to live availability streams."""
+
+    await publish_seat_counts(db, [session_obj.id])
 
 
 async def _handle_checkout_completed(event_data: dict[str, Any], db: AsyncSession) -> None:
@@ -797,8 +1451,13 @@ async def _handle_checkout_completed(event_data: dict[str, Any], db: AsyncSessio
     )
     enrollment = (await db.execute(stmt)).scalar_one_or_none()
     if enrollment:
+        if enrollment.status not in SEAT_HOLDING_STATUSES:
+            logger.warning(
+                "Payment completed after enrollment %s was %s; confirming anyway", enrollment.id, enrollment.status
+            )
         enrollment.payment_status = "paid"
         enrollment.status = "confirmed"
+        enrollment.hold_expires_at = None
     else:
         enrollment = Enrollment(
             session_id=session_id,
@@ -807,6 +1466,7 @@ async def _handle_checkout_completed(event_data: dict[str, Any], db: AsyncSessio
             payment_status="paid",
         )
         db.add(enrollment)
+    await _bump_session_version(db, session_id)
 
     await db.commit()
 
@@ -826,35 +1486,34 @@ async def _handle_checkout_completed(event_data: dict[str, Any], db: AsyncSessio
     if not session_obj:
         logger.warning("Session missing when sending confirmation email: %s", session_id)
         return
+    await _publish_seat_change(db, session_obj)
 
     if session_obj.calendar_event_id and parent and parent.email:
         try:
-            add_attendees(session_obj.calendar_event_id, [parent.email])
+            await integration_executor.run(
+                "google_calendar.add_attendees",
+                add_attendees,
+                session_obj.calendar_event_id,
+                [parent.email],
+            )
         except Exception as exc:  # pragma: no cover - best effort
             logger.warning("Unable to add calendar attendee: %s", exc)
 
     meet_link = session_obj.meet_link or "https://meet.google.com/dev-placeholder"
     launchpad_url = f"{settings.launchpad_base_url}?session_id={session_id}&student_id={student_id}"
 
-    ics_content = make_ics(
-        uid=f"sk-{session_id}-{student_id}",
-        title=f"Serenity's Keys - {session_obj.course}",
+    html = session_confirmation_email_html(
+        session_id=session_id,
+        version=session_obj.version,
+        course=session_obj.course,
         start=session_obj.start_ts,
         end=session_obj.end_ts,
-        meet_url=meet_link,
-    )
-    ics_link = ics_data_url(ics_content)
-
-    typing_class_link = settings.typing_class_links.get(session_obj.course)
-
-    html = confirmation_email_html(
+        meet_link=meet_link,
+        typing_class_link=settings.typing_class_links.get(session_obj.course),
+        student_id=student_id,
         parent_name=parent.name if parent else None,
         child_name=student.name if student else None,
-        when=session_obj.start_ts,
-        meet_link=meet_link,
         launchpad_url=launchpad_url,
-        typing_class_link=typing_class_link,
-        ics_link=ics_link,
     )
 
     recipient = parent.email if parent and parent.email else None
@@ -863,13 +1522,14 @@ async def _handle_checkout_completed(event_data: dict[str, Any], db: AsyncSessio
         return
 
     try:
-        await send_email(
+        sent = await email_outbox.deliver(
             to=recipient,
             subject="Serenity's Keys: Your session is confirmed",
             html=html,
         )
         logger.info(
-            "Confirmation email sent for session_id=%s student_id=%s typing_username=%s",
+            "Confirmation email %s for session_id=%s student_id=%s typing_username=%s",
+            "sent" if sent else "queued",
             session_id,
             student_id,
             typing_username,
@@ -879,6 +1539,9 @@ async def _handle_checkout_completed(event_data: dict[str, Any], db: AsyncSessio
         logger.error("Unable to send confirmation email: %s", exc)
 
 
+webhook_inbox.register("checkout.session.completed", _handle_checkout_completed)
+
+
 def _build_header_map(headers: List[str]) -> dict[str, str]:
     aliases = {
         "student": {"student", "student name", "name"},
@@ -933,7 +1596,7 @@ def _parse_float(value: Optional[str]) -> Optional[float]:
 
 
 async def _get_or_create_student(db: AsyncSession, name: str) -> Student:
-    stmt = select(Student).where(func.lower(Student.name) == name.lower()).limit(1)
+    stmt = student_by_name_stmt(name)
     existing = (await db.execute(stmt)).scalar_one_or_none()
     if existing:
         return existing
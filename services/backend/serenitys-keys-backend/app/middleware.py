@@ -0,0 +1,142 @@
+"""Per-request bookkeeping as a single pure ASGI middleware.
+
+``RequestContextMiddleware`` replaces four ``@app.middleware("http")`` layers
+(request id, DB timing, read-your-writes cookie, error handling). Each of those
+ran the rest of the app in a separate task and funnelled the response body
+through a memory stream; this wraps ``send`` instead, so headers are added to
+``http.response.start`` and body chunks (SSE included) go straight through.
+
+Exceptions that reach it before the response has started become the usual JSON
+error bodies. ``HTTPException`` and ``BaseAPIException`` raised in endpoints are
+normally answered earlier by FastAPI's own handler; the mapping here covers
+anything raised outside the router.
+"""
+from __future__ import annotations
+
+import logging
+import uuid
+from collections.abc import Callable
+from time import perf_counter
+from typing import Any
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .db import read_engine, recent_write_cookie
+from .exceptions import BaseAPIException
+from .instrumentation import server_timing, track_queries
+
+logger = logging.getLogger(__name__)
+
+
+def error_response(exc: Exception, path: str, *, expose_errors: bool) -> JSONResponse:
+    if isinstance(exc, BaseAPIException):
+        logger.error(
+            "API Error: %s",
+            exc.detail,
+            extra={
+                "error_code": exc.error_code,
+                "path": path,
+                "extra": exc.extra
+            }
+        )
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={
+                "error": True,
+                "code": exc.error_code,
+                "message": exc.detail,
+                "details": exc.extra
+            }
+        )
+    if isinstance(exc, HTTPException):
+        logger.error(
+            "HTTP Error: %s",
+            exc.detail,
+            extra={"path": path}
+        )
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={
+                "error": True,
+                "code": "HTTP_ERROR",
+                "message": exc.detail
+            }
+        )
+    logger.exception(
+        "Unhandled error: %s",
+        str(exc),
+        extra={"path": path}
+    )
+    if expose_errors:
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "error": True,
+                "code": "INTERNAL_SERVER_ERROR",
+                "message": str(exc),
+                "type": type(exc).__name__
+            }
+        )
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={
+            "error": True,
+            "code": "INTERNAL_SERVER_ERROR",
+            "message": "An unexpected error occurred"
+        }
+    )
+
+
+class RequestContextMiddleware:
+    """Request id, ``Server-Timing``/request log, read-your-writes cookie and JSON errors."""
+
+    def __init__(self, app: ASGIApp, *, log_event: Callable[..., None], expose_errors: bool = False) -> None:
+        self.app = app
+        self.log_event = log_event
+        self.expose_errors = expose_errors
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id") or str(uuid.uuid4())
+        started = perf_counter()
+        response: dict[str, Any] = {"status": status.HTTP_500_INTERNAL_SERVER_ERROR, "started": False}
+
+        with track_queries() as stats:
+
+            async def send_with_headers(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    response.update(status=message["status"], started=True)
+                    headers = MutableHeaders(scope=message)
+                    headers["x-request-id"] = request_id
+                    headers["Server-Timing"] = server_timing(stats, perf_counter() - started)
+                    # get_session leaves the request's session in request.state, i.e. scope["state"].
+                    session = scope.get("state", {}).get("db_session")
+                    if read_engine is not None and session is not None and session.info.get("committed"):
+                        headers.append("set-cookie", recent_write_cookie())
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            except Exception as exc:
+                if response["started"]:
+                    raise
+                await error_response(exc, scope["path"], expose_errors=self.expose_errors)(
+                    scope, receive, send_with_headers
+                )
+            finally:
+                elapsed = perf_counter() - started
+                self.log_event(
+                    "http_request",
+                    method=scope["method"],
+                    path=scope["path"],
+                    status=response["status"],
+                    duration_ms=round(elapsed * 1000, 2),
+                    db_queries=stats.queries,
+                    db_ms=stats.milliseconds,
+                )
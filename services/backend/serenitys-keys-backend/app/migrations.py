@@ -0,0 +1,54 @@
+"""Startup schema check against the Alembic migration head.
+
+Workers no longer run ``create_all`` on boot: it probes every table on every
+start and silently skips columns added since the table was created. With ``SCHEMA_CHECK=verify``
+startup reads ``alembic_version`` and refuses to serve if it is not the head
+of ``alembic/versions``; the schema itself is applied once per deploy with
+``alembic upgrade head``. ``create`` keeps the old ``create_all`` behaviour for
+throwaway databases and ``off`` skips the check entirely.
+"""
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .db import Base
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_LOCATION = Path(__file__).resolve().parents[1] / "alembic"
+
+
+class SchemaOutOfDate(RuntimeError):
+    """The database is not at the migration head this code expects."""
+
+
+def head_revisions() -> set[str]:
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory(str(SCRIPT_LOCATION)).get_heads())
+
+
+async def ensure_schema(engine: AsyncEngine, mode: str) -> None:
+    if mode == "off":
+        return
+    if mode == "create":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        logger.info("Database tables ensured via create_all().")
+        return
+
+    # Imported here so scripts and SCHEMA_CHECK=create/off workers never load Alembic.
+    from alembic.runtime.migration import MigrationContext
+
+    async with engine.connect() as conn:
+        current = set(await conn.run_sync(lambda sync_conn: MigrationContext.configure(sync_conn).get_current_heads()))
+    expected = head_revisions()
+    if current != expected:
+        raise SchemaOutOfDate(
+            f"Database schema is at {', '.join(sorted(current)) or 'no revision'}, "
+            f"expected {', '.join(sorted(expected))}; run `alembic upgrade head` (or set SCHEMA_CHECK=create for a scratch database)."
+        )
+    logger.info("Database schema at migration head %s.", ", ".join(sorted(expected)))
@@ -1,10 +1,10 @@
 """SQLAlchemy ORM models for Serenity's Keys."""
 from __future__ import annotations
 
-from datetime import date, datetime
+from datetime import date, datetime, timezone
 from typing import List, Optional
 
-from sqlalchemy import Date, DateTime, Float, ForeignKey, Integer, JSON, String, Text, UniqueConstraint
+from sqlalchemy import Date, DateTime, Float, ForeignKey, Index, Integer, JSON, String, Text, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .db import Base
@@ -17,6 +17,10 @@ class Parent(Base):
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     email: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
     phone: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    # Secret for the parent's subscribable calendar feed (/api/calendar/{token}.ics).
+    calendar_token: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, unique=True, index=True)
+    # Secret for the parent portal endpoints (/api/portal/{token}/...): dashboard and reports.
+    portal_token: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, unique=True, index=True)
 
     students: Mapped[List["Student"]] = relationship(back_populates="parent", cascade="all, delete-orphan")
 
@@ -28,7 +32,9 @@ class Student(Base):
     __tablename__ = "students"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    parent_id: Mapped[Optional[int]] = mapped_column(ForeignKey("parents.id", ondelete="SET NULL"), nullable=True)
+    parent_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("parents.id", ondelete="SET NULL"), nullable=True, index=True
+    )
     name: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
     dob: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
     level: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
@@ -46,6 +52,11 @@ class Student(Base):
 
 class Session(Base):
     __tablename__ = "sessions"
+    __table_args__ = (
+        Index("ix_sessions_status_course_start_ts", "status", "course", "start_ts"),
+        # One slot per course and start time; bulk series creation relies on it to skip existing rows.
+        Index("uq_sessions_course_start_ts", "course", "start_ts", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     course: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
@@ -57,6 +68,7 @@ class Session(Base):
     meet_link: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     calendar_event_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True, index=True)
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="scheduled")
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
 
     enrollments: Mapped[List["Enrollment"]] = relationship(back_populates="session", cascade="all, delete-orphan")
 
@@ -68,6 +80,7 @@ class Enrollment(Base):
     __tablename__ = "enrollments"
     __table_args__ = (
         UniqueConstraint("student_id", "session_id", name="uq_enrollment_student_session"),
+        Index("ix_enrollments_status_hold_expires_at", "status", "hold_expires_at"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -75,6 +88,8 @@ class Enrollment(Base):
     session_id: Mapped[int] = mapped_column(ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False, index=True)
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
     payment_status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    # A pending enrollment holds its seat until this time; None means no expiry.
+    hold_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     student: Mapped[Student] = relationship(back_populates="enrollments")
     session: Mapped[Session] = relationship(back_populates="enrollments")
@@ -83,8 +98,34 @@ class Enrollment(Base):
         return f"Enrollment(id={self.id!r}, student_id={self.student_id!r}, session_id={self.session_id!r})"
 
 
+class WaitlistEntry(Base):
+    """A student queued for a full session; entries are served in id order."""
+
+    __tablename__ = "waitlist"
+    __table_args__ = (
+        UniqueConstraint("session_id", "student_id", name="uq_waitlist_session_student"),
+        Index("ix_waitlist_session_id_status_id", "session_id", "status", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    session_id: Mapped[int] = mapped_column(ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False)
+    student_id: Mapped[int] = mapped_column(ForeignKey("students.id", ondelete="CASCADE"), nullable=False, index=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="waiting")
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+    promoted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"WaitlistEntry(id={self.id!r}, session_id={self.session_id!r}, student_id={self.student_id!r})"
+
+
 class Metric(Base):
     __tablename__ = "metrics"
+    __table_args__ = (
+        # Latest-metric-per-student lookups in the weekly report job.
+        Index("ix_metrics_student_id_date", "student_id", "date"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     student_id: Mapped[int] = mapped_column(ForeignKey("students.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -103,15 +144,202 @@ class Metric(Base):
 
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (
+        Index("uq_reports_student_id_period_end", "student_id", "period_end", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     student_id: Mapped[int] = mapped_column(ForeignKey("students.id", ondelete="CASCADE"), nullable=False, index=True)
     period_start: Mapped[date] = mapped_column(Date, nullable=False)
     period_end: Mapped[date] = mapped_column(Date, nullable=False)
     summary_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    html: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     pdf_url: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    generated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     student: Mapped[Student] = relationship(back_populates="reports")
 
     def __repr__(self) -> str:  # pragma: no cover - debug helper
         return f"Report(id={self.id!r}, student_id={self.student_id!r})"
+
+
+class ReportRun(Base):
+    """One weekly report run and the metric-id watermark range it covered.
+
+    A run reports on students with metrics in ``(metrics_since, metrics_until]``;
+    the next run starts from this run's ``metrics_until``.
+    """
+
+    __tablename__ = "report_runs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    period_start: Mapped[date] = mapped_column(Date, nullable=False)
+    period_end: Mapped[date] = mapped_column(Date, nullable=False, unique=True)
+    metrics_since: Mapped[int] = mapped_column(Integer, nullable=False)
+    metrics_until: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"ReportRun(id={self.id!r}, period_end={self.period_end!r})"
+
+
+class WebhookEvent(Base):
+    """Inbox row for a received Stripe event, processed asynchronously."""
+
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        Index("ix_webhook_events_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    event_id: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
+    type: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    received_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+    next_attempt_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    processed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"WebhookEvent(id={self.id!r}, event_id={self.event_id!r}, status={self.status!r})"
+
+
+class OutboundEmail(Base):
+    """Email waiting in the outbox for (re)delivery."""
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    to_email: Mapped[str] = mapped_column(String(255), nullable=False)
+    subject: Mapped[str] = mapped_column(String(255), nullable=False)
+    html: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+    next_attempt_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"OutboundEmail(id={self.id!r}, to_email={self.to_email!r}, status={self.status!r})"
+
+
+class ReminderSent(Base):
+    """One row per (enrollment, reminder kind) handed to the outbox; makes reminders send-once."""
+
+    __tablename__ = "reminders_sent"
+    __table_args__ = (
+        UniqueConstraint("enrollment_id", "kind", name="uq_reminders_sent_enrollment_kind"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    enrollment_id: Mapped[int] = mapped_column(ForeignKey("enrollments.id", ondelete="CASCADE"), nullable=False)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    queued_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"ReminderSent(enrollment_id={self.enrollment_id!r}, kind={self.kind!r})"
+
+
+class IdempotencyRecord(Base):
+    """Stored response for an ``Idempotency-Key`` so repeats skip the side effects."""
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("scope", "key", name="uq_idempotency_keys_scope_key"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    scope: Mapped[str] = mapped_column(String(50), nullable=False)
+    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    response: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"IdempotencyRecord(id={self.id!r}, scope={self.scope!r}, key={self.key!r})"
+
+
+class JobRun(Base):
+    """History row for one execution of a scheduled job."""
+
+    __tablename__ = "job_runs"
+    __table_args__ = (
+        Index("ix_job_runs_job_name_started_at", "job_name", "started_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    worker: Mapped[str] = mapped_column(String(255), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="running")
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    duration_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    items_processed: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"JobRun(id={self.id!r}, job_name={self.job_name!r}, status={self.status!r})"
+
+
+class JobLock(Base):
+    """Lease row used as the job lock on databases without advisory locks (SQLite)."""
+
+    __tablename__ = "job_locks"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(255), nullable=False)
+    lease_expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"JobLock(name={self.name!r}, holder={self.holder!r})"
+
+
+class JobShard(Base):
+    """One ``[first_id, last_id]`` slice of a sharded job run, claimed by lease."""
+
+    __tablename__ = "job_shards"
+    __table_args__ = (
+        UniqueConstraint("job_name", "run_key", "shard_no", name="uq_job_shards_job_run_shard"),
+        Index("ix_job_shards_job_run_status", "job_name", "run_key", "status"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    run_key: Mapped[str] = mapped_column(String(50), nullable=False)
+    shard_no: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    checkpoint: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    holder: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    items_processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"JobShard(id={self.id!r}, job_name={self.job_name!r}, shard_no={self.shard_no!r})"
+
+
+# Case-insensitive lookups (profile upsert, CSV import) compare lower(column),
+# which only an expression index can serve.
+Index("ix_parents_email_lower", func.lower(Parent.email))
+Index("ix_students_typing_username_lower", func.lower(Student.typing_username))
+Index("ix_students_name_lower", func.lower(Student.name))
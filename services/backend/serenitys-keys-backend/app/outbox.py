@@ -0,0 +1,188 @@
+"""Durable email outbox.
+
+``deliver`` tries to send right away and falls back to storing the message
+when the mailer fails or its circuit is open; ``enqueue`` adds a message to
+the caller's transaction so it is only sent if that transaction commits. A
+background loop drains due rows with exponential backoff and pauses while
+the mailer breaker is open.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .db import AsyncSessionLocal
+from .integrations.circuit_breaker import OPEN, CircuitOpenError, breakers
+from .integrations.mailer import send_email
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+CLAIMABLE_STATUSES = ("pending", "sending")
+
+
+class EmailOutbox:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        poll_seconds: float = 30.0,
+        batch_size: int = 50,
+        max_attempts: int = 10,
+        lease_seconds: float = 120.0,
+        base_backoff_seconds: float = 60.0,
+    ) -> None:
+        self._session_factory = session_factory
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.base_backoff_seconds = base_backoff_seconds
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def enqueue(db: AsyncSession, to: str, subject: str, html: str) -> OutboundEmail:
+        """Stage a message in ``db``; it is delivered after the caller commits."""
+
+        message = OutboundEmail(to_email=to, subject=subject, html=html, status="pending", attempts=0)
+        db.add(message)
+        return message
+
+    @staticmethod
+    async def enqueue_many(db: AsyncSession, messages: Sequence[tuple[str, str, str]]) -> None:
+        """Stage ``(to, subject, html)`` messages with one batched INSERT."""
+
+        if not messages:
+            return
+        now = datetime.now(timezone.utc)
+        await db.execute(
+            insert(OutboundEmail),
+            [
+                {"to_email": to, "subject": subject, "html": html, "status": "pending", "attempts": 0, "created_at": now}
+                for to, subject, html in messages
+            ],
+        )
+
+    async def deliver(self, to: str, subject: str, html: str) -> bool:
+        """Send now, or persist for retry. Returns True when sent immediately."""
+
+        try:
+            await send_email(to, subject, html)
+            return True
+        except Exception as exc:
+            logger.warning("Deferring email to outbox after send failure: %s", exc)
+        async with self._session_factory() as db:
+            self.enqueue(db, to, subject, html)
+            await db.commit()
+        return False
+
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="email-outbox")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                sent = await self.drain()
+            except Exception:  # pragma: no cover - keep the loop alive
+                logger.exception("Email outbox pass failed")
+                sent = 0
+            if sent:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def drain(self) -> int:
+        """Attempt delivery of due messages; returns how many were attempted."""
+
+        if breakers["mailer"].state == OPEN:
+            return 0
+        now = datetime.now(timezone.utc)
+        lease_until = now + timedelta(seconds=self.lease_seconds)
+        due = or_(OutboundEmail.next_attempt_at.is_(None), OutboundEmail.next_attempt_at <= now)
+        async with self._session_factory() as db:
+            ids = (
+                await db.execute(
+                    select(OutboundEmail.id)
+                    .where(OutboundEmail.status.in_(CLAIMABLE_STATUSES), due)
+                    .order_by(OutboundEmail.id)
+                    .limit(self.batch_size)
+                )
+            ).scalars().all()
+            if not ids:
+                return 0
+            # Claim the batch in one statement. The lease timestamp doubles as a
+            # claim token: rows another worker took carry a different one.
+            await db.execute(
+                update(OutboundEmail)
+                .where(OutboundEmail.id.in_(ids), OutboundEmail.status.in_(CLAIMABLE_STATUSES), due)
+                .values(
+                    status="sending",
+                    attempts=OutboundEmail.attempts + 1,
+                    next_attempt_at=lease_until,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            claimed = (
+                await db.execute(
+                    select(OutboundEmail.id, OutboundEmail.to_email, OutboundEmail.subject, OutboundEmail.html, OutboundEmail.attempts)
+                    .where(
+                        OutboundEmail.id.in_(ids),
+                        OutboundEmail.status == "sending",
+                        OutboundEmail.next_attempt_at == lease_until,
+                    )
+                )
+            ).all()
+
+            for row in claimed:
+                values: dict[str, Any]
+                try:
+                    await send_email(row.to_email, row.subject, row.html)
+                    values = {"status": "sent", "sent_at": datetime.now(timezone.utc), "next_attempt_at": None, "last_error": None}
+                except CircuitOpenError:
+                    # The breaker tripped mid-batch; hand the row back untouched.
+                    values = {"status": "pending", "next_attempt_at": None, "attempts": row.attempts - 1}
+                except Exception as exc:
+                    error = f"{type(exc).__name__}: {exc}"
+                    if row.attempts >= self.max_attempts:
+                        logger.error("Giving up on outbox email %s: %s", row.id, error)
+                        values = {"status": "failed", "next_attempt_at": None, "last_error": error}
+                    else:
+                        backoff = self.base_backoff_seconds * 2 ** (row.attempts - 1)
+                        values = {
+                            "status": "pending",
+                            "next_attempt_at": datetime.now(timezone.utc) + timedelta(seconds=backoff),
+                            "last_error": error,
+                        }
+                await db.execute(update(OutboundEmail).where(OutboundEmail.id == row.id).values(**values))
+                await db.commit()
+            return len(claimed)
+
+
+email_outbox = EmailOutbox(AsyncSessionLocal)
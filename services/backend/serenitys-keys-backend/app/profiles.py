@@ -0,0 +1,118 @@
+"""Bulk parent/student profile upserts for onboarding whole cohorts.
+
+Each row follows the rules of ``/api/profile/upsert``, but the batch runs as a
+fixed set of statements: one ``IN`` lookup for parents by normalised email,
+one for the referenced students, then executemany inserts and by-primary-key
+updates for each table. Rows are applied in order, so when a batch repeats an
+email or student id the last row wins, just as with sequential single calls.
+"""
+from __future__ import annotations
+
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Parent, Student
+from .schemas import ParentUpsertIn
+
+
+def _clean(value: Optional[str]) -> Optional[str]:
+    value = value.strip() if value else None
+    return value or None
+
+
+async def bulk_upsert_profiles(db: AsyncSession, profiles: Sequence[ParentUpsertIn]) -> list[dict[str, Any]]:
+    """Upsert every profile and return one outcome per row, in input order; the caller commits."""
+
+    results: list[dict[str, Any]] = [{"index": index} for index in range(len(profiles))]
+    emails = [profile.parent_email.strip().lower() for profile in profiles]
+
+    referenced_ids = {profile.student_id for profile in profiles if profile.student_id}
+    existing_students: dict[int, Any] = {}
+    if referenced_ids:
+        rows = await db.execute(
+            select(Student.id, Student.parent_id, Student.typing_username).where(Student.id.in_(referenced_ids))
+        )
+        existing_students = {row.id: row for row in rows}
+    valid = []
+    for index, profile in enumerate(profiles):
+        if profile.student_id and profile.student_id not in existing_students:
+            results[index]["error"] = "student_id not found"
+        else:
+            valid.append(index)
+
+    # Parents: later rows for the same email overwrite earlier ones.
+    parent_values: dict[str, dict[str, Any]] = {}
+    for index in valid:
+        profile = profiles[index]
+        parent_values[emails[index]] = {"name": profile.parent_name.strip(), "phone": _clean(profile.parent_phone)}
+    parent_ids: dict[str, int] = {}
+    if parent_values:
+        rows = await db.execute(
+            select(Parent.id, func.lower(Parent.email)).where(func.lower(Parent.email).in_(parent_values))
+        )
+        parent_ids = {email: parent_id for parent_id, email in rows}
+    existing_parents = set(parent_ids)
+    if existing_parents:
+        await db.execute(
+            update(Parent), [{"id": parent_ids[email], **parent_values[email]} for email in existing_parents]
+        )
+    new_parents = [email for email in parent_values if email not in existing_parents]
+    if new_parents:
+        rows = await db.execute(
+            insert(Parent).returning(Parent.id, Parent.email),
+            [{"email": email, **parent_values[email]} for email in new_parents],
+        )
+        parent_ids.update({email: parent_id for parent_id, email in rows})
+
+    # Students: updates are merged per id so repeated ids apply in order.
+    student_updates: dict[int, dict[str, Any]] = {}
+    new_students: list[int] = []
+    for index in valid:
+        profile = profiles[index]
+        parent_id = parent_ids[emails[index]]
+        results[index].update(
+            parent_id=parent_id,
+            parent_status="updated" if emails[index] in existing_parents else "created",
+        )
+        if not profile.student_id:
+            new_students.append(index)
+            continue
+        current = student_updates.get(profile.student_id)
+        if current is None:
+            existing = existing_students[profile.student_id]
+            current = {
+                "id": existing.id,
+                "parent_id": existing.parent_id,
+                "typing_username": existing.typing_username,
+            }
+            student_updates[profile.student_id] = current
+        current["name"] = profile.student_name.strip()
+        current["parent_id"] = current["parent_id"] or parent_id
+        current["typing_username"] = _clean(profile.typing_username) or current["typing_username"]
+        results[index].update(student_id=profile.student_id, student_status="updated")
+    if student_updates:
+        await db.execute(update(Student), list(student_updates.values()))
+    if new_students:
+        values = [
+            {
+                "parent_id": parent_ids[emails[index]],
+                "name": profiles[index].student_name.strip(),
+                "typing_username": _clean(profiles[index].typing_username),
+            }
+            for index in new_students
+        ]
+        # RETURNING order isn't guaranteed for multi-row inserts, and asking for it
+        # makes SQLite insert row by row, so match the new ids back by content.
+        # Rows with identical content are interchangeable.
+        created: dict[tuple[Any, ...], list[int]] = {}
+        rows = await db.execute(
+            insert(Student).returning(Student.id, Student.parent_id, Student.name, Student.typing_username), values
+        )
+        for student_id, *key in sorted(rows, reverse=True):
+            created.setdefault(tuple(key), []).append(student_id)
+        for index, row in zip(new_students, values):
+            student_id = created[(row["parent_id"], row["name"], row["typing_username"])].pop()
+            results[index].update(student_id=student_id, student_status="created")
+    return results
@@ -0,0 +1,159 @@
+"""In-process publish/subscribe for live seat availability."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SeatUpdate:
+    session_id: int
+    course: str
+    start_ts: datetime
+    seats_available: int
+
+
+@dataclass(eq=False)
+class Subscription:
+    """A single stream listener filtered to a course and time window.
+
+    Pending updates are keyed by session: a newer count for a session replaces
+    the undelivered one in place, since listeners only care about the latest
+    figure. A listener that falls behind on more than ``max_pending`` distinct
+    sessions is disconnected instead (see ``SeatBroker._deliver``).
+    """
+
+    course: Optional[str]
+    start: datetime
+    end: datetime
+    max_pending: int = 256
+    pending: dict[int, SeatUpdate] = field(default_factory=dict)
+    coalesced: int = 0
+    closed: bool = False
+    _ready: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def wants(self, update: SeatUpdate) -> bool:
+        return self.start <= update.start_ts <= self.end
+
+    def offer(self, update: SeatUpdate) -> bool:
+        """Queue ``update``; False when the listener is too far behind to keep."""
+
+        if update.session_id in self.pending:
+            self.coalesced += 1
+        elif len(self.pending) >= self.max_pending:
+            return False
+        self.pending[update.session_id] = update
+        self._ready.set()
+        return True
+
+    async def get(self, timeout: float) -> Optional[SeatUpdate]:
+        """Oldest pending update, or None if nothing arrives within ``timeout`` or the stream closed."""
+
+        if not self.pending and not self.closed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return None
+        if not self.pending:
+            return None
+        session_id = next(iter(self.pending))
+        update = self.pending.pop(session_id)
+        if not self.pending:
+            self._ready.clear()
+        return update
+
+    def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+
+
+class SeatBroker:
+    """Fan seat changes out to stream subscribers from one shared task.
+
+    Publishers never touch subscriber state directly; updates land in a single
+    inbox and one background task delivers them, so idle connections cost a
+    dict and nothing else. Delivery never waits on a listener: updates coalesce
+    per session and a listener that still falls behind is dropped, so one slow
+    consumer cannot hold up the others. Heartbeats are not the broker's job;
+    each stream sends its own every ``heartbeat_seconds`` of wall-clock time,
+    however busy it is.
+    """
+
+    def __init__(self, heartbeat_seconds: float = 15.0, max_pending: int = 256) -> None:
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_pending = max_pending
+        self.dropped_subscribers = 0
+        self._by_course: dict[Optional[str], set[Subscription]] = {}
+        self._inbox: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self._by_course.values())
+
+    def start(self) -> None:
+        if self._task is None:
+            self._inbox = asyncio.Queue()
+            self._task = asyncio.create_task(self._fan_out(), name="seat-broker")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._inbox = None
+
+    def subscribe(self, course: Optional[str], start: datetime, end: datetime) -> Subscription:
+        subscription = Subscription(course=course, start=start, end=end, max_pending=self.max_pending)
+        self._by_course.setdefault(course, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        subs = self._by_course.get(subscription.course)
+        if subs is not None:
+            subs.discard(subscription)
+            if not subs:
+                self._by_course.pop(subscription.course, None)
+
+    def publish(self, update: SeatUpdate) -> None:
+        """Queue an update for delivery; a no-op when the broker is not running."""
+
+        if self._inbox is not None:
+            self._inbox.put_nowait(update)
+
+    async def _fan_out(self) -> None:
+        assert self._inbox is not None
+        while True:
+            update = await self._inbox.get()
+            targets = list(self._by_course.get(update.course, ())) + list(self._by_course.get(None, ()))
+            for subscription in targets:
+                if subscription.wants(update):
+                    self._deliver(subscription, update)
+
+    def _deliver(self, subscription: Subscription, update: SeatUpdate) -> None:
+        if subscription.offer(update):
+            return
+        # Behind on more sessions than it may buffer: a partial backlog would
+        # leave it showing stale counts, so drop it. The stream ends, the
+        # browser reconnects after the ``retry`` delay and the booking page
+        # refetches current counts on reconnect.
+        self.dropped_subscribers += 1
+        subscription.pending.clear()
+        logger.warning(
+            "Dropping lagging seat stream subscriber (course=%s, %d pending sessions)",
+            subscription.course,
+            self.max_pending,
+        )
+        self.unsubscribe(subscription)
+
+
+seat_broker = SeatBroker()
@@ -0,0 +1,147 @@
+"""Session reminder emails (24 hours and 1 hour before class).
+
+Each pass runs one range query per reminder kind over ``sessions.start_ts``,
+joined to confirmed enrollments and anti-joined to ``reminders_sent``, so the
+cost tracks the number of due reminders rather than the number of sessions.
+Due rows are claimed by inserting into ``reminders_sent`` (conflicts are
+skipped, so concurrent passes cannot double-send) and their emails are staged
+in the outbox in the same transaction.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import Select, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .config import get_settings
+from .db import insert_ignore
+from .models import Enrollment, Parent, ReminderSent, Session, Student
+from .outbox import EmailOutbox, email_outbox
+from .utils.email_templates import reminder_email_html
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEET_LINK = "https://meet.google.com/dev-placeholder"
+
+
+@dataclass(frozen=True)
+class ReminderKind:
+    name: str
+    lead: timedelta
+    label: str
+    # Sessions starting in (lead - tolerance, lead] from now are due. The band
+    # is wide enough to ride out a few missed 5-minute passes but narrow enough
+    # that the email's "in 24 hours" stays true: a session booked 3 hours out,
+    # or already close when the job first runs, skips the 24h reminder.
+    tolerance: timedelta
+
+
+REMINDER_KINDS = (
+    ReminderKind("24h", timedelta(hours=24), "24 hours", tolerance=timedelta(hours=2)),
+    ReminderKind("1h", timedelta(hours=1), "1 hour", tolerance=timedelta(minutes=30)),
+)
+
+
+def due_reminders_stmt(kind: str, window_start: datetime, window_end: datetime, limit: int) -> Select:
+    """Confirmed enrollments starting in ``(window_start, window_end]`` with no ``kind`` reminder yet."""
+
+    return (
+        select(
+            Enrollment.id.label("enrollment_id"),
+            Session.id.label("session_id"),
+            Session.start_ts,
+            Session.meet_link,
+            Student.id.label("student_id"),
+            Student.name.label("student_name"),
+            Parent.name.label("parent_name"),
+            Parent.email,
+        )
+        .join(Enrollment, Enrollment.session_id == Session.id)
+        .join(Student, Student.id == Enrollment.student_id)
+        .join(Parent, Parent.id == Student.parent_id)
+        .outerjoin(
+            ReminderSent,
+            and_(ReminderSent.enrollment_id == Enrollment.id, ReminderSent.kind == kind),
+        )
+        .where(
+            Session.start_ts > window_start,
+            Session.start_ts <= window_end,
+            Session.status == "scheduled",
+            Enrollment.status == "confirmed",
+            ReminderSent.id.is_(None),
+            Parent.email.is_not(None),
+        )
+        .order_by(Session.start_ts, Enrollment.id)
+        .limit(limit)
+    )
+
+
+async def _send_due(
+    db: AsyncSession,
+    kind: ReminderKind,
+    window_start: datetime,
+    window_end: datetime,
+    batch_size: int,
+) -> int:
+    settings = get_settings()
+    due = (await db.execute(due_reminders_stmt(kind.name, window_start, window_end, batch_size))).all()
+    if not due:
+        return 0
+
+    queued_at = datetime.now(timezone.utc)
+    claimed = set(
+        (
+            await db.execute(
+                insert_ignore(db, ReminderSent, ["enrollment_id", "kind"]).returning(ReminderSent.enrollment_id),
+                [{"enrollment_id": row.enrollment_id, "kind": kind.name, "queued_at": queued_at} for row in due],
+            )
+        ).scalars()
+    )
+    tz = settings.timezone_info
+    messages = []
+    for row in due:
+        if row.enrollment_id not in claimed:
+            continue  # another worker got there first
+        when = row.start_ts.astimezone(tz) if row.start_ts.tzinfo else row.start_ts
+        html = reminder_email_html(
+            parent_name=row.parent_name,
+            child_name=row.student_name,
+            when=when,
+            lead_time=kind.label,
+            meet_link=row.meet_link or DEFAULT_MEET_LINK,
+            launchpad_url=f"{settings.launchpad_base_url}?session_id={row.session_id}&student_id={row.student_id}",
+        )
+        messages.append((row.email, f"Reminder: Serenity's Keys class in {kind.label}", html))
+    await EmailOutbox.enqueue_many(db, messages)
+    await db.commit()
+    return len(messages)
+
+
+async def send_due_reminders(
+    session_factory: async_sessionmaker[AsyncSession],
+    *,
+    now: Optional[datetime] = None,
+    batch_size: int = 500,
+) -> dict[str, int]:
+    """Queue every due reminder; returns how many were queued per kind."""
+
+    tz = get_settings().timezone_info
+    now = now or datetime.now(tz)
+    queued: dict[str, int] = {}
+    async with session_factory() as db:
+        for kind in REMINDER_KINDS:
+            total = 0
+            while True:
+                count = await _send_due(db, kind, now + kind.lead - kind.tolerance, now + kind.lead, batch_size)
+                total += count
+                if count < batch_size:
+                    break
+            queued[kind.name] = total
+    if any(queued.values()):
+        email_outbox.notify()
+        logger.info("Queued session reminders: %s", queued)
+    return queued
@@ -0,0 +1,211 @@
+"""Weekly progress reports, generated incrementally into ``reports``.
+
+Metrics are append-only, so their ids work as a watermark. Each weekly run is
+a ``report_runs`` row covering metric ids ``(metrics_since, metrics_until]``:
+``metrics_since`` is the previous run's ``metrics_until`` and ``metrics_until``
+is the newest metric when the run was opened. Only students with a metric in
+that range get a new report (and an email), so the cost of a run follows the
+number of active students, not the size of the roster. Runs are split into
+student-id shards (see ``app.shards``) that every worker helps process.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
+from typing import Any
+
+from sqlalchemy import Select, and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .config import get_settings
+from .db import insert_ignore
+from .models import Metric, Parent, Report, ReportRun, Student
+from .outbox import EmailOutbox, email_outbox
+from .shards import ShardRunner, plan_shards
+from .utils.email_templates import weekly_report_html
+
+JOB_NAME = "weekly_reports"
+REPORT_PERIOD_DAYS = 7
+WEEKLY_REPORT_SUBJECT = "Serenity's Keys - Weekly Update"
+
+
+async def open_report_run(db: AsyncSession, period_end: date) -> ReportRun:
+    """Return the run for ``period_end``, creating it (and fixing its watermarks) on first use."""
+
+    run = (await db.execute(select(ReportRun).where(ReportRun.period_end == period_end))).scalar_one_or_none()
+    if run is not None:
+        return run
+    since = (
+        await db.execute(select(func.max(ReportRun.metrics_until)).where(ReportRun.period_end < period_end))
+    ).scalar_one_or_none()
+    until = (await db.execute(select(func.max(Metric.id)))).scalar_one_or_none()
+    # Workers opening the same run concurrently race here; the first insert wins.
+    await db.execute(
+        insert_ignore(db, ReportRun, ["period_end"]).values(
+            period_start=period_end - timedelta(days=REPORT_PERIOD_DAYS - 1),
+            period_end=period_end,
+            metrics_since=since or 0,
+            metrics_until=until or 0,
+            created_at=datetime.now(timezone.utc),
+        )
+    )
+    await db.commit()
+    return (await db.execute(select(ReportRun).where(ReportRun.period_end == period_end))).scalar_one()
+
+
+def _new_metrics(run: ReportRun):
+    return and_(Metric.id > run.metrics_since, Metric.id <= run.metrics_until)
+
+
+def active_students_stmt(run: ReportRun) -> Select:
+    """Students with a metric inside the run's watermark range."""
+
+    return select(Metric.student_id).where(_new_metrics(run)).distinct()
+
+
+def active_student_page_stmt(run: ReportRun, after_id: int, last_id: int, limit: int) -> Select:
+    return (
+        select(Metric.student_id)
+        .where(_new_metrics(run), Metric.student_id > after_id, Metric.student_id <= last_id)
+        .group_by(Metric.student_id)
+        .order_by(Metric.student_id)
+        .limit(limit)
+    )
+
+
+def report_rows_stmt(run: ReportRun, student_ids: list[int]) -> Select:
+    """One row per student in ``student_ids``: names, parent email, latest score and the week's totals."""
+
+    # Metrics newer than the run's watermark belong to the next run.
+    in_page = and_(Metric.student_id.in_(student_ids), Metric.id <= run.metrics_until)
+    latest = (
+        select(
+            Metric.student_id,
+            Metric.wpm,
+            Metric.accuracy,
+            func.row_number()
+            .over(partition_by=Metric.student_id, order_by=(Metric.date.desc(), Metric.id.desc()))
+            .label("rank"),
+        )
+        .where(in_page)
+        .subquery()
+    )
+    week = (
+        select(
+            Metric.student_id,
+            func.count(Metric.id).label("practice_count"),
+            func.sum(Metric.time_spent).label("practice_minutes"),
+            func.max(Metric.wpm).label("best_wpm"),
+            func.avg(Metric.accuracy).label("average_accuracy"),
+        )
+        .where(in_page, Metric.date >= run.period_start, Metric.date <= run.period_end)
+        .group_by(Metric.student_id)
+        .subquery()
+    )
+    return (
+        select(
+            Student.id,
+            Student.name,
+            Parent.name.label("parent_name"),
+            Parent.email,
+            latest.c.wpm,
+            latest.c.accuracy,
+            week.c.practice_count,
+            week.c.practice_minutes,
+            week.c.best_wpm,
+            week.c.average_accuracy,
+        )
+        .join(latest, and_(latest.c.student_id == Student.id, latest.c.rank == 1))
+        .outerjoin(week, week.c.student_id == Student.id)
+        .outerjoin(Parent, Parent.id == Student.parent_id)
+        .where(Student.id.in_(student_ids))
+    )
+
+
+async def _report_batch(
+    db: AsyncSession, after_id: int, last_id: int, limit: int, *, run: ReportRun
+) -> tuple[int, int]:
+    """Write reports for the next ``limit`` active students after ``after_id``; returns (checkpoint, reports)."""
+
+    page = (await db.execute(active_student_page_stmt(run, after_id, last_id, limit))).scalars().all()
+    checkpoint = page[-1] if len(page) == limit else last_id
+    if not page:
+        return checkpoint, 0
+
+    rows = (await db.execute(report_rows_stmt(run, list(page)))).all()
+
+    now = datetime.now(timezone.utc)
+    reports: list[dict[str, Any]] = []
+    recipients: dict[int, str] = {}
+    for row in rows:
+        practice_count = row.practice_count or 0
+        html = weekly_report_html(
+            parent_name=row.parent_name,
+            child_name=row.name,
+            period_start=run.period_start,
+            period_end=run.period_end,
+            practice_count=practice_count,
+            practice_minutes=row.practice_minutes,
+            best_wpm=row.best_wpm,
+            average_accuracy=row.average_accuracy,
+            latest_wpm=row.wpm,
+            latest_accuracy=row.accuracy,
+        )
+        summary = (
+            f"{practice_count} practice session{'' if practice_count == 1 else 's'}; "
+            f"latest {row.wpm or 'n/a'} WPM at {row.accuracy or 'n/a'}% accuracy"
+        )
+        reports.append(
+            {
+                "student_id": row.id,
+                "period_start": run.period_start,
+                "period_end": run.period_end,
+                "summary_text": summary,
+                "html": html,
+                "generated_at": now,
+            }
+        )
+        if row.email:
+            recipients[row.id] = row.email
+    if not reports:
+        return checkpoint, 0
+
+    inserted = (
+        await db.execute(insert_ignore(db, Report, ["student_id", "period_end"]).returning(Report.student_id), reports)
+    ).scalars().all()
+    html_by_student = {report["student_id"]: report["html"] for report in reports}
+    await EmailOutbox.enqueue_many(
+        db,
+        [
+            (recipients[student_id], WEEKLY_REPORT_SUBJECT, html_by_student[student_id])
+            for student_id in inserted
+            if student_id in recipients
+        ],
+    )
+    return checkpoint, len(inserted)
+
+
+async def generate_weekly_reports(
+    session_factory: async_sessionmaker[AsyncSession], period_end: date
+) -> int:
+    """Generate (and email) reports for students active since the last run; returns reports written here."""
+
+    settings = get_settings()
+    async with session_factory() as db:
+        run = await open_report_run(db, period_end)
+        active = (await db.execute(active_students_stmt(run))).scalars().all()
+        if not active:
+            return 0
+        await plan_shards(db, JOB_NAME, period_end.isoformat(), active, shard_size=settings.report_shard_size)
+        await db.commit()
+    runner = ShardRunner(
+        session_factory,
+        JOB_NAME,
+        period_end.isoformat(),
+        partial(_report_batch, run=run),
+        lease_seconds=settings.job_lease_seconds,
+    )
+    written = await runner.run(settings.report_shard_concurrency)
+    if written:
+        email_outbox.notify()
+    return written
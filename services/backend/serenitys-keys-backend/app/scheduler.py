@@ -1,42 +1,81 @@
-"""Background scheduler for weekly reports."""
+"""Background scheduler for periodic jobs (reports, reminders, seat holds).
+
+Every worker may run the scheduler: each job goes through ``run_job``, which
+takes a database lock so exactly one worker executes a given tick and records
+the run in ``job_runs``. Job bodies return how many items they processed.
+``weekly_reports`` is the exception: it is split into ``job_shards`` that all
+workers claim concurrently, so it runs on every worker without the lock.
+"""
 from __future__ import annotations
 
 from datetime import datetime, timedelta
+from typing import Any
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from sqlalchemy import select
 
+from .config import get_settings
 from .db import AsyncSessionLocal
-from .integrations.mailer import send_email
-from .models import Metric, Parent, Student
+from .idempotency import idempotency_store
+from .jobs import run_job
+from .outbox import email_outbox
+from .reminders import send_due_reminders
+from .reports import generate_weekly_reports
+from .seats import publish_seat_counts, release_expired_holds
+
+
+async def weekly_reports() -> int:
+    """Write this week's reports; every worker joins in, claiming student-id shards."""
 
+    today = datetime.now(get_settings().timezone_info).date()
+    return await generate_weekly_reports(AsyncSessionLocal, today)
 
-async def weekly_reports() -> None:
-    cutoff = datetime.utcnow().date() - timedelta(days=14)
+
+async def purge_idempotency_keys() -> int:
     async with AsyncSessionLocal() as db:
-        students = (await db.execute(select(Student))).scalars().all()
-        for student in students:
-            metric = (
-                await db.execute(
-                    select(Metric)
-                    .where(Metric.student_id == student.id)
-                    .order_by(Metric.date.desc())
-                )
-            ).scalars().first()
-            if not metric or metric.date < cutoff:
-                continue
-            parent = await db.get(Parent, student.parent_id) if student.parent_id else None
-            if not parent or not parent.email:
-                continue
-            html = (
-                f"<p>{student.name} latest typing score: {metric.wpm or 'n/a'} WPM at "
-                f"{metric.accuracy or 'n/a'}% accuracy. Keep going!</p>"
-            )
-            await send_email(parent.email, "Serenity's Keys - Weekly Update", html)
+        purged = await idempotency_store.purge_expired(db)
+        await db.commit()
+    return purged
+
+
+async def release_seat_holds() -> int:
+    async with AsyncSessionLocal() as db:
+        promotions = await release_expired_holds(db)
+        if not promotions:
+            return 0
+        await db.commit()
+        if any(promotions.values()):
+            email_outbox.notify()
+        await publish_seat_counts(db, promotions.keys())
+    return sum(len(promoted) for promoted in promotions.values())
+
+
+async def session_reminders() -> int:
+    return sum((await send_due_reminders(AsyncSessionLocal)).values())
+
+
+def _add_job(scheduler: AsyncIOScheduler, job, *trigger_args, run_options: dict[str, Any], **trigger_kwargs) -> None:
+    name = job.__name__
+    scheduler.add_job(
+        run_job,
+        *trigger_args,
+        args=[name, job],
+        kwargs=run_options,
+        id=name,
+        name=name,
+        coalesce=True,
+        max_instances=1,
+        **trigger_kwargs,
+    )
 
 
 def start_scheduler(app) -> None:
     scheduler = AsyncIOScheduler(timezone="America/Chicago")
-    scheduler.add_job(weekly_reports, "cron", day_of_week="sun", hour=17, minute=0)
+    # Sharded: every worker joins the run instead of one winning the lock.
+    _add_job(scheduler, weekly_reports, "cron", day_of_week="sun", hour=17, minute=0, run_options={"exclusive": False})
+    _add_job(
+        scheduler, purge_idempotency_keys, "cron", hour=3, minute=15, run_options={"dedupe_window": timedelta(hours=1)}
+    )
+    _add_job(scheduler, release_seat_holds, "interval", minutes=1, run_options={"dedupe_window": timedelta(seconds=30)})
+    _add_job(scheduler, session_reminders, "interval", minutes=5, run_options={"dedupe_window": timedelta(minutes=2)})
     scheduler.start()
     app.state.scheduler = scheduler
@@ -0,0 +1,164 @@
+"""Session scheduling helpers: recurring series, bulk creation and conflict checks."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+from datetime import date, datetime, time, timedelta
+from typing import Any, Generic, NamedTuple, Optional, TypeVar
+from zoneinfo import ZoneInfo
+
+from dateutil.rrule import FR, MO, SA, SU, TH, TU, WE, WEEKLY, rrule, weekday as rrule_weekday
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .db import insert_ignore
+from .models import Session
+
+T = TypeVar("T")
+
+WEEKDAYS: dict[str, rrule_weekday] = {"MO": MO, "TU": TU, "WE": WE, "TH": TH, "FR": FR, "SA": SA, "SU": SU}
+
+# Sessions never run longer than this; bounds how far back the conflict
+# loader looks for a session that could still overlap a proposed slot.
+MAX_SESSION_LENGTH = timedelta(hours=24)
+
+
+def expand_series(
+    *,
+    by_weekday: Sequence[str],
+    start_time: time,
+    duration_minutes: int,
+    starts_on: date,
+    until: date,
+    tz: ZoneInfo,
+    exclude_dates: Iterable[date] = (),
+) -> list[tuple[datetime, datetime]]:
+    """Return ``(start, end)`` pairs for a weekly recurrence, in local wall time.
+
+    Each occurrence is built from the local date and ``start_time`` so the class
+    stays at the same clock time across DST changes.
+    """
+
+    excluded = set(exclude_dates)
+    rule = rrule(
+        WEEKLY,
+        byweekday=[WEEKDAYS[code] for code in by_weekday],
+        dtstart=datetime.combine(starts_on, time.min),
+        until=datetime.combine(until, time.max),
+    )
+    duration = timedelta(minutes=duration_minutes)
+    slots = []
+    for occurrence in rule:
+        day = occurrence.date()
+        if day in excluded:
+            continue
+        start = datetime.combine(day, start_time, tzinfo=tz)
+        slots.append((start, start + duration))
+    return slots
+
+
+async def bulk_create_sessions(db: AsyncSession, rows: Sequence[dict[str, Any]]) -> int:
+    """Insert session rows, skipping any whose ``(course, start_ts)`` already exists.
+
+    Returns the number of rows actually inserted; the caller commits.
+    """
+
+    if not rows:
+        return 0
+    # executemany + RETURNING lets SQLAlchemy batch rows into multi-VALUES
+    # statements ("insertmanyvalues") and tells us which rows were inserted.
+    stmt = insert_ignore(db, Session, ["course", "start_ts"]).returning(Session.id)
+    result = await db.execute(stmt, list(rows))
+    return len(result.all())
+
+
+class ScheduledSlot(NamedTuple):
+    id: int
+    course: str
+    start_ts: datetime
+
+
+class IntervalIndex(Generic[T]):
+    """Static index over half-open ``[start, end)`` intervals.
+
+    Intervals are sorted by start and paired with a running maximum of their
+    ends (and where that maximum came from). An interval ``[s, e)`` overlaps
+    something iff, among the intervals starting before ``e``, the largest end
+    exceeds ``s``: one bisect plus one lookup, so O(log n) per query.
+    """
+
+    def __init__(self, intervals: Iterable[tuple[float, float, T]]) -> None:
+        items = sorted(intervals, key=lambda item: item[0])
+        self._starts = [start for start, _, _ in items]
+        self._payloads = [payload for _, _, payload in items]
+        self._max_end: list[float] = []
+        self._max_at: list[int] = []
+        running, at = float("-inf"), -1
+        for position, (_, end, _) in enumerate(items):
+            if end > running:
+                running, at = end, position
+            self._max_end.append(running)
+            self._max_at.append(at)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def find_overlap(self, start: float, end: float) -> Optional[T]:
+        """Return the payload of one interval overlapping ``[start, end)``, if any."""
+
+        position = bisect_left(self._starts, end) - 1
+        if position < 0 or self._max_end[position] <= start:
+            return None
+        return self._payloads[self._max_at[position]]
+
+
+def _epoch(value: datetime, tz: ZoneInfo) -> float:
+    # SQLite hands back naive wall-clock values in the configured timezone.
+    return (value if value.tzinfo else value.replace(tzinfo=tz)).timestamp()
+
+
+async def load_interval_index(
+    db: AsyncSession, window_start: datetime, window_end: datetime, tz: ZoneInfo
+) -> IntervalIndex[ScheduledSlot]:
+    """Index the non-cancelled sessions that could overlap ``[window_start, window_end)``."""
+
+    rows = (
+        await db.execute(
+            select(Session.id, Session.course, Session.start_ts, Session.end_ts).where(
+                Session.start_ts < window_end,
+                Session.start_ts >= window_start - MAX_SESSION_LENGTH,
+                Session.status != "cancelled",
+            )
+        )
+    ).all()
+    return IntervalIndex(
+        (_epoch(row.start_ts, tz), _epoch(row.end_ts, tz), ScheduledSlot(row.id, row.course, row.start_ts))
+        for row in rows
+        if _epoch(row.end_ts, tz) > _epoch(window_start, tz)
+    )
+
+
+def partition_conflicts(
+    index: IntervalIndex[T], slots: Sequence[tuple[datetime, datetime]], tz: ZoneInfo
+) -> tuple[list[int], list[tuple[int, Optional[T]]]]:
+    """Split ``slots`` into free ones and ones that overlap ``index`` or each other.
+
+    Returns indexes into ``slots``: ``(free, [(conflicting, existing payload or None)])``.
+    A payload of None means the slot collided with an earlier slot in the same batch.
+    """
+
+    order = sorted(range(len(slots)), key=lambda i: slots[i][0])
+    free: list[int] = []
+    conflicts: list[tuple[int, Optional[T]]] = []
+    accepted_max_end = float("-inf")
+    for i in order:
+        start, end = _epoch(slots[i][0], tz), _epoch(slots[i][1], tz)
+        existing = index.find_overlap(start, end)
+        if existing is not None:
+            conflicts.append((i, existing))
+        elif start < accepted_max_end:
+            conflicts.append((i, None))
+        else:
+            free.append(i)
+            accepted_max_end = max(accepted_max_end, end)
+    return free, conflicts
@@ -1,10 +1,10 @@
 """Pydantic schemas for request/response bodies."""
 from __future__ import annotations
 
-from datetime import date, datetime
-from typing import Optional
+from datetime import date, datetime, time
+from typing import Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field, HttpUrl, PositiveInt
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, HttpUrl, PositiveInt, model_validator
 
 
 class AvailabilityQuery(BaseModel):
@@ -28,6 +28,22 @@ class SessionOut(BaseModel):
     seats_available: int
 
 
+class SessionBatchIn(BaseModel):
+    ids: list[PositiveInt] = Field(min_length=1, max_length=500, description="Session ids to look up.")
+
+
+class WaitlistJoinIn(BaseModel):
+    student_id: PositiveInt
+
+
+class WaitlistOut(BaseModel):
+    id: int
+    session_id: int
+    student_id: int
+    status: str
+    position: Optional[int] = Field(default=None, description="1-based place in line while waiting.")
+
+
 class CheckoutIn(BaseModel):
     session_id: PositiveInt
     student_id: PositiveInt
@@ -71,6 +87,72 @@ class MetricOut(BaseModel):
     raw_blob: Optional[dict]
 
 
+class ReportOut(BaseModel):
+    id: int
+    student_id: int
+    period_start: date
+    period_end: date
+    summary_text: Optional[str]
+    pdf_url: Optional[str]
+    generated_at: Optional[datetime]
+
+
+class DashboardSessionOut(BaseModel):
+    id: int
+    course: str
+    start_ts: datetime
+    end_ts: datetime
+    mode: str
+    location: str
+    meet_link: Optional[str]
+    status: str
+
+
+class DashboardEnrollmentOut(BaseModel):
+    enrollment_id: int
+    status: str
+    payment_status: str
+    session: DashboardSessionOut
+
+
+class LatestMetricOut(BaseModel):
+    date: date
+    wpm: Optional[int]
+    accuracy: Optional[float]
+    time_spent: Optional[float]
+
+
+class RollingMetricsOut(BaseModel):
+    days: int
+    practice_count: int
+    practice_minutes: Optional[float]
+    average_wpm: Optional[float]
+    best_wpm: Optional[int]
+    average_accuracy: Optional[float]
+
+
+class DashboardStudentOut(BaseModel):
+    id: int
+    name: str
+    level: Optional[str]
+    typing_username: Optional[str]
+    latest_metric: Optional[LatestMetricOut]
+    rolling: dict[str, RollingMetricsOut] = Field(description="Practice over the last 7 and 30 days, keyed 7d/30d.")
+    upcoming: list[DashboardEnrollmentOut]
+
+
+class DashboardParentOut(BaseModel):
+    id: int
+    name: str
+    email: str
+    phone: Optional[str]
+
+
+class ParentDashboardOut(BaseModel):
+    parent: DashboardParentOut
+    students: list[DashboardStudentOut]
+
+
 class SessionCreate(BaseModel):
     course: str
     start_ts: datetime
@@ -79,6 +161,45 @@ class SessionCreate(BaseModel):
     mode: str = Field(default="remote")
     location: str = Field(default="Google Meet")
 
+class SessionSeriesIn(BaseModel):
+    """Weekly recurrence in RRULE terms (FREQ=WEEKLY;BYDAY=...;UNTIL=...)."""
+
+    course: str
+    by_weekday: list[Literal["MO", "TU", "WE", "TH", "FR", "SA", "SU"]] = Field(min_length=1, max_length=7)
+    start_time: time = Field(description="Local start time in the configured timezone.")
+    duration_minutes: int = Field(ge=5, le=480)
+    starts_on: Optional[date] = Field(default=None, description="First day of the series; defaults to today.")
+    until: date = Field(description="Last day of the series (inclusive).")
+    exclude_dates: list[date] = Field(default_factory=list, description="Dates to skip (holidays, breaks).")
+    capacity: int = Field(default=4, ge=1)
+    mode: str = Field(default="remote")
+    location: str = Field(default="Google Meet")
+
+    @model_validator(mode="after")
+    def _check_range(self) -> "SessionSeriesIn":
+        if self.starts_on and self.until < self.starts_on:
+            raise ValueError("until must be on or after starts_on")
+        if self.starts_on and (self.until - self.starts_on).days > 731:
+            raise ValueError("series may span at most two years")
+        return self
+
+
+class SlotConflict(BaseModel):
+    start_ts: datetime
+    conflicting_session_id: Optional[int] = Field(
+        default=None, description="Existing session it overlaps; null if it overlaps another slot in the series."
+    )
+
+
+class SessionSeriesOut(BaseModel):
+    course: str
+    requested: int
+    created: int
+    skipped_existing: int
+    skipped_conflicts: int = 0
+    conflicts: list[SlotConflict] = Field(default_factory=list)
+
+
 class ParentUpsertIn(BaseModel):
     parent_name: str
     parent_email: EmailStr
@@ -88,6 +209,28 @@ class ParentUpsertIn(BaseModel):
     typing_username: Optional[str] = Field(default=None, max_length=150)
 
 
+class ProfileBulkIn(BaseModel):
+    profiles: list[ParentUpsertIn] = Field(min_length=1, max_length=1000)
+
+
+class ProfileBulkResult(BaseModel):
+    index: int = Field(description="Position of the row in the request.")
+    parent_id: Optional[int] = None
+    student_id: Optional[int] = None
+    parent_status: Optional[Literal["created", "updated"]] = None
+    student_status: Optional[Literal["created", "updated"]] = None
+    error: Optional[str] = None
+
+
+class ProfileBulkOut(BaseModel):
+    created_parents: int
+    updated_parents: int
+    created_students: int
+    updated_students: int
+    failed: int
+    results: list[ProfileBulkResult]
+
+
 class AdminLoginIn(BaseModel):
     password: str
 
@@ -0,0 +1,231 @@
+"""Seat accounting: checkout holds, waitlist promotion and live seat updates.
+
+Only enrollments in ``SEAT_HOLDING_STATUSES`` occupy a seat. When seats free
+up (a hold expires or an enrollment is cancelled) ``promote_waitlist`` hands
+them to the next waiting entries in the same transaction, reading only as
+many waitlist rows as there are free seats. The session row is locked first
+(``SELECT ... FOR UPDATE`` on Postgres; SQLite serialises writers anyway) so
+concurrent cancellations cannot promote into the same seat twice.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import Select, and_, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import get_settings
+from .models import Enrollment, Parent, Session, Student, WaitlistEntry
+from .outbox import EmailOutbox
+from .pubsub import SeatUpdate, seat_broker
+from .utils.email_templates import waitlist_offer_email_html
+
+logger = logging.getLogger(__name__)
+
+SEAT_HOLDING_STATUSES = ("pending", "confirmed")
+
+# Join condition for seat counts: ``select(Session, func.count(Enrollment.id)).outerjoin(Enrollment, SEAT_HOLDING_JOIN)``.
+SEAT_HOLDING_JOIN = and_(Enrollment.session_id == Session.id, Enrollment.status.in_(SEAT_HOLDING_STATUSES))
+
+
+@dataclass
+class Promotion:
+    session_id: int
+    student_id: int
+    enrollment_id: int
+    hold_expires_at: datetime
+
+
+def checkout_hold_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(minutes=get_settings().checkout_hold_minutes)
+
+
+def active_enrollments_stmt(session_id: int) -> Select:
+    return select(func.count(Enrollment.id)).where(
+        Enrollment.session_id == session_id,
+        Enrollment.status.in_(SEAT_HOLDING_STATUSES),
+    )
+
+
+def next_waiting_stmt(session_id: int, limit: int) -> Select:
+    return (
+        select(WaitlistEntry.id, WaitlistEntry.student_id)
+        .where(WaitlistEntry.session_id == session_id, WaitlistEntry.status == "waiting")
+        .order_by(WaitlistEntry.id)
+        .limit(limit)
+    )
+
+
+def expired_holds_stmt(now: datetime, limit: int) -> Select:
+    return (
+        select(Enrollment.id, Enrollment.session_id)
+        .where(Enrollment.status == "pending", Enrollment.hold_expires_at <= now)
+        .limit(limit)
+    )
+
+
+async def count_active_enrollments(db: AsyncSession, session_id: int) -> int:
+    return int((await db.execute(active_enrollments_stmt(session_id))).scalar_one() or 0)
+
+
+async def waitlist_position(db: AsyncSession, entry_id: int, session_id: int) -> int:
+    stmt = select(func.count(WaitlistEntry.id)).where(
+        WaitlistEntry.session_id == session_id,
+        WaitlistEntry.status == "waiting",
+        WaitlistEntry.id <= entry_id,
+    )
+    return int((await db.execute(stmt)).scalar_one() or 0)
+
+
+async def promote_waitlist(db: AsyncSession, session_id: int) -> list[Promotion]:
+    """Give free seats in ``session_id`` to the next waiting entries.
+
+    Runs inside the caller's transaction and stages the offer emails in the
+    outbox; the caller commits, then calls ``email_outbox.notify()`` and
+    ``publish_seat_counts``.
+    """
+
+    session_obj = (
+        await db.execute(select(Session).where(Session.id == session_id).with_for_update())
+    ).scalar_one_or_none()
+    if session_obj is None or session_obj.status != "scheduled":
+        return []
+    free = session_obj.capacity - await count_active_enrollments(db, session_id)
+    if free <= 0:
+        return []
+
+    entries = (await db.execute(next_waiting_stmt(session_id, free))).all()
+    if not entries:
+        return []
+
+    settings = get_settings()
+    now = datetime.now(timezone.utc)
+    hold_until = now + timedelta(minutes=settings.waitlist_hold_minutes)
+    student_ids = [entry.student_id for entry in entries]
+
+    # A student may have an old cancelled/expired enrollment; the unique
+    # (student, session) constraint means reviving it rather than inserting.
+    existing = {
+        enrollment.student_id: enrollment
+        for enrollment in (
+            await db.execute(
+                select(Enrollment).where(Enrollment.session_id == session_id, Enrollment.student_id.in_(student_ids))
+            )
+        ).scalars()
+    }
+    enrollments: list[Enrollment] = []
+    for student_id in student_ids:
+        enrollment = existing.get(student_id)
+        if enrollment is None:
+            enrollment = Enrollment(session_id=session_id, student_id=student_id)
+            db.add(enrollment)
+        enrollment.status = "pending"
+        enrollment.payment_status = "pending"
+        enrollment.hold_expires_at = hold_until
+        enrollments.append(enrollment)
+
+    await db.execute(
+        update(WaitlistEntry)
+        .where(WaitlistEntry.id.in_([entry.id for entry in entries]))
+        .values(status="promoted", promoted_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(Session)
+        .where(Session.id == session_id)
+        .values(version=Session.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await db.flush()
+
+    contacts = (
+        await db.execute(
+            select(Student.id, Student.name, Parent.name.label("parent_name"), Parent.email)
+            .join(Parent, Student.parent_id == Parent.id)
+            .where(Student.id.in_(student_ids))
+        )
+    ).all()
+    tz = settings.timezone_info
+    when = session_obj.start_ts.astimezone(tz) if session_obj.start_ts.tzinfo else session_obj.start_ts
+    for contact in contacts:
+        if not contact.email:
+            continue
+        html = waitlist_offer_email_html(
+            parent_name=contact.parent_name,
+            child_name=contact.name,
+            when=when,
+            hold_until=hold_until.astimezone(tz),
+            booking_url=settings.booking_portal_url,
+        )
+        EmailOutbox.enqueue(db, contact.email, "Serenity's Keys: A seat opened up", html)
+
+    logger.info("Promoted %s waitlist entries for session_id=%s", len(enrollments), session_id)
+    return [
+        Promotion(
+            session_id=session_id,
+            student_id=enrollment.student_id,
+            enrollment_id=enrollment.id,
+            hold_expires_at=hold_until,
+        )
+        for enrollment in enrollments
+    ]
+
+
+async def release_expired_holds(db: AsyncSession, *, limit: int = 500) -> dict[int, list[Promotion]]:
+    """Expire lapsed pending holds and promote into the freed seats.
+
+    Returns the promotions per affected session; the caller commits.
+    """
+
+    now = datetime.now(timezone.utc)
+    expired = (await db.execute(expired_holds_stmt(now, limit))).all()
+    if not expired:
+        return {}
+    await db.execute(
+        update(Enrollment)
+        .where(Enrollment.id.in_([row.id for row in expired]), Enrollment.status == "pending")
+        .values(status="expired", hold_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    promotions: dict[int, list[Promotion]] = {}
+    for session_id in sorted({row.session_id for row in expired}):
+        promotions[session_id] = await promote_waitlist(db, session_id)
+        if not promotions[session_id]:
+            # Nobody waiting: the seat goes back on sale, so caches must refresh.
+            await db.execute(
+                update(Session)
+                .where(Session.id == session_id)
+                .values(version=Session.version + 1)
+                .execution_options(synchronize_session=False)
+            )
+    logger.info("Released %s expired seat holds across %s sessions", len(expired), len(promotions))
+    return promotions
+
+
+async def publish_seat_counts(db: AsyncSession, session_ids: Iterable[int]) -> None:
+    """Push current seat counts for ``session_ids`` to live availability streams."""
+
+    ids = set(session_ids)
+    if not ids:
+        return
+    rows = (
+        await db.execute(
+            select(Session.id, Session.course, Session.start_ts, Session.capacity, func.count(Enrollment.id))
+            .outerjoin(Enrollment, SEAT_HOLDING_JOIN)
+            .where(Session.id.in_(ids))
+            .group_by(Session.id)
+        )
+    ).all()
+    tz = get_settings().timezone_info
+    for session_id, course, start_ts, capacity, enrolled in rows:
+        seat_broker.publish(
+            SeatUpdate(
+                session_id=session_id,
+                course=course,
+                start_ts=start_ts.astimezone(tz) if start_ts.tzinfo else start_ts.replace(tzinfo=tz),
+                seats_available=max(capacity - enrolled, 0),
+            )
+        )
@@ -0,0 +1,222 @@
+"""Sharded job runs: split a job over id ranges that any worker can claim.
+
+A run (``job_name`` + ``run_key``) is planned as ``job_shards`` rows covering
+fixed id ranges, so every worker plans the same shards and inserting them is
+idempotent. Workers claim shards with a lease (conditional UPDATE, like the
+outboxes) and process them in batches. Each batch's writes commit together
+with the shard's ``checkpoint``, guarded on the holder, so a crashed worker's
+shard is picked up from its last checkpoint once the lease lapses and no
+batch is applied twice. A shard whose batch raises is marked ``failed`` and
+retried, by any worker, up to ``MAX_SHARD_ATTEMPTS`` claims in total.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import Select, and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .db import insert_ignore
+from .jobs import WORKER_ID
+from .models import JobShard
+
+logger = logging.getLogger(__name__)
+
+MAX_SHARD_ATTEMPTS = 3
+
+# (db, after_id, last_id, limit) -> (new checkpoint, items processed). The
+# function stages its writes in ``db``; the runner commits them with the checkpoint.
+BatchFunc = Callable[[AsyncSession, int, int, int], Awaitable[tuple[int, int]]]
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def plan_shards(
+    db: AsyncSession, job_name: str, run_key: str, ids: Iterable[int], *, shard_size: int
+) -> int:
+    """Create the shards whose ranges contain any of ``ids``; existing shards are kept.
+
+    Returns how many shards cover ``ids``.
+    """
+
+    rows: list[dict[str, Any]] = [
+        {
+            "job_name": job_name,
+            "run_key": run_key,
+            "shard_no": shard_no,
+            "first_id": shard_no * shard_size,
+            "last_id": (shard_no + 1) * shard_size - 1,
+            "checkpoint": shard_no * shard_size - 1,
+            "status": "pending",
+            "attempts": 0,
+            "items_processed": 0,
+        }
+        for shard_no in sorted({item_id // shard_size for item_id in ids})
+    ]
+    if rows:
+        await db.execute(insert_ignore(db, JobShard, ["job_name", "run_key", "shard_no"]), rows)
+    return len(rows)
+
+
+def _claimable(job_name: str, run_key: str, now: datetime):
+    return and_(
+        JobShard.job_name == job_name,
+        JobShard.run_key == run_key,
+        or_(
+            JobShard.status == "pending",
+            and_(
+                JobShard.attempts < MAX_SHARD_ATTEMPTS,
+                or_(
+                    JobShard.status == "failed",
+                    and_(JobShard.status == "running", JobShard.lease_expires_at <= now),
+                ),
+            ),
+        ),
+    )
+
+
+def claimable_shard_stmt(job_name: str, run_key: str, now: datetime) -> Select:
+    return (
+        select(JobShard.id)
+        .where(_claimable(job_name, run_key, now))
+        .order_by(JobShard.shard_no)
+        .limit(1)
+    )
+
+
+class ShardRunner:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        job_name: str,
+        run_key: str,
+        process_batch: BatchFunc,
+        *,
+        batch_size: int = 200,
+        lease_seconds: float = 300.0,
+        poll_seconds: float = 5.0,
+    ) -> None:
+        self._session_factory = session_factory
+        self.job_name = job_name
+        self.run_key = run_key
+        self.process_batch = process_batch
+        self.batch_size = batch_size
+        self.lease = timedelta(seconds=lease_seconds)
+        self.poll_seconds = poll_seconds
+
+    async def run(self, concurrency: int) -> int:
+        """Process shards with ``concurrency`` tasks until the run is done; returns items processed here."""
+
+        results = await asyncio.gather(
+            *(self._work(f"{WORKER_ID}/{slot}") for slot in range(concurrency)), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return sum(results)
+
+    async def _work(self, holder: str) -> int:
+        processed, backoff = 0, 0.1
+        while True:
+            shard = await self._claim(holder)
+            if shard is not None:
+                processed += await self._process(shard, holder)
+                backoff = 0.1
+                continue
+            earliest = await self._earliest_foreign_lease()
+            if earliest is None:
+                return processed
+            # Another worker holds the remaining shards. Poll (backing off) until
+            # it finishes them, or its lease lapses and we resume from its checkpoint.
+            remaining = (earliest - datetime.now(timezone.utc)).total_seconds()
+            await asyncio.sleep(max(min(backoff, remaining), 0.0) + 0.05)
+            backoff = min(backoff * 2, self.poll_seconds)
+
+    async def _claim(self, holder: str) -> Optional[JobShard]:
+        async with self._session_factory() as db:
+            while True:
+                now = datetime.now(timezone.utc)
+                shard_id = (
+                    await db.execute(claimable_shard_stmt(self.job_name, self.run_key, now))
+                ).scalar_one_or_none()
+                if shard_id is None:
+                    return None
+                result = await db.execute(
+                    update(JobShard)
+                    .where(JobShard.id == shard_id, _claimable(self.job_name, self.run_key, now))
+                    .values(
+                        status="running",
+                        holder=holder,
+                        lease_expires_at=now + self.lease,
+                        attempts=JobShard.attempts + 1,
+                    )
+                )
+                await db.commit()
+                if result.rowcount == 1:
+                    return await db.get(JobShard, shard_id)
+                # Lost the race for this shard; look for the next one.
+
+    async def _earliest_foreign_lease(self) -> Optional[datetime]:
+        """Earliest lease expiry among shards still being worked on by other processes."""
+
+        async with self._session_factory() as db:
+            earliest = (
+                await db.execute(
+                    select(func.min(JobShard.lease_expires_at)).where(
+                        JobShard.job_name == self.job_name,
+                        JobShard.run_key == self.run_key,
+                        JobShard.status == "running",
+                        JobShard.attempts < MAX_SHARD_ATTEMPTS,
+                        # Our own tasks finish (or fail) their shards themselves.
+                        JobShard.holder.not_like(f"{WORKER_ID}/%"),
+                    )
+                )
+            ).scalar_one_or_none()
+        return _aware(earliest) if earliest is not None else None
+
+    async def _process(self, shard: JobShard, holder: str) -> int:
+        checkpoint, last_id, processed = shard.checkpoint, shard.last_id, 0
+        while checkpoint < last_id:
+            async with self._session_factory() as db:
+                try:
+                    checkpoint, items = await self.process_batch(db, checkpoint, last_id, self.batch_size)
+                    done = checkpoint >= last_id
+                    now = datetime.now(timezone.utc)
+                    result = await db.execute(
+                        update(JobShard)
+                        .where(JobShard.id == shard.id, JobShard.holder == holder, JobShard.status == "running")
+                        .values(
+                            checkpoint=checkpoint,
+                            items_processed=JobShard.items_processed + items,
+                            lease_expires_at=now + self.lease,
+                            status="done" if done else "running",
+                            finished_at=now if done else None,
+                        )
+                    )
+                    if result.rowcount != 1:
+                        # Our lease lapsed and another worker owns the shard now.
+                        await db.rollback()
+                        logger.warning("Lost lease on %s shard %s", self.job_name, shard.shard_no)
+                        return processed
+                    await db.commit()
+                except Exception:
+                    await db.rollback()
+                    await self._fail(shard.id, holder)
+                    raise
+            processed += items
+        return processed
+
+    async def _fail(self, shard_id: int, holder: str) -> None:
+        async with self._session_factory() as db:
+            await db.execute(
+                update(JobShard)
+                .where(JobShard.id == shard_id, JobShard.holder == holder, JobShard.status == "running")
+                .values(status="failed", lease_expires_at=None)
+            )
+            await db.commit()
@@ -0,0 +1,75 @@
+"""Tuned SQLite profile for small deployments (``SQLITE_PROFILE=tuned``).
+
+Every connection gets WAL journaling, ``synchronous=NORMAL``, a busy timeout
+and larger mmap/page caches, so readers no longer wait for writers. Writes go
+through one pooled writer connection: sessions route statements to a reader
+engine until their first INSERT/UPDATE/DELETE, flush or ``SELECT ... FOR
+UPDATE``, then to the writer until the transaction ends. Other write
+transactions in the process queue for that connection instead of racing
+SQLite's file lock into ``database is locked`` errors, and a read-then-write
+that locks its rows first (checkout's seat count) runs entirely on the writer,
+one transaction at a time, as it would under the row lock on Postgres.
+
+This matches how pysqlite already behaves: SELECTs before the first write run
+outside a transaction, and ``BEGIN`` is only emitted before the write. Moving
+those reads to a separate connection does not change what they see.
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
+from .config import Settings
+
+
+def is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def apply_pragmas(engine: AsyncEngine, settings: Settings) -> None:
+    pragmas = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size_mb * 1024 * 1024}",
+        # Negative cache_size is in KiB rather than pages.
+        f"PRAGMA cache_size=-{settings.sqlite_cache_size_mb * 1024}",
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):  # noqa: ANN001
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def writer_routing_session(writer: AsyncEngine, reader: AsyncEngine) -> type[Session]:
+    """Session class sending reads to ``reader`` and write transactions to ``writer``."""
+
+    class WriterRoutingSession(Session):
+        def get_bind(self, mapper: Optional[Any] = None, clause: Optional[Any] = None, **kw: Any) -> Engine:
+            if (
+                self.info.get("writing")
+                or self._flushing
+                or isinstance(clause, (UpdateBase, TextClause))
+                or getattr(clause, "_for_update_arg", None) is not None
+            ):
+                # Stay on the writer until commit/rollback so later reads see this transaction's writes.
+                self.info["writing"] = True
+                return writer.sync_engine
+            return reader.sync_engine
+
+    @event.listens_for(WriterRoutingSession, "after_transaction_end")
+    def _release_writer(session: Session, transaction: SessionTransaction) -> None:
+        if transaction.parent is None:
+            session.info.pop("writing", None)
+
+    return WriterRoutingSession
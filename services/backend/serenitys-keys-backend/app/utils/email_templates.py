@@ -1,27 +1,27 @@
-"""Email template helpers."""
+"""Email template helpers.
+
+Templates are compiled once at import. Confirmation emails are rendered in two
+steps: the parts that depend only on the session (formatted date, Meet and
+Typing.com links, the encoded calendar invite) are bound once per session
+version and cached, and each message fills in just the recipient fields.
+
+Every value is HTML-escaped on the way in: names come from the public profile
+upsert, and weekly reports are also served as HTML from the API origin.
+"""
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
+from html import escape
 from typing import Optional
+from urllib.parse import quote
 
+from .ics import ics_data_url_parts
+from .templates import CompiledTemplate
 
-def confirmation_email_html(
-    *,
-    parent_name: Optional[str],
-    child_name: Optional[str],
-    when: datetime,
-    meet_link: str,
-    launchpad_url: str,
-    typing_class_link: Optional[str] = None,
-    ics_link: Optional[str] = None,
-) -> str:
-    date_str = when.strftime("%A, %B %d @ %I:%M %p")
-    add_to_calendar_html = (
-        f'<p><a href="{ics_link}" style="color:#2563eb">Add to calendar</a></p>' if ics_link else ""
-    )
-    child_display = child_name or "your student"
-    parent_display = parent_name or "there"
-    return f"""
+DATE_FORMAT = "%A, %B %d @ %I:%M %p"
+
+_CONFIRMATION_SOURCE = """
     <div style="font-family:system-ui,Arial,sans-serif;max-width:640px;margin:auto">
       <h2>You're booked! ??</h2>
       <p>Hi {parent_display},</p>
@@ -41,3 +41,208 @@ def confirmation_email_html(
       <p style="color:#666;font-size:13px">Tip: Please log in to Typing.com beforehand so it opens instantly from the Launchpad.</p>
     </div>
     """.strip()
+_ADD_TO_CALENDAR = '<p><a href="{ics_link}" style="color:#2563eb">Add to calendar</a></p>'
+
+CONFIRMATION_TEMPLATE = CompiledTemplate(
+    _CONFIRMATION_SOURCE.replace("{add_to_calendar_html}", _ADD_TO_CALENDAR), escape=escape
+)
+CONFIRMATION_NO_CALENDAR_TEMPLATE = CompiledTemplate(
+    _CONFIRMATION_SOURCE.replace("{add_to_calendar_html}", ""), escape=escape
+)
+# The per-recipient calendar link is the session's encoded invite around the recipient's UID.
+CONFIRMATION_SESSION_TEMPLATE = CompiledTemplate(
+    _CONFIRMATION_SOURCE.replace("{add_to_calendar_html}", _ADD_TO_CALENDAR.replace("{ics_link}", "{ics_head}{ics_uid}{ics_tail}")),
+    escape=escape,
+)
+
+WAITLIST_OFFER_TEMPLATE = CompiledTemplate(
+    """
+    <div style="font-family:system-ui,Arial,sans-serif;max-width:640px;margin:auto">
+      <h2>A seat opened up!</h2>
+      <p>Hi {parent_display},</p>
+      <p>A spot is now available for <strong>{child_display}</strong> in the Serenity's Keys session on {date_str}.</p>
+      <p>We're holding the seat until <strong>{hold_str}</strong>. Complete checkout before then to keep it:</p>
+      <p><a href="{booking_url}" style="background:#0a7;color:#fff;padding:10px 14px;border-radius:6px;text-decoration:none">Finish booking</a></p>
+      <hr/>
+      <p style="color:#666;font-size:13px">If you no longer need the seat, no action is needed; it will be offered to the next family.</p>
+    </div>
+    """.strip(),
+    escape=escape,
+)
+
+REMINDER_TEMPLATE = CompiledTemplate(
+    """
+    <div style="font-family:system-ui,Arial,sans-serif;max-width:640px;margin:auto">
+      <h2>Class starts in {lead_time}</h2>
+      <p>Hi {parent_display},</p>
+      <p>Just a reminder that <strong>{child_display}</strong> has a Serenity's Keys session on {date_str}.</p>
+      <p><a href="{meet_link}" style="background:#0a7;color:#fff;padding:10px 14px;border-radius:6px;text-decoration:none">Join Google Meet</a></p>
+      <p>Open the Launchpad a few minutes early: <a href="{launchpad_url}">{launchpad_url}</a></p>
+    </div>
+    """.strip(),
+    escape=escape,
+)
+
+# The week's section is itself HTML, so the report is rendered as head + week + tail
+# rather than passing markup through an escaped slot.
+_WEEKLY_REPORT_HEAD, _WEEKLY_REPORT_TAIL = (
+    """
+    <div style="font-family:system-ui,Arial,sans-serif;max-width:640px;margin:auto">
+      <h2>Weekly update for {child_display}</h2>
+      <p>Hi {parent_display},</p>
+      <p>Here is how <strong>{child_display}</strong> did on Typing.com for {period_str}:</p>
+      {week_html}
+      <p>Latest typing score: <strong>{latest_wpm} WPM</strong> at {latest_accuracy}% accuracy. Keep going!</p>
+    </div>
+    """.strip().split("{week_html}")
+)
+WEEKLY_REPORT_HEAD_TEMPLATE = CompiledTemplate(_WEEKLY_REPORT_HEAD, escape=escape)
+WEEKLY_REPORT_TAIL_TEMPLATE = CompiledTemplate(_WEEKLY_REPORT_TAIL, escape=escape)
+WEEKLY_PRACTICE_TEMPLATE = CompiledTemplate(
+    """<ul>
+        <li><strong>Practice sessions:</strong> {practice_count}</li>
+        <li><strong>Time practiced:</strong> {practice_minutes} minutes</li>
+        <li><strong>Best speed:</strong> {best_wpm} WPM</li>
+        <li><strong>Average accuracy:</strong> {average_accuracy}</li>
+      </ul>""",
+    escape=escape,
+)
+WEEKLY_NO_PRACTICE_HTML = "<p>No practice was logged this week.</p>"
+
+
+def confirmation_email_html(
+    *,
+    parent_name: Optional[str],
+    child_name: Optional[str],
+    when: datetime,
+    meet_link: str,
+    launchpad_url: str,
+    typing_class_link: Optional[str] = None,
+    ics_link: Optional[str] = None,
+) -> str:
+    template = CONFIRMATION_TEMPLATE if ics_link else CONFIRMATION_NO_CALENDAR_TEMPLATE
+    return template.render(
+        parent_display=parent_name or "there",
+        child_display=child_name or "your student",
+        date_str=when.strftime(DATE_FORMAT),
+        meet_link=meet_link,
+        ics_link=ics_link,
+        typing_class_link=typing_class_link,
+        launchpad_url=launchpad_url,
+    )
+
+
+@lru_cache(maxsize=1024)
+def _session_confirmation(
+    session_id: int,
+    version: int,
+    title: str,
+    start: datetime,
+    end: datetime,
+    meet_link: str,
+    typing_class_link: Optional[str],
+) -> CompiledTemplate:
+    # Keyed by session version plus every value rendered, so edits that change
+    # any of them (and bump the version) never hit a stale entry.
+    ics_head, ics_tail = ics_data_url_parts(title, start, end, meet_link)
+    return CONFIRMATION_SESSION_TEMPLATE.bind(
+        date_str=start.strftime(DATE_FORMAT),
+        meet_link=meet_link,
+        typing_class_link=typing_class_link,
+        ics_head=ics_head,
+        ics_tail=ics_tail,
+    )
+
+
+def session_confirmation_email_html(
+    *,
+    session_id: int,
+    version: int,
+    course: str,
+    start: datetime,
+    end: datetime,
+    meet_link: str,
+    typing_class_link: Optional[str],
+    student_id: int,
+    parent_name: Optional[str],
+    child_name: Optional[str],
+    launchpad_url: str,
+) -> str:
+    """Confirmation email with an inline calendar invite, reusing the session's cached parts."""
+
+    template = _session_confirmation(
+        session_id, version, f"Serenity's Keys - {course}", start, end, meet_link, typing_class_link
+    )
+    return template.render(
+        parent_display=parent_name or "there",
+        child_display=child_name or "your student",
+        launchpad_url=launchpad_url,
+        ics_uid=quote(f"sk-{session_id}-{student_id}"),
+    )
+
+
+def waitlist_offer_email_html(
+    *,
+    parent_name: Optional[str],
+    child_name: Optional[str],
+    when: datetime,
+    hold_until: datetime,
+    booking_url: str,
+) -> str:
+    return WAITLIST_OFFER_TEMPLATE.render(
+        parent_display=parent_name or "there",
+        child_display=child_name or "your student",
+        date_str=when.strftime(DATE_FORMAT),
+        hold_str=hold_until.strftime(DATE_FORMAT),
+        booking_url=booking_url,
+    )
+
+
+def reminder_email_html(
+    *,
+    parent_name: Optional[str],
+    child_name: Optional[str],
+    when: datetime,
+    lead_time: str,
+    meet_link: str,
+    launchpad_url: str,
+) -> str:
+    return REMINDER_TEMPLATE.render(
+        parent_display=parent_name or "there",
+        child_display=child_name or "your student",
+        date_str=when.strftime(DATE_FORMAT),
+        lead_time=lead_time,
+        meet_link=meet_link,
+        launchpad_url=launchpad_url,
+    )
+
+
+def weekly_report_html(
+    *,
+    parent_name: Optional[str],
+    child_name: Optional[str],
+    period_start: date,
+    period_end: date,
+    practice_count: int,
+    practice_minutes: Optional[float],
+    best_wpm: Optional[int],
+    average_accuracy: Optional[float],
+    latest_wpm: Optional[int],
+    latest_accuracy: Optional[float],
+) -> str:
+    if practice_count:
+        week_html = WEEKLY_PRACTICE_TEMPLATE.render(
+            practice_count=practice_count,
+            practice_minutes=round(practice_minutes or 0),
+            best_wpm=best_wpm or "n/a",
+            average_accuracy=f"{average_accuracy:.1f}%" if average_accuracy is not None else "n/a",
+        )
+    else:
+        week_html = WEEKLY_NO_PRACTICE_HTML
+    head = WEEKLY_REPORT_HEAD_TEMPLATE.render(
+        parent_display=parent_name or "there",
+        child_display=child_name or "your student",
+        period_str=f"{period_start.strftime('%B %d')} - {period_end.strftime('%B %d')}",
+    )
+    tail = WEEKLY_REPORT_TAIL_TEMPLATE.render(latest_wpm=latest_wpm or "n/a", latest_accuracy=latest_accuracy or "n/a")
+    return head + week_html + tail
@@ -0,0 +1,27 @@
+"""Entity tag helpers for conditional GET support."""
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Optional
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from the given version parts."""
+
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return True when an ``If-None-Match`` header matches ``etag``.
+
+    ``If-None-Match`` uses the weak comparison function, so a ``W/`` prefix
+    on the client's copy is ignored.
+    """
+
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
@@ -1,35 +1,81 @@
 """ICS file utilities."""
 from __future__ import annotations
 
+from collections.abc import Iterable
 from datetime import datetime
+from typing import Any
 from urllib.parse import quote
 
 from ..config import get_settings
+from .templates import CompiledTemplate
 
 settings = get_settings()
 
+DT_FORMAT = "%Y%m%dT%H%M%S"
+
+ICS_TEMPLATE = CompiledTemplate(
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "PRODID:-//SerenitysKeys//EN\r\n"
+    "BEGIN:VEVENT\r\n"
+    "UID:{uid}\r\n"
+    "SUMMARY:{title}\r\n"
+    "DTSTART;TZID={timezone}:{start}\r\n"
+    "DTEND;TZID={timezone}:{end}\r\n"
+    "DESCRIPTION:Join: {meet_url}\r\n"
+    "URL:{meet_url}\r\n"
+    "END:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+FEED_HEADER = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "PRODID:-//SerenitysKeys//EN\r\n"
+    "X-WR-CALNAME:Serenity's Keys\r\n"
+    "REFRESH-INTERVAL;VALUE=DURATION:PT1H\r\n"
+    "X-PUBLISHED-TTL:PT1H\r\n"
+)
+FEED_FOOTER = "END:VCALENDAR\r\n"
+FEED_EVENT_TEMPLATE = CompiledTemplate(
+    "BEGIN:VEVENT\r\n"
+    "UID:{uid}\r\n"
+    "SEQUENCE:{sequence}\r\n"
+    "DTSTAMP:{stamp}\r\n"
+    "SUMMARY:{title}\r\n"
+    "DTSTART;TZID={timezone}:{start}\r\n"
+    "DTEND;TZID={timezone}:{end}\r\n"
+    "DESCRIPTION:Join: {meet_url}\r\n"
+    "URL:{meet_url}\r\n"
+    "END:VEVENT\r\n"
+)
+
+# Stand-in UID used to split a pre-encoded data: URL around the per-recipient UID.
+_UID_MARKER = "SK-UID-MARKER"
+
+
+def _local_time(value: datetime) -> str:
+    """Format ``value`` as a ``TZID=<settings.timezone>`` local time.
+
+    Aware values (Postgres returns UTC) are converted first; naive values are
+    already wall-clock times in the configured timezone.
+    """
+
+    if value.tzinfo:
+        value = value.astimezone(settings.timezone_info)
+    return value.strftime(DT_FORMAT)
+
 
 def make_ics(uid: str, title: str, start: datetime, end: datetime, meet_url: str) -> str:
     """Generate a barebones ICS calendar string."""
 
-    dt_format = "%Y%m%dT%H%M%S"
-    start_str = start.strftime(dt_format)
-    end_str = end.strftime(dt_format)
-    timezone = settings.timezone.replace("/", "\\/")
-
-    return (
-        "BEGIN:VCALENDAR\r\n"
-        "VERSION:2.0\r\n"
-        "PRODID:-//SerenitysKeys//EN\r\n"
-        "BEGIN:VEVENT\r\n"
-        f"UID:{uid}\r\n"
-        f"SUMMARY:{title}\r\n"
-        f"DTSTART;TZID={timezone}:{start_str}\r\n"
-        f"DTEND;TZID={timezone}:{end_str}\r\n"
-        f"DESCRIPTION:Join: {meet_url}\r\n"
-        f"URL:{meet_url}\r\n"
-        "END:VEVENT\r\n"
-        "END:VCALENDAR\r\n"
+    return ICS_TEMPLATE.render(
+        uid=uid,
+        title=title,
+        timezone=settings.timezone.replace("/", "\\/"),
+        start=_local_time(start),
+        end=_local_time(end),
+        meet_url=meet_url,
     )
 
 
@@ -37,3 +83,50 @@ def ics_data_url(ics_content: str) -> str:
     """Return a data URI suitable for inline ICS downloads."""
 
     return f"data:text/calendar;charset=utf-8,{quote(ics_content)}"
+
+
+def ics_data_url_parts(title: str, start: datetime, end: datetime, meet_url: str) -> tuple[str, str]:
+    """Return the event's ``data:`` URI split around its UID.
+
+    URL-encoding works character by character, so ``head + quote(uid) + tail``
+    equals ``ics_data_url(make_ics(uid, ...))`` while the calendar body is only
+    built and encoded once per event.
+    """
+
+    head, tail = ics_data_url(make_ics(_UID_MARKER, title, start, end, meet_url)).split(quote(_UID_MARKER))
+    return head, tail
+
+
+def escape_text(value: str) -> str:
+    """Escape an ICS TEXT value (RFC 5545 section 3.3.11)."""
+
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def make_ics_feed(events: Iterable[dict[str, Any]], *, stamp: datetime) -> str:
+    """Build a multi-event calendar for a subscription feed.
+
+    Each event needs ``uid``, ``title``, ``start``, ``end``, ``meet_url`` and
+    ``sequence`` (bump it when the event changes so clients update their copy).
+    """
+
+    timezone = settings.timezone.replace("/", "\\/")
+    stamp_str = stamp.strftime(DT_FORMAT) + "Z"
+    parts = [FEED_HEADER]
+    for event in events:
+        parts.append(
+            FEED_EVENT_TEMPLATE.render(
+                uid=event["uid"],
+                sequence=event["sequence"],
+                stamp=stamp_str,
+                title=escape_text(event["title"]),
+                timezone=timezone,
+                start=_local_time(event["start"]),
+                end=_local_time(event["end"]),
+                meet_url=event["meet_url"],
+            )
+        )
+    parts.append(FEED_FOOTER)
+    return "".join(parts)
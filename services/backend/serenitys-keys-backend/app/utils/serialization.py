@@ -0,0 +1,44 @@
+"""Fast JSON encoding for trusted, already-shaped response payloads."""
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi import Response
+
+try:  # Optional dependency - stdlib json is used when missing
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        text = value.isoformat()
+        # Match pydantic, which writes a zero UTC offset as "Z".
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode ``content`` to JSON bytes, preferring orjson when installed."""
+
+    if orjson is not None:
+        # OPT_UTC_Z keeps datetimes identical to the response_model output ("Z", naive left naive).
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response that skips FastAPI's ``response_model`` round trip.
+
+    Returning a ``Response`` bypasses validation and ``jsonable_encoder``, so
+    only use it for payloads built directly from database rows whose shape
+    already matches the declared response model.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
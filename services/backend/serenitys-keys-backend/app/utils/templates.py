@@ -0,0 +1,67 @@
+"""Precompiled string templates for email and calendar rendering."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from string import Formatter
+from typing import Any, Optional, Union
+
+_Part = Union[str, tuple[str]]
+
+
+class CompiledTemplate:
+    """A ``{name}`` template parsed once into literal chunks and field slots.
+
+    ``render`` only fills the slots and joins, so there is no per-call parsing
+    or formatting. ``bind`` fills some slots ahead of time (e.g. everything
+    that depends only on the session) and returns a smaller template for the
+    per-recipient fields. Values are inserted as-is, like ``str.format``,
+    unless an ``escape`` function (e.g. ``html.escape``) is given, in which case
+    every value is passed through it; bound templates keep the same ``escape``.
+    """
+
+    __slots__ = ("_parts", "_slots", "_escape", "fields")
+
+    def __init__(self, source: Union[str, list[_Part]], *, escape: Optional[Callable[[str], str]] = None) -> None:
+        parts = self._parse(source) if isinstance(source, str) else source
+        merged: list[_Part] = []
+        for part in parts:
+            if isinstance(part, str) and merged and isinstance(merged[-1], str):
+                merged[-1] += part
+            elif part != "":
+                merged.append(part)
+        self._parts = merged
+        self._escape = escape
+        self._slots = [(index, part[0]) for index, part in enumerate(merged) if isinstance(part, tuple)]
+        self.fields = frozenset(name for _, name in self._slots)
+
+    @staticmethod
+    def _parse(source: str) -> list[_Part]:
+        parts: list[_Part] = []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            parts.append(literal)
+            if field is None:
+                continue
+            if spec or conversion or not field.isidentifier():
+                raise ValueError(f"Unsupported template field {{{field}}}")
+            parts.append((field,))
+        return parts
+
+    def _text(self, value: Any) -> str:
+        return self._escape(str(value)) if self._escape else str(value)
+
+    def render(self, **values: Any) -> str:
+        parts = list(self._parts)
+        for index, name in self._slots:
+            parts[index] = self._text(values[name])
+        return "".join(parts)  # type: ignore[arg-type]
+
+    def bind(self, **values: Any) -> "CompiledTemplate":
+        """Return a template with the given fields filled in."""
+
+        unknown = set(values) - self.fields
+        if unknown:
+            raise KeyError(f"Unknown template fields: {', '.join(sorted(unknown))}")
+        return CompiledTemplate(
+            [self._text(values[part[0]]) if isinstance(part, tuple) and part[0] in values else part for part in self._parts],
+            escape=self._escape,
+        )
@@ -0,0 +1,161 @@
+"""Asynchronous processing of inbound webhook events.
+
+The Stripe endpoint only verifies and stores events in ``webhook_events``;
+``WebhookInbox`` drains that table in the background so slow side effects
+(Calendar, email) never hold up Stripe's delivery request.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .models import WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict[str, Any], AsyncSession], Awaitable[None]]
+
+# Events stay in "pending"/"processing"; next_attempt_at doubles as the
+# claim lease, so a worker that dies mid-event is retried after the lease.
+CLAIMABLE_STATUSES = ("pending", "processing")
+
+
+class WebhookInbox:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        poll_seconds: float = 5.0,
+        batch_size: int = 50,
+        max_attempts: int = 8,
+        lease_seconds: float = 300.0,
+        base_backoff_seconds: float = 30.0,
+    ) -> None:
+        self._session_factory = session_factory
+        self._handlers: dict[str, Handler] = {}
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.base_backoff_seconds = base_backoff_seconds
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, event_type: str, handler: Handler) -> None:
+        self._handlers[event_type] = handler
+
+    def notify(self) -> None:
+        """Wake the processor after a new event has been committed."""
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="webhook-inbox")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                processed = await self.process_pending()
+            except Exception:  # pragma: no cover - keep the loop alive
+                logger.exception("Webhook inbox pass failed")
+                processed = 0
+            if processed:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def process_pending(self) -> int:
+        """Process due events in arrival order and return how many were attempted."""
+
+        now = datetime.now(timezone.utc)
+        async with self._session_factory() as db:
+            stmt = (
+                select(WebhookEvent.id)
+                .where(WebhookEvent.status.in_(CLAIMABLE_STATUSES))
+                .where(or_(WebhookEvent.next_attempt_at.is_(None), WebhookEvent.next_attempt_at <= now))
+                .order_by(WebhookEvent.id)
+                .limit(self.batch_size)
+            )
+            event_ids = (await db.execute(stmt)).scalars().all()
+
+        attempted = 0
+        for event_id in event_ids:
+            if await self._process_one(event_id):
+                attempted += 1
+        return attempted
+
+    async def _process_one(self, inbox_id: int) -> bool:
+        now = datetime.now(timezone.utc)
+        async with self._session_factory() as db:
+            # Claim the row; another worker may have taken it since we listed it.
+            claim = await db.execute(
+                update(WebhookEvent)
+                .where(WebhookEvent.id == inbox_id, WebhookEvent.status.in_(CLAIMABLE_STATUSES))
+                .where(or_(WebhookEvent.next_attempt_at.is_(None), WebhookEvent.next_attempt_at <= now))
+                .values(
+                    status="processing",
+                    attempts=WebhookEvent.attempts + 1,
+                    next_attempt_at=now + timedelta(seconds=self.lease_seconds),
+                )
+            )
+            await db.commit()
+            if claim.rowcount != 1:
+                return False
+
+            row = (
+                await db.execute(
+                    select(WebhookEvent.event_id, WebhookEvent.type, WebhookEvent.payload, WebhookEvent.attempts)
+                    .where(WebhookEvent.id == inbox_id)
+                )
+            ).one()
+            handler = self._handlers.get(row.type)
+            error: Optional[str] = None
+            if handler is None:
+                logger.info("Unhandled Stripe webhook type: %s", row.type)
+            else:
+                try:
+                    await handler(row.payload, db)
+                except Exception as exc:
+                    await db.rollback()
+                    logger.exception("Webhook event %s failed (attempt %s)", row.event_id, row.attempts)
+                    error = f"{type(exc).__name__}: {exc}"
+
+            finished = datetime.now(timezone.utc)
+            values: dict[str, Any]
+            if error is None:
+                values = {"status": "processed", "processed_at": finished, "next_attempt_at": None, "last_error": None}
+            elif row.attempts >= self.max_attempts:
+                values = {"status": "failed", "next_attempt_at": None, "last_error": error}
+            else:
+                backoff = self.base_backoff_seconds * 2 ** (row.attempts - 1)
+                values = {
+                    "status": "pending",
+                    "next_attempt_at": finished + timedelta(seconds=backoff),
+                    "last_error": error,
+                }
+            await db.execute(update(WebhookEvent).where(WebhookEvent.id == inbox_id).values(**values))
+            await db.commit()
+        return True
@@ -0,0 +1,75 @@
+"""Check 10k proposed slots against 100k existing sessions for overlaps.
+
+Compares the ``IntervalIndex`` used by session creation with a linear scan
+over every existing interval (timed on a sample and extrapolated).
+
+    python scripts/bench_conflicts.py
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+from app.scheduling import IntervalIndex, partition_conflicts  # noqa: E402
+
+EXISTING = 100_000
+PROPOSED = 10_000
+LINEAR_SAMPLE = 200
+TZ = ZoneInfo("America/Chicago")
+
+
+def _intervals(count: int, rng: random.Random) -> list[tuple[float, float, int]]:
+    # Roughly ten years of 45-minute sessions in 15-minute steps, so some overlap.
+    base = datetime(2026, 1, 1, tzinfo=TZ).timestamp()
+    span = 10 * 365 * 24 * 3600
+    items = []
+    for i in range(count):
+        start = base + rng.randrange(0, span, 900)
+        items.append((start, start + 45 * 60, i))
+    return items
+
+
+def _linear_overlap(existing: list[tuple[float, float, int]], start: float, end: float) -> bool:
+    return any(s < end and e > start for s, e, _ in existing)
+
+
+def main() -> None:
+    rng = random.Random(7)
+    existing = _intervals(EXISTING, rng)
+    proposed = [
+        (datetime.fromtimestamp(start, TZ), datetime.fromtimestamp(end, TZ))
+        for start, end, _ in _intervals(PROPOSED, rng)
+    ]
+
+    started = time.perf_counter()
+    index = IntervalIndex(existing)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    free, conflicts = partition_conflicts(index, proposed, TZ)
+    check = time.perf_counter() - started
+
+    sample = proposed[:LINEAR_SAMPLE]
+    started = time.perf_counter()
+    linear_hits = sum(_linear_overlap(existing, s.timestamp(), e.timestamp()) for s, e in sample)
+    linear = (time.perf_counter() - started) / LINEAR_SAMPLE * PROPOSED
+
+    index_hits = sum(index.find_overlap(s.timestamp(), e.timestamp()) is not None for s, e in sample)
+    assert index_hits == linear_hits, (index_hits, linear_hits)
+
+    print(f"{PROPOSED} proposed slots vs {EXISTING} existing sessions")
+    print(f"interval index   build {build * 1000:7.1f} ms | check {check * 1000:7.1f} ms "
+          f"({len(free)} free, {len(conflicts)} conflicts)")
+    print(f"linear scan      check {linear * 1000:7.0f} ms (extrapolated from {LINEAR_SAMPLE} slots)")
+
+
+if __name__ == "__main__":
+    main()
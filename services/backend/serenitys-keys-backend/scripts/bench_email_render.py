@@ -0,0 +1,144 @@
+"""Time rendering 100k confirmation emails: per-message f-strings vs. cached session parts.
+
+The legacy path is the old ``confirmation_email_html`` plus ``make_ics`` and
+``ics_data_url`` for every message. The cached path is
+``session_confirmation_email_html``: the session's date, links and encoded
+calendar invite are bound once per session version and each message only
+fills in the recipient fields. Both escape every value with ``html.escape`` and
+must produce identical HTML.
+
+    python scripts/bench_email_render.py
+"""
+from __future__ import annotations
+
+import sys
+import time
+from datetime import datetime, timedelta
+from html import escape
+from pathlib import Path
+from urllib.parse import quote
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+from app.config import get_settings  # noqa: E402
+from app.utils.email_templates import session_confirmation_email_html  # noqa: E402
+
+MESSAGES = 100_000
+SESSIONS = 200
+LAUNCHPAD = "https://launchpad.example.com/"
+TYPING_LINK = "https://www.typing.com/student/join/abc123"
+
+
+def _legacy_ics(uid: str, title: str, start: datetime, end: datetime, meet_url: str) -> str:
+    dt_format = "%Y%m%dT%H%M%S"
+    timezone = get_settings().timezone.replace("/", "\\/")
+    return (
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "PRODID:-//SerenitysKeys//EN\r\n"
+        "BEGIN:VEVENT\r\n"
+        f"UID:{uid}\r\n"
+        f"SUMMARY:{title}\r\n"
+        f"DTSTART;TZID={timezone}:{start.strftime(dt_format)}\r\n"
+        f"DTEND;TZID={timezone}:{end.strftime(dt_format)}\r\n"
+        f"DESCRIPTION:Join: {meet_url}\r\n"
+        f"URL:{meet_url}\r\n"
+        "END:VEVENT\r\n"
+        "END:VCALENDAR\r\n"
+    )
+
+
+def _legacy_html(parent_name, child_name, when, meet_link, launchpad_url, typing_class_link, ics_link) -> str:
+    date_str = when.strftime("%A, %B %d @ %I:%M %p")
+    add_to_calendar_html = (
+        f'<p><a href="{ics_link}" style="color:#2563eb">Add to calendar</a></p>' if ics_link else ""
+    )
+    child_display = child_name or "your student"
+    parent_display = parent_name or "there"
+    return f"""
+    <div style="font-family:system-ui,Arial,sans-serif;max-width:640px;margin:auto">
+      <h2>You're booked! ??</h2>
+      <p>Hi {parent_display},</p>
+      <p>Your child <strong>{child_display}</strong> is confirmed for a Serenity's Keys session:</p>
+      <ul>
+        <li><strong>When:</strong> {date_str}</li>
+        <li><strong>Where:</strong> Google Meet</li>
+      </ul>
+      <p><a href="{meet_link}" style="background:#0a7;color:#fff;padding:10px 14px;border-radius:6px;text-decoration:none">Join Google Meet</a></p>
+      {add_to_calendar_html}
+      <p><strong>Important: Register for Typing.com</strong></p>
+      <p>Please register your account on Typing.com using this class link:</p>
+      <p><a href="{typing_class_link}" style="color:#2563eb">{typing_class_link}</a></p>
+      <p>Before class, open our Launchpad (Meet + Typing.com in one place):</p>
+      <p><a href="{launchpad_url}">{launchpad_url}</a></p>
+      <hr/>
+      <p style="color:#666;font-size:13px">Tip: Please log in to Typing.com beforehand so it opens instantly from the Launchpad.</p>
+    </div>
+    """.strip()
+
+
+def _sessions() -> list[dict]:
+    first = datetime(2026, 11, 2, 16, 0)
+    return [
+        {
+            "id": i + 1,
+            "version": 3,
+            "course": "group:6-8",
+            "start": first + timedelta(hours=i),
+            "end": first + timedelta(hours=i, minutes=45),
+            "meet_link": f"https://meet.google.com/abc-defg-{i:03d}",
+        }
+        for i in range(SESSIONS)
+    ]
+
+
+def legacy(session: dict, student_id: int) -> str:
+    launchpad_url = f"{LAUNCHPAD}?session_id={session['id']}&student_id={student_id}"
+    ics_content = _legacy_ics(
+        f"sk-{session['id']}-{student_id}",
+        f"Serenity's Keys - {session['course']}",
+        session["start"],
+        session["end"],
+        session["meet_link"],
+    )
+    ics_link = f"data:text/calendar;charset=utf-8,{quote(ics_content)}"
+    return _legacy_html(
+        escape(f"Parent {student_id}"), escape(f"Student {student_id}"), session["start"],
+        escape(session["meet_link"]), escape(launchpad_url), escape(TYPING_LINK), escape(ics_link),
+    )
+
+
+def cached(session: dict, student_id: int) -> str:
+    return session_confirmation_email_html(
+        session_id=session["id"],
+        version=session["version"],
+        course=session["course"],
+        start=session["start"],
+        end=session["end"],
+        meet_link=session["meet_link"],
+        typing_class_link=TYPING_LINK,
+        student_id=student_id,
+        parent_name=f"Parent {student_id}",
+        child_name=f"Student {student_id}",
+        launchpad_url=f"{LAUNCHPAD}?session_id={session['id']}&student_id={student_id}",
+    )
+
+
+def main() -> None:
+    sessions = _sessions()
+    jobs = [(sessions[i % SESSIONS], i + 1) for i in range(MESSAGES)]
+    for session, student_id in jobs[:SESSIONS * 2]:
+        assert legacy(session, student_id) == cached(session, student_id)
+    print(f"{MESSAGES} confirmations across {SESSIONS} sessions (outputs verified identical)")
+    for label, render in (("legacy", legacy), ("cached", cached)):
+        started = time.perf_counter()
+        for session, student_id in jobs:
+            render(session, student_id)
+        elapsed = time.perf_counter() - started
+        print(f"  {label:<7} {elapsed:6.2f} s  {elapsed / MESSAGES * 1e6:6.1f} us/message")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Measure event-loop lag while blocking SDK calls run inline vs. on the integration pool.
+
+Simulates a burst of Stripe/Google calls (a blocking ``time.sleep``) alongside
+a probe that wakes every 5 ms and records how late it was scheduled.
+
+    python scripts/bench_event_loop_lag.py
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+from app.integrations.executor import IntegrationExecutor  # noqa: E402
+
+CALLS = 40
+CALL_SECONDS = 0.05
+PROBE_INTERVAL = 0.005
+
+
+def fake_sdk_call() -> str:
+    time.sleep(CALL_SECONDS)
+    return "https://checkout.stripe.com/c/pay/cs_test"
+
+
+async def _probe(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(time.perf_counter() - expected, 0.0))
+
+
+async def _inline_request() -> None:
+    fake_sdk_call()
+    await asyncio.sleep(0)
+
+
+async def _pooled_request(executor: IntegrationExecutor) -> None:
+    await executor.run("bench.fake_sdk_call", fake_sdk_call)
+
+
+async def _measure(label: str, make_request) -> None:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(make_request() for _ in range(CALLS)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(
+        f"{label:<22} wall {elapsed * 1000:7.0f} ms | loop lag p50 {statistics.median(lags_ms):6.1f} ms "
+        f"p99 {p99:6.1f} ms max {lags_ms[-1]:6.1f} ms"
+    )
+
+
+async def main() -> None:
+    executor = IntegrationExecutor(max_workers=8, name="bench")
+    print(f"{CALLS} concurrent blocking calls of {CALL_SECONDS * 1000:.0f} ms each")
+    await _measure("inline on event loop", _inline_request)
+    await _measure("integration executor", lambda: _pooled_request(executor))
+    print("executor stats:", executor.snapshot())
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
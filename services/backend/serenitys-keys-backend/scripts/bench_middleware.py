@@ -0,0 +1,191 @@
+"""Requests/second through the legacy ``@app.middleware("http")`` layers vs. the ASGI middleware.
+
+The legacy stack is the four ``BaseHTTPMiddleware`` functions the app used to
+register (request id, DB timing, read-your-writes cookie, error handling),
+rebuilt here around the same app in place of ``RequestContextMiddleware``.
+Requests are driven in-process through ``httpx.ASGITransport`` by
+``CONCURRENCY`` clients against a seeded SQLite database, so the numbers show
+per-request middleware cost without socket overhead.
+
+    python scripts/bench_middleware.py
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+REQUESTS = 1_000
+CONCURRENCY = 16
+ROUNDS = 3
+SESSIONS = 60
+
+
+def _legacy_middleware():
+    """The four ``@app.middleware("http")`` layers, outermost first, as they were registered."""
+
+    from fastapi import HTTPException, Request, Response, status
+    from fastapi.responses import JSONResponse
+
+    from app.db import read_engine, recent_write_cookie
+    from app.exceptions import BaseAPIException
+    from app.instrumentation import server_timing, track_queries
+    from app.main import log
+
+    async def add_request_id(request: Request, call_next):
+        request_id = request.headers.get("x-request-id") or str(uuid.uuid4())
+        response: Response = await call_next(request)
+        response.headers["x-request-id"] = request_id
+        return response
+
+    async def record_db_timing(request: Request, call_next):
+        started = time.perf_counter()
+        with track_queries() as stats:
+            response: Response = await call_next(request)
+        elapsed = time.perf_counter() - started
+        response.headers["Server-Timing"] = server_timing(stats, elapsed)
+        log(
+            "http_request",
+            method=request.method,
+            path=request.url.path,
+            status=response.status_code,
+            duration_ms=round(elapsed * 1000, 2),
+            db_queries=stats.queries,
+            db_ms=stats.milliseconds,
+        )
+        return response
+
+    async def pin_recent_writers(request: Request, call_next):
+        response: Response = await call_next(request)
+        session = getattr(request.state, "db_session", None)
+        if read_engine is not None and session is not None and session.info.get("committed"):
+            response.headers.append("set-cookie", recent_write_cookie())
+        return response
+
+    async def error_handling_middleware(request: Request, call_next):
+        try:
+            return await call_next(request)
+        except BaseAPIException as exc:
+            return JSONResponse(
+                status_code=exc.status_code,
+                content={"error": True, "code": exc.error_code, "message": exc.detail, "details": exc.extra},
+            )
+        except HTTPException as exc:
+            return JSONResponse(
+                status_code=exc.status_code, content={"error": True, "code": "HTTP_ERROR", "message": exc.detail}
+            )
+        except Exception:
+            return JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content={"error": True, "code": "INTERNAL_SERVER_ERROR", "message": "An unexpected error occurred"},
+            )
+
+    return [error_handling_middleware, pin_recent_writers, record_db_timing, add_request_id]
+
+
+def _use_stack(app, stack: str) -> None:
+    from starlette.middleware import Middleware
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    from app.middleware import RequestContextMiddleware
+
+    if not hasattr(app.state, "asgi_middleware"):
+        app.state.asgi_middleware = list(app.user_middleware)
+    middleware = list(app.state.asgi_middleware)
+    if stack == "legacy":
+        middleware = [entry for entry in middleware if entry.cls is not RequestContextMiddleware]
+        middleware[:0] = [Middleware(BaseHTTPMiddleware, dispatch=fn) for fn in _legacy_middleware()]
+    app.user_middleware = middleware
+    app.middleware_stack = app.build_middleware_stack()
+
+
+async def _seed() -> None:
+    from sqlalchemy import insert
+
+    from app.db import Base, engine
+    from app.models import Session
+
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(Session),
+            [
+                {
+                    "course": "group:6-8",
+                    "start_ts": start + timedelta(hours=8 * i),
+                    "end_ts": start + timedelta(hours=8 * i, minutes=45),
+                    "mode": "remote",
+                    "capacity": 4,
+                    "location": "Google Meet",
+                    "status": "scheduled",
+                }
+                for i in range(SESSIONS)
+            ],
+        )
+
+
+async def _requests_per_second(client, method: str, path: str, body: object) -> float:
+    remaining = REQUESTS
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            response = await client.request(method, path, json=body)
+            assert response.status_code == 200, response.text
+            assert "x-request-id" in response.headers and "server-timing" in response.headers
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return REQUESTS / (time.perf_counter() - started)
+
+
+async def _bench() -> None:
+    import httpx
+
+    from app.db import engine
+    from app.main import app
+
+    await _seed()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    endpoints = [("GET", "/health", None), ("POST", "/api/availability", {})]
+    print(f"{REQUESTS} requests per run, {CONCURRENCY} concurrent clients, best of {ROUNDS}")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for method, path, body in endpoints:
+            best: dict[str, float] = {}
+            for stack in ("legacy", "asgi"):
+                _use_stack(app, stack)
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    await client.request(method, path, json=body)  # warm up
+                    best[stack] = max([await _requests_per_second(client, method, path, body) for _ in range(ROUNDS)])
+            gain = (best["asgi"] / best["legacy"] - 1) * 100
+            print(
+                f"  {method:<4} {path:<18} legacy {best['legacy']:7.0f} req/s   "
+                f"asgi {best['asgi']:7.0f} req/s   {gain:+5.1f}%"
+            )
+    await engine.dispose()
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tmp}/bench.db"
+        os.environ["APP_ENV"] = "bench"
+        os.environ["SLOW_QUERY_MS"] = "0"
+        asyncio.run(_bench())
+
+
+if __name__ == "__main__":
+    main()
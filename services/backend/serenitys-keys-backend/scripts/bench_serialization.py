@@ -0,0 +1,92 @@
+"""Compare list-endpoint serialization: response_model round trip vs. the fast path.
+
+Run from the backend root:
+
+    python scripts/bench_serialization.py
+"""
+from __future__ import annotations
+
+import json
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from pydantic import TypeAdapter
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+from app.schemas import MetricOut, SessionOut  # noqa: E402
+from app.utils import serialization  # noqa: E402
+
+SESSION_COUNT = 5_000
+METRIC_COUNT = 50_000
+REPEAT = 5
+
+
+def _session_rows() -> list[dict]:
+    tz = ZoneInfo("America/Chicago")
+    start = datetime(2025, 1, 6, 16, 0, tzinfo=tz)
+    return [
+        {
+            "id": idx,
+            "course": "group:9-11",
+            "start_ts": start + timedelta(hours=idx),
+            "end_ts": start + timedelta(hours=idx, minutes=45),
+            "mode": "remote",
+            "capacity": 4,
+            "location": "Google Meet",
+            "meet_link": "https://meet.google.com/abc-defg-hij",
+            "status": "scheduled",
+            "seats_available": idx % 5,
+        }
+        for idx in range(SESSION_COUNT)
+    ]
+
+
+def _metric_rows() -> list[dict]:
+    return [
+        {
+            "id": idx,
+            "student_id": idx % 300,
+            "date": date(2025, 1, 1) + timedelta(days=idx % 365),
+            "wpm": 20 + idx % 60,
+            "accuracy": 90.5,
+            "time_spent": 12.0,
+            "source": "typing.com",
+            "raw_blob": {"student": "Skylar", "wpm": "42", "accuracy": "90.5"},
+        }
+        for idx in range(METRIC_COUNT)
+    ]
+
+
+def _response_model_path(model, rows: list[dict]) -> bytes:
+    """What the endpoints did before: validate per row, re-validate, encode with stdlib json."""
+
+    items = [model.model_validate(row) for row in rows]
+    adapter = TypeAdapter(list[model])
+    validated = adapter.validate_python(items)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _report(label: str, model, rows: list[dict]) -> None:
+    baseline = min(timeit.repeat(lambda: _response_model_path(model, rows), number=1, repeat=REPEAT))
+    fast = min(timeit.repeat(lambda: serialization.dumps(rows), number=1, repeat=REPEAT))
+    encoder = "orjson" if serialization.orjson is not None else "json"
+    print(
+        f"{label:<16} response_model {baseline * 1000:8.1f} ms | "
+        f"fast path ({encoder}) {fast * 1000:7.1f} ms | {baseline / fast:5.1f}x"
+    )
+
+
+def main() -> None:
+    _report(f"{SESSION_COUNT} sessions", SessionOut, _session_rows())
+    _report(f"{METRIC_COUNT} metrics", MetricOut, _metric_rows())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Time creating a year of sessions for every course: per-row ORM vs. bulk series insert.
+
+The per-row path mirrors the old seed loop (SELECT for an existing slot, then
+``db.add``); the bulk path is what ``POST /api/admin/sessions/series`` does.
+
+    python scripts/bench_session_series.py
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+from app.db import Base  # noqa: E402
+from app.models import Session  # noqa: E402
+from app.scheduling import bulk_create_sessions, expand_series  # noqa: E402
+
+TZ = ZoneInfo("America/Chicago")
+COURSES = ["group:3-5", "group:6-8", "group:9-11", "group:12-14", "private:all"]
+EVERY_DAY = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+
+def _year_of_rows() -> list[dict]:
+    starts_on = date(2026, 1, 1)
+    rows = []
+    for index, course in enumerate(COURSES):
+        for start_ts, end_ts in expand_series(
+            by_weekday=EVERY_DAY,
+            start_time=dt_time(hour=15 + index),
+            duration_minutes=45,
+            starts_on=starts_on,
+            until=starts_on + timedelta(days=364),
+            tz=TZ,
+        ):
+            rows.append(
+                {
+                    "course": course,
+                    "start_ts": start_ts,
+                    "end_ts": end_ts,
+                    "mode": "remote",
+                    "capacity": 4,
+                    "location": "Google Meet",
+                    "status": "scheduled",
+                    "version": 1,
+                }
+            )
+    return rows
+
+
+async def _per_row(db: AsyncSession, rows: list[dict]) -> int:
+    created = 0
+    for row in rows:
+        existing = await db.execute(
+            select(Session.id).where(Session.course == row["course"], Session.start_ts == row["start_ts"])
+        )
+        if existing.scalar_one_or_none() is None:
+            db.add(Session(**row))
+            created += 1
+    await db.commit()
+    return created
+
+
+async def _bulk(db: AsyncSession, rows: list[dict]) -> int:
+    created = await bulk_create_sessions(db, rows)
+    await db.commit()
+    return created
+
+
+async def _measure(label: str, create) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/bench.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        rows = _year_of_rows()
+        timings = []
+        for _ in range(2):  # second pass: every slot already exists
+            async with factory() as db:
+                started = time.perf_counter()
+                created = await create(db, rows)
+                timings.append((time.perf_counter() - started, created))
+        await engine.dispose()
+    (first, created), (second, skipped_created) = timings
+    print(
+        f"{label:<10} {len(rows)} slots: create {first * 1000:7.0f} ms ({created} rows) | "
+        f"re-run {second * 1000:7.0f} ms ({skipped_created} rows)"
+    )
+
+
+async def main() -> None:
+    started = time.perf_counter()
+    rows = _year_of_rows()
+    print(f"expand_series for {len(COURSES)} courses x 1 year: {(time.perf_counter() - started) * 1000:.1f} ms")
+    await _measure("per-row", _per_row)
+    await _measure("bulk", _bulk)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
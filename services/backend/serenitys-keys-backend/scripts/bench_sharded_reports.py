@@ -0,0 +1,202 @@
+"""Time the weekly report job across 1, 2 and 4 worker processes.
+
+Seeds a throwaway SQLite database with ``STUDENTS`` students (two thirds with
+recent metrics), then starts N processes that each call ``weekly_reports()``
+at once, the way every uvicorn worker's scheduler does on Sunday. The workers
+split the run through ``job_shards``; the script checks every student with
+metrics got exactly one report email and prints wall time per worker count, next to
+the old one-query-per-student loop. A last run shows the following week when
+only a few students practised: only they are reported on.
+
+Worker scaling needs at least as many CPU cores as workers and a database that
+takes concurrent writers: SQLite serializes every commit, so on SQLite extra
+workers mostly add lock waits. Point ``BENCH_DATABASE_URL`` at an empty
+Postgres database (``postgresql+asyncpg://...``) to see the multi-worker curve.
+
+    python scripts/bench_sharded_reports.py
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+STUDENTS = 20_000
+WORKER_COUNTS = (1, 2, 4)
+SHARD_SIZE = 500
+
+
+def _configure(db_path: str) -> None:
+    os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL") or f"sqlite+aiosqlite:///{db_path}"
+    os.environ["APP_ENV"] = "bench"
+    os.environ["REPORT_SHARD_SIZE"] = str(SHARD_SIZE)
+    os.environ["REPORT_SHARD_CONCURRENCY"] = "4"
+
+
+async def _seed() -> int:
+    from sqlalchemy import insert
+
+    from app.db import Base, engine
+    from app.models import Metric, Parent, Student
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(Parent), [{"name": f"Parent {i}", "email": f"parent{i}@example.com"} for i in range(1, STUDENTS + 1)]
+        )
+        await conn.execute(
+            insert(Student), [{"name": f"Student {i}", "parent_id": i} for i in range(1, STUDENTS + 1)]
+        )
+        today = date.today()
+        metrics = []
+        for i in range(1, STUDENTS + 1):
+            if i % 3 == 0:
+                continue
+            for days_ago in range(0, 28, 7):
+                metrics.append(
+                    {"student_id": i, "date": today - timedelta(days=days_ago), "wpm": 20 + i % 40, "accuracy": 92.5}
+                )
+        await conn.execute(insert(Metric), metrics)
+    await engine.dispose()
+    return STUDENTS - STUDENTS // 3
+
+
+async def _reset() -> None:
+    from sqlalchemy import delete
+
+    from app.db import engine
+    from app.models import JobShard, OutboundEmail, Report, ReportRun
+
+    async with engine.begin() as conn:
+        for model in (JobShard, OutboundEmail, Report, ReportRun):
+            await conn.execute(delete(model))
+    await engine.dispose()
+
+
+async def _count_emails() -> tuple[int, int]:
+    from sqlalchemy import func, select
+
+    from app.db import engine
+    from app.models import OutboundEmail
+
+    async with engine.connect() as conn:
+        total, distinct = (
+            await conn.execute(select(func.count(), func.count(func.distinct(OutboundEmail.to_email))))
+        ).one()
+    await engine.dispose()
+    return total, distinct
+
+
+async def _legacy_loop() -> int:
+    """The pre-sharding job body: one query per student, then a parent lookup."""
+
+    from sqlalchemy import select
+
+    from app.db import AsyncSessionLocal, engine
+    from app.models import Metric, Parent, Student
+    from app.outbox import EmailOutbox
+
+    cutoff = date.today() - timedelta(days=14)
+    queued = 0
+    async with AsyncSessionLocal() as db:
+        for student in (await db.execute(select(Student))).scalars().all():
+            metric = (
+                await db.execute(select(Metric).where(Metric.student_id == student.id).order_by(Metric.date.desc()))
+            ).scalars().first()
+            if not metric or metric.date < cutoff:
+                continue
+            parent = await db.get(Parent, student.parent_id)
+            EmailOutbox.enqueue(db, parent.email, "Weekly", f"<p>{student.name}: {metric.wpm} WPM</p>")
+            queued += 1
+        await db.commit()
+    await engine.dispose()
+    return queued
+
+
+async def _next_week(active: int) -> tuple[float, int]:
+    """Add metrics for ``active`` students, then time the following week's run."""
+
+    from sqlalchemy import insert
+
+    from app.db import AsyncSessionLocal, engine
+    from app.models import Metric
+    from app.reports import generate_weekly_reports
+
+    next_sunday = date.today() + timedelta(days=7)
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(Metric),
+            [{"student_id": i, "date": next_sunday, "wpm": 50, "accuracy": 95.0} for i in range(1, active + 1)],
+        )
+    started = time.perf_counter()
+    written = await generate_weekly_reports(AsyncSessionLocal, next_sunday)
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return elapsed, written
+
+
+def _worker(db_path: str, start: multiprocessing.synchronize.Event, results: multiprocessing.Queue) -> None:
+    _configure(db_path)
+    from app.db import engine
+    from app.scheduler import weekly_reports
+
+    async def run() -> int:
+        start.wait()
+        try:
+            return await weekly_reports()
+        finally:
+            await engine.dispose()
+
+    results.put(asyncio.run(run()))
+
+
+def _run_workers(db_path: str, workers: int) -> tuple[float, list[int]]:
+    ctx = multiprocessing.get_context("spawn")
+    start, results = ctx.Event(), ctx.Queue()
+    processes = [ctx.Process(target=_worker, args=(db_path, start, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    time.sleep(2.0)  # let every process finish importing the app
+    started = time.perf_counter()
+    start.set()
+    queued = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+    return elapsed, queued
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = f"{tmp}/bench.db"
+        _configure(db_path)
+        eligible = asyncio.run(_seed())
+        print(f"{STUDENTS} students, {eligible} with metrics, shards of {SHARD_SIZE}")
+
+        started = time.perf_counter()
+        queued = asyncio.run(_legacy_loop())
+        print(f"  legacy loop   1 worker : {time.perf_counter() - started:6.2f} s  queued {queued}")
+
+        for workers in WORKER_COUNTS:
+            asyncio.run(_reset())
+            elapsed, queued = _run_workers(db_path, workers)
+            total, distinct = asyncio.run(_count_emails())
+            status = "ok" if total == distinct == eligible else f"MISMATCH total={total} distinct={distinct}"
+            print(f"  sharded     {workers} worker{'s' if workers > 1 else ' '}: {elapsed:6.2f} s  per worker {queued}  {status}")
+
+        elapsed, written = asyncio.run(_next_week(200))
+        print(f"  next week, 200 active students, 1 worker: {elapsed:6.2f} s  reports {written}")
+
+
+if __name__ == "__main__":
+    main()
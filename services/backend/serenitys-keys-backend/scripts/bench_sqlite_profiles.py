@@ -0,0 +1,164 @@
+"""Mixed read/write load on SQLite with the default and tuned profiles.
+
+For each ``SQLITE_PROFILE`` a fresh process seeds a throwaway database, then
+runs ``WRITERS`` tasks doing checkout-shaped transactions (load the session,
+count its seats, insert an enrollment, bump the session version, commit)
+alongside ``READERS`` tasks running the availability query. Both profiles do
+the same fixed amount of work; the script prints total time, p50/p95/max
+latencies and how many operations failed with ``database is locked``.
+
+    python scripts/bench_sqlite_profiles.py
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+PROFILES = ("default", "tuned")
+SESSIONS = 500
+STUDENTS = 5_000
+WRITERS = 8
+WRITES_PER_WRITER = 150
+READERS = 16
+READS_PER_READER = 150
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    return statistics.quantiles(samples, n=100)[pct - 1] if len(samples) > 1 else samples[0]
+
+
+async def _bench() -> dict[str, object]:
+    from sqlalchemy import func, insert, select, update
+    from sqlalchemy.exc import OperationalError
+
+    from app.db import AsyncSessionLocal, Base, engine
+    from app.models import Enrollment, Parent, Session, Student
+    from app.seats import SEAT_HOLDING_JOIN, count_active_enrollments
+
+    base = datetime(2030, 1, 7, 16, 0)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Parent), [{"name": f"P{i}", "email": f"p{i}@example.com"} for i in range(STUDENTS)])
+        await conn.execute(insert(Student), [{"name": f"S{i}", "parent_id": i + 1} for i in range(STUDENTS)])
+        await conn.execute(
+            insert(Session),
+            [
+                {
+                    "course": "group:6-8",
+                    "start_ts": base + timedelta(hours=i),
+                    "end_ts": base + timedelta(hours=i, minutes=45),
+                    "mode": "remote",
+                    "capacity": 1000,
+                    "location": "Google Meet",
+                    "status": "scheduled",
+                }
+                for i in range(SESSIONS)
+            ],
+        )
+
+    write_latencies: list[float] = []
+    read_latencies: list[float] = []
+    locked = {"reads": 0, "writes": 0}
+
+    async def writer(worker: int) -> None:
+        for n in range(WRITES_PER_WRITER):
+            student_id = (worker * WRITES_PER_WRITER + n) % STUDENTS + 1
+            session_id = (worker * 7919 + n * 31) % SESSIONS + 1
+            started = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    session_obj = await db.get(Session, session_id)
+                    await count_active_enrollments(db, session_obj.id)
+                    await db.execute(
+                        insert(Enrollment).prefix_with("OR IGNORE"),
+                        {"student_id": student_id, "session_id": session_id, "status": "pending"},
+                    )
+                    await db.execute(
+                        update(Session).where(Session.id == session_id).values(version=Session.version + 1)
+                    )
+                    await db.commit()
+            except OperationalError as exc:
+                if "locked" not in str(exc):
+                    raise
+                locked["writes"] += 1
+                continue
+            write_latencies.append(time.perf_counter() - started)
+
+    async def reader(worker: int) -> None:
+        for n in range(READS_PER_READER):
+            start_ts = base + timedelta(hours=(worker * 37 + n) % (SESSIONS - 48))
+            started = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        select(Session.id, func.count(Enrollment.id))
+                        .outerjoin(Enrollment, SEAT_HOLDING_JOIN)
+                        .where(Session.start_ts >= start_ts, Session.start_ts <= start_ts + timedelta(hours=48))
+                        .group_by(Session.id)
+                    )
+            except OperationalError as exc:
+                if "locked" not in str(exc):
+                    raise
+                locked["reads"] += 1
+                continue
+            read_latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(i) for i in range(WRITERS)), *(reader(i) for i in range(READERS)))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return {
+        "elapsed": elapsed,
+        "writes": write_latencies,
+        "reads": read_latencies,
+        "locked": locked,
+    }
+
+
+def _run_profile(profile: str, db_path: str, results: multiprocessing.Queue) -> None:
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ["SQLITE_PROFILE"] = profile
+    os.environ["APP_ENV"] = "bench"
+    os.environ["SLOW_QUERY_MS"] = "0"
+    results.put(asyncio.run(_bench()))
+
+
+def main() -> None:
+    print(
+        f"{WRITERS} writers x {WRITES_PER_WRITER} checkout transactions, "
+        f"{READERS} readers x {READS_PER_READER} availability queries"
+    )
+    ctx = multiprocessing.get_context("spawn")
+    for profile in PROFILES:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = ctx.Queue()
+            process = ctx.Process(target=_run_profile, args=(profile, f"{tmp}/bench.db", results))
+            process.start()
+            outcome = results.get()
+            process.join()
+        elapsed, writes, reads = outcome["elapsed"], outcome["writes"], outcome["reads"]
+        print(
+            f"  {profile:<8} {elapsed:6.2f} s  "
+            f"writes p50 {_percentile(writes, 50) * 1000:6.1f} ms "
+            f"p95 {_percentile(writes, 95) * 1000:7.1f} ms max {max(writes, default=0) * 1000:7.1f} ms  "
+            f"reads p50 {_percentile(reads, 50) * 1000:6.1f} ms "
+            f"p95 {_percentile(reads, 95) * 1000:7.1f} ms  "
+            f"locked errors: writes {outcome['locked']['writes']}, reads {outcome['locked']['reads']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Cold-start cost: import time of ``app.main`` and time to the first healthy response.
+
+Migrates a throwaway SQLite database to head, then in fresh processes:
+
+* runs ``python -X importtime -c "import app.main"`` and prints the total plus
+  the top-level packages with the most cumulative import time;
+* starts ``uvicorn app.main:app`` and polls ``/health`` until it answers 200,
+  once with ``SCHEMA_CHECK=verify`` (the default) and once with ``create``
+  (the old ``create_all`` on every boot).
+
+The worst verify-mode time to healthy is compared against
+``COLD_START_TARGET_SECONDS``, the budget for a container to start taking
+traffic; ``--check`` exits non-zero when it is exceeded.
+
+    python scripts/bench_startup.py [--check]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+RUNS = 5
+TOP_PACKAGES = 10
+COLD_START_TARGET_SECONDS = 3.0
+HEALTH_TIMEOUT_SECONDS = 30.0
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _env(db_path: str, schema_check: str) -> dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        DATABASE_URL=f"sqlite+aiosqlite:///{db_path}",
+        APP_ENV="bench",
+        SCHEMA_CHECK=schema_check,
+        PYTHONPATH=str(BASE_DIR),
+    )
+    return env
+
+
+def _import_profile(env: dict[str, str]) -> tuple[float, dict[str, int]]:
+    """Total ``import app.main`` time (s) and cumulative microseconds per top-level package."""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Children are printed before their parent, so collect each top-level import's direct children
+    # until the parent line shows up and keep only those of app.main (site and friends come first).
+    children: list[tuple[str, int]] = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        if len(indent) == 3:
+            children.append((name, int(cumulative)))
+        elif len(indent) == 1:
+            if name == "app.main":
+                packages: dict[str, int] = defaultdict(int)
+                for child, micros in children:
+                    packages[child.split(".")[0]] += micros
+                return int(cumulative) / 1_000_000, packages
+            children = []
+    raise RuntimeError("app.main missing from -X importtime output")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _time_to_healthy(env: dict[str, str]) -> float:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BASE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < HEALTH_TIMEOUT_SECONDS:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {server.returncode} before becoming healthy")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(0.02)
+        raise RuntimeError(f"/health did not answer within {HEALTH_TIMEOUT_SECONDS:.0f} s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="exit 1 if cold start exceeds the target")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = f"{tmp}/bench.db"
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            cwd=BASE_DIR,
+            env=_env(db_path, "off"),
+            capture_output=True,
+            check=True,
+        )
+
+        import_totals: list[float] = []
+        packages: dict[str, int] = defaultdict(int)
+        for _ in range(RUNS):
+            total, per_package = _import_profile(_env(db_path, "verify"))
+            import_totals.append(total)
+            for name, micros in per_package.items():
+                packages[name] += micros
+        print(f"import app.main over {RUNS} runs: median {statistics.median(import_totals) * 1000:6.1f} ms")
+        for name, micros in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:TOP_PACKAGES]:
+            print(f"  {name:<24} {micros / RUNS / 1000:6.1f} ms")
+
+        healthy: dict[str, list[float]] = {}
+        for mode in ("verify", "create"):
+            healthy[mode] = [_time_to_healthy(_env(db_path, mode)) for _ in range(RUNS)]
+            samples = healthy[mode]
+            print(
+                f"time to first healthy /health, SCHEMA_CHECK={mode:<6} "
+                f"median {statistics.median(samples):5.2f} s  max {max(samples):5.2f} s"
+            )
+
+    worst = max(healthy["verify"])
+    verdict = "within" if worst <= COLD_START_TARGET_SECONDS else "OVER"
+    print(f"cold start {worst:.2f} s is {verdict} the {COLD_START_TARGET_SECONDS:.1f} s target")
+    return 1 if args.check and worst > COLD_START_TARGET_SECONDS else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Concurrent checkouts for a session's last seat must produce exactly one hold.
+
+Seeds a throwaway database (tuned SQLite unless ``DATABASE_URL`` is set), then
+for ``ROUNDS`` sessions with one free seat fires ``CONTENDERS`` checkouts at
+once through the app, each for a different student. Every round must end with
+one 200, the rest 409 and a single seat-holding enrollment; the script exits
+non-zero otherwise.
+
+    python scripts/check_checkout_race.py
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import sys
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+ROUNDS = 20
+CONTENDERS = 2
+
+
+async def _seed() -> list[int]:
+    from sqlalchemy import insert
+
+    from app.db import Base, engine
+    from app.models import Parent, Session, Student
+
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(days=2)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Parent), [{"name": f"P{i}", "email": f"race{i}@example.com"} for i in range(CONTENDERS)])
+        await conn.execute(insert(Student), [{"name": f"S{i}", "parent_id": i + 1} for i in range(CONTENDERS)])
+        return list(
+            (
+                await conn.execute(
+                    insert(Session).returning(Session.id),
+                    [
+                        {
+                            "course": "group:6-8",
+                            "start_ts": start + timedelta(hours=i),
+                            "end_ts": start + timedelta(hours=i, minutes=45),
+                            "mode": "remote",
+                            "capacity": 1,
+                            "location": "Google Meet",
+                            "status": "scheduled",
+                            "meet_link": "https://meet.google.com/race-check",
+                            "calendar_event_id": "race-check",
+                        }
+                        for i in range(ROUNDS)
+                    ],
+                )
+            ).scalars()
+        )
+
+
+async def _check() -> bool:
+    import httpx
+    from sqlalchemy import func, select
+
+    from app.db import AsyncSessionLocal, engine
+    from app.main import app, limiter
+    from app.models import Enrollment
+    from app.seats import SEAT_HOLDING_STATUSES
+
+    session_ids = await _seed()
+    limiter.enabled = False
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    ok = True
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+        for session_id in session_ids:
+            body = {
+                "session_id": session_id,
+                "amount_cents": 1500,
+                "success_url": "https://example.com/success",
+                "cancel_url": "https://example.com/cancel",
+            }
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                responses = await asyncio.gather(
+                    *(
+                        client.post("/api/booking/checkout", json={**body, "student_id": student_id})
+                        for student_id in range(1, CONTENDERS + 1)
+                    )
+                )
+            async with AsyncSessionLocal() as db:
+                holds = (
+                    await db.execute(
+                        select(func.count(Enrollment.id)).where(
+                            Enrollment.session_id == session_id, Enrollment.status.in_(SEAT_HOLDING_STATUSES)
+                        )
+                    )
+                ).scalar_one()
+            statuses = Counter(response.status_code for response in responses)
+            if holds != 1 or statuses != Counter({200: 1, 409: CONTENDERS - 1}):
+                ok = False
+                print(f"  session {session_id}: {holds} holds, responses {dict(statuses)}")
+    await engine.dispose()
+    verdict = "exactly one hold per session" if ok else "OVERSOLD"
+    print(f"{ROUNDS} sessions x {CONTENDERS} concurrent checkouts for the last seat: {verdict}")
+    return ok
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tmp}/race.db")
+        os.environ.setdefault("APP_ENV", "check")
+        os.environ.setdefault("SCHEMA_CHECK", "off")
+        return 0 if asyncio.run(_check()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
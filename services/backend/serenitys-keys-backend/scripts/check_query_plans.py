@@ -0,0 +1,156 @@
+"""Assert that the app's hot queries are served by an index.
+
+Builds the schema in an in-memory SQLite database, seeds enough rows for the
+planner to have statistics, then runs ``EXPLAIN QUERY PLAN`` on each hot
+statement and fails if any of them scans a table without an index. The
+statements come from the same builder functions the endpoints and jobs call
+(``availability_stmt``, ``due_reminders_stmt``, ...), so a query that drifts
+off its index fails here rather than in production.
+
+    python scripts/check_query_plans.py
+"""
+from __future__ import annotations
+
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert, text
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+from app.calendar_feed import feed_rows_stmt  # noqa: E402
+from app.db import Base  # noqa: E402
+from app.main import (  # noqa: E402
+    availability_stmt,
+    availability_versions_stmt,
+    parent_by_email_stmt,
+    student_by_name_stmt,
+    student_by_username_stmt,
+    student_metrics_stmt,
+    student_reports_stmt,
+    upcoming_sessions_stmt,
+)
+from app.models import Enrollment, Metric, Parent, ReportRun, Session, Student, WaitlistEntry  # noqa: E402
+from app.reminders import REMINDER_KINDS, due_reminders_stmt  # noqa: E402
+from app.reports import active_student_page_stmt, active_students_stmt, report_rows_stmt  # noqa: E402
+from app.seats import active_enrollments_stmt, expired_holds_stmt, next_waiting_stmt  # noqa: E402
+from app.shards import claimable_shard_stmt  # noqa: E402
+
+
+def hot_queries() -> dict[str, object]:
+    """The statements the endpoints and jobs run, built by the app's own query functions."""
+
+    start = datetime(2025, 1, 1)
+    end = start + timedelta(days=30)
+    run = ReportRun(
+        period_start=date(2024, 12, 26), period_end=date(2025, 1, 1), metrics_since=1000, metrics_until=2000
+    )
+    queries: dict[str, object] = {
+        "availability by course": availability_stmt(start, end, "group:6-8"),
+        "availability versions": availability_versions_stmt(start, end, "group:6-8"),
+        "admin upcoming sessions": upcoming_sessions_stmt(start),
+        "session seat count": active_enrollments_stmt(1),
+        "waitlist next entries": next_waiting_stmt(1, 2),
+        "expired seat holds": expired_holds_stmt(start, 500),
+        "profile upsert parent by email": parent_by_email_stmt("parent@example.com"),
+        "import student by username": student_by_username_stmt("typingKid123"),
+        "import student by name": student_by_name_stmt("Skylar"),
+        "student metrics": student_metrics_stmt(1),
+        "students with new metrics": active_students_stmt(run),
+        "report student page": active_student_page_stmt(run, 500, 1000, 200),
+        "report rows for a student page": report_rows_stmt(run, [501, 502, 503]),
+        "student reports": student_reports_stmt(1),
+        "parent calendar feed": feed_rows_stmt(1, start),
+        "claimable job shards": claimable_shard_stmt("weekly_reports", "2025-01-05", start),
+    }
+    for kind in REMINDER_KINDS:
+        queries[f"due {kind.name} reminders"] = due_reminders_stmt(kind.name, start, start + kind.lead, 500)
+    return queries
+
+
+def _seed(conn) -> None:
+    courses = ["group:3-5", "group:6-8", "group:9-11", "group:12-14", "private:all"]
+    statuses = ["scheduled", "scheduled", "scheduled", "cancelled"]
+    conn.execute(
+        insert(Parent),
+        [{"name": f"Parent {i}", "email": f"parent{i}@example.com"} for i in range(2000)],
+    )
+    conn.execute(
+        insert(Student),
+        [
+            {"parent_id": i + 1, "name": f"Student {i}", "typing_username": f"typist{i}"}
+            for i in range(2000)
+        ],
+    )
+    base = datetime(2024, 6, 1, 16, 0)
+    conn.execute(
+        insert(Session),
+        [
+            {
+                "course": courses[i % len(courses)],
+                "start_ts": base + timedelta(hours=i),
+                "end_ts": base + timedelta(hours=i, minutes=45),
+                "mode": "remote",
+                "capacity": 4,
+                "location": "Google Meet",
+                "status": statuses[i % len(statuses)],
+            }
+            for i in range(5000)
+        ],
+    )
+    conn.execute(
+        insert(Enrollment),
+        [
+            {
+                "student_id": i % 2000 + 1,
+                "session_id": i % 5000 + 1,
+                "status": "confirmed" if i % 3 else "pending",
+                "hold_expires_at": None if i % 3 else base + timedelta(hours=i % 500),
+            }
+            for i in range(8000)
+        ],
+    )
+    conn.execute(
+        insert(WaitlistEntry),
+        [
+            {"session_id": i % 5000 + 1, "student_id": (i * 7) % 2000 + 1, "status": "waiting", "created_at": base}
+            for i in range(3000)
+        ],
+    )
+    conn.execute(
+        insert(Metric),
+        [
+            {"student_id": i % 2000 + 1, "date": date(2024, 1, 1) + timedelta(days=i % 300), "wpm": 40}
+            for i in range(20000)
+        ],
+    )
+    conn.execute(text("ANALYZE"))
+
+
+def main() -> int:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    failures = 0
+    with engine.begin() as conn:
+        _seed(conn)
+        for label, stmt in hot_queries().items():
+            compiled = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+            plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))]
+            # Scans of materialized subqueries (SCAN anon_1, SCAN (subquery-4)) read the
+            # already index-filtered intermediate result, so only base-table scans count.
+            full_scans = [
+                step
+                for step in plan
+                if step.startswith("SCAN") and "INDEX" not in step and step.split()[1] in Base.metadata.tables
+            ]
+            ok = not full_scans and any("INDEX" in step or "PRIMARY KEY" in step for step in plan)
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {label}: {' | '.join(plan)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
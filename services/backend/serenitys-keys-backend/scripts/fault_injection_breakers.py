@@ -0,0 +1,112 @@
+"""Fault-injection run for the integration circuit breakers.
+
+Stripe's ``Session.create`` and Resend's HTTP endpoint are patched to hang for
+``SLOW_SECONDS`` and then fail. The script prints per-call latency so you can
+see the breaker open after the configured threshold (later calls return the
+fallback immediately), then lets the recovery window pass and shows a
+half-open probe closing the breaker once the dependency is healthy again.
+
+    python scripts/fault_injection_breakers.py
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+os.environ.setdefault("STRIPE_SECRET_KEY", "sk_test_fault_injection")
+os.environ.setdefault("STRIPE_PUBLIC_KEY", "pk_test_fault_injection")
+os.environ.setdefault("RESEND_API_KEY", "re_fault_injection")
+os.environ.setdefault("CIRCUIT_RECOVERY_SECONDS", "2")
+
+import httpx  # noqa: E402
+
+from app.integrations import stripe_flow  # noqa: E402
+from app.integrations.circuit_breaker import CircuitOpenError, breakers  # noqa: E402
+from app.integrations.mailer import send_email  # noqa: E402
+
+CALLS = 8
+SLOW_SECONDS = 0.5
+RECOVERY_SECONDS = float(os.environ["CIRCUIT_RECOVERY_SECONDS"])
+
+
+def _slow_stripe_failure(**_: object) -> dict:
+    time.sleep(SLOW_SECONDS)
+    raise RuntimeError("injected: stripe timed out")
+
+
+async def _slow_resend_failure(self, url, **_: object) -> httpx.Response:
+    await asyncio.sleep(SLOW_SECONDS)
+    raise httpx.ConnectTimeout("injected: resend timed out")
+
+
+async def _resend_ok(self, url, **_: object) -> httpx.Response:
+    return httpx.Response(200, json={"id": "email_ok"}, request=httpx.Request("POST", url))
+
+
+def _checkout() -> str:
+    return stripe_flow.create_checkout_session(
+        1500,
+        "https://example.com/success",
+        "https://example.com/cancel",
+        session_id=1,
+        student_id=1,
+    )
+
+
+def _report(label: str, started: float, outcome: str, breaker_name: str) -> None:
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"  {label:<10} {elapsed_ms:7.1f} ms  {outcome:<28} breaker={breakers[breaker_name].state}")
+
+
+async def stripe_scenario() -> None:
+    print(f"stripe: Session.create hangs {SLOW_SECONDS * 1000:.0f} ms then fails")
+    with mock.patch.object(stripe_flow.load_stripe().checkout.Session, "create", side_effect=_slow_stripe_failure):
+        for i in range(CALLS):
+            started = time.perf_counter()
+            url = _checkout()
+            _report(f"call {i + 1}", started, "placeholder" if "dev-placeholder" in url else url, "stripe")
+    await asyncio.sleep(RECOVERY_SECONDS)
+    with mock.patch.object(stripe_flow.load_stripe().checkout.Session, "create", return_value={"url": "https://checkout.stripe.com/ok"}):
+        started = time.perf_counter()
+        url = _checkout()
+        _report("probe", started, url, "stripe")
+
+
+async def mailer_scenario() -> None:
+    print(f"mailer: Resend hangs {SLOW_SECONDS * 1000:.0f} ms then fails")
+    with mock.patch.object(httpx.AsyncClient, "post", _slow_resend_failure):
+        for i in range(CALLS):
+            started = time.perf_counter()
+            try:
+                await send_email("parent@example.com", "Fault injection", "<p>hi</p>")
+                outcome = "sent"
+            except CircuitOpenError:
+                outcome = "rejected (circuit open)"
+            except httpx.HTTPError as exc:
+                outcome = f"failed ({type(exc).__name__})"
+            _report(f"call {i + 1}", started, outcome, "mailer")
+    await asyncio.sleep(RECOVERY_SECONDS)
+    with mock.patch.object(httpx.AsyncClient, "post", _resend_ok):
+        started = time.perf_counter()
+        await send_email("parent@example.com", "Fault injection", "<p>hi</p>")
+        _report("probe", started, "sent", "mailer")
+
+
+async def main() -> None:
+    if stripe_flow.load_stripe() is None:
+        print("stripe SDK not installed; skipping stripe scenario")
+    else:
+        await stripe_scenario()
+    await mailer_scenario()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -7,9 +7,9 @@ from zoneinfo import ZoneInfo
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import async_session_maker, Base, engine
-from app.models import Session
+from app.db import AsyncSessionLocal, Base, engine
 from app.config import get_settings
+from app.scheduling import bulk_create_sessions
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -78,29 +78,31 @@ def generate_session_times(
     return sessions
 
 async def create_sessions(db: AsyncSession, start_date: datetime, days_ahead: int = 30) -> None:
-    """Create session entries for all courses."""
+    """Create session entries for all courses.
+
+    Slots are unique per (course, start time), so a course offered in several
+    modes gets its first listed mode; existing slots are left untouched.
+    """
     tz = settings.timezone_info
     session_times = generate_session_times(start_date, days_ahead, tz)
-    
-    for course in COURSES:
-        for start_time in session_times:
-            for mode in course["modes"]:
-                for duration in course["durations"]:
-                    end_time = start_time + timedelta(minutes=duration)
-                    
-                    session = Session(
-                        course=course["name"],
-                        start_ts=start_time,
-                        end_ts=end_time,
-                        mode=mode,
-                        capacity=course["capacity"],
-                        status="scheduled",
-                        location="Remote" if mode == "online" else "Main Studio",
-                    )
-                    db.add(session)
-    
+
+    rows = [
+        {
+            "course": course["name"],
+            "start_ts": start_time,
+            "end_ts": start_time + timedelta(minutes=course["durations"][0]),
+            "mode": course["modes"][0],
+            "capacity": course["capacity"],
+            "status": "scheduled",
+            "location": "Remote" if course["modes"][0] == "online" else "Main Studio",
+            "version": 1,
+        }
+        for course in COURSES
+        for start_time in session_times
+    ]
+    created = await bulk_create_sessions(db, rows)
     await db.commit()
-    logger.info("Successfully created session entries")
+    logger.info("Created %s session entries (%s already existed)", created, len(rows) - created)
 
 async def main() -> None:
     """Main seeding function."""
@@ -112,7 +114,7 @@ async def main() -> None:
     
     start_date = datetime.now(settings.timezone_info)
     
-    async with async_session_maker() as session:
+    async with AsyncSessionLocal() as session:
         await create_sessions(session, start_date)
     
     logger.info("Database seeding completed successfully")
@@ -1,4 +1,5 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-uvicorn app.main:app --host "${APP_HOST:-0.0.0.0}" --port "${APP_PORT:-8080}" --reload
+alembic upgrade head
+exec uvicorn app.main:app --host "${APP_HOST:-0.0.0.0}" --port "${APP_PORT:-8080}" --reload